@@ -0,0 +1,338 @@
+# admission.py - Per-client rate limiting and per-backend admission control
+#
+# Two layers keep one user (or a burst of them) from piling load on the
+# databases:
+#   1. Rate limiting: callback requests triggered by a database-heavy control
+#      (widgets register them with rate_limit(), e.g. the widget 3 Search and
+#      widget 4 "next faculty" buttons) spend a token from a per-session and a
+#      per-IP token bucket. An empty bucket gets 429 + Retry-After from a
+#      before_request hook, before Dash parses the callback, so a rejected
+#      click costs a dict lookup and touches no database.
+#   2. Admission control: every MySQL connection and MongoDB / Neo4j query
+#      takes a slot of its backend's BackendLimiter (the query wrappers call
+#      slot() or hold()). At most BACKEND_MAX_CONCURRENCY queries run at once
+#      per backend across all processes sharing BACKEND_SLOT_DIR (gunicorn
+#      workers and the background-job processes they fork): a slot is a
+#      lockf()ed file there, which the kernel frees if its process dies. Up
+#      to BACKEND_QUEUE_SIZE more per process wait up to BACKEND_QUEUE_TIMEOUT
+#      (or the request deadline, if sooner). Anything beyond that is shed at
+#      once with Overloaded, which the helpers turn into their TimedOut result.
+# Both layers count their decisions in academicworld_admission_total.
+import asyncio
+import contextlib
+import logging
+import math
+import os
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import deadlines
+from metrics import REGISTRY, Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows: slots are per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RATE = float(os.getenv("RATE_LIMIT_PER_SECOND", "1"))
+BURST = float(os.getenv("RATE_LIMIT_BURST", "5"))
+# The per-IP bucket is this many sessions' worth (several users behind one NAT)
+IP_MULTIPLIER = float(os.getenv("RATE_LIMIT_IP_MULTIPLIER", "4"))
+# Use the first X-Forwarded-For hop as the client IP (only behind a trusted proxy)
+TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+SESSION_COOKIE = "aw_session"
+
+MAX_CONCURRENCY = int(os.getenv("BACKEND_MAX_CONCURRENCY", "8"))
+QUEUE_SIZE = int(os.getenv("BACKEND_QUEUE_SIZE", "16"))
+QUEUE_TIMEOUT = float(os.getenv("BACKEND_QUEUE_TIMEOUT", "2"))
+# Shared slot files; empty keeps the limits per process
+SLOT_DIR = os.getenv("BACKEND_SLOT_DIR", os.path.join(os.getenv("BACKGROUND_CACHE_DIR", "background_cache"),
+                                                      "admission"))
+# How often a queued query looks for a slot freed by another process
+POLL_INTERVAL = 0.02
+
+ADMISSION = REGISTRY.register(Counter(
+    "admission_total", "Rate-limit and backend admission decisions (admitted, queued or shed).",
+    ("scope", "outcome")))
+
+
+class Overloaded(deadlines.QueryTimeout):
+    """A query was shed because its backend was at its concurrency limit."""
+
+
+# ---------------- Token buckets ---------------- #
+
+class TokenBuckets:
+    """Per-key token buckets (rate tokens/s, up to burst), least recently used keys dropped."""
+
+    def __init__(self, rate=RATE, burst=BURST, max_keys=MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+
+    def take(self, key, now=None):
+        """Spend one token for key; returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+
+    def refund(self, key):
+        """Give back a token taken for a request that was rejected anyway."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + 1)
+
+
+sessions = TokenBuckets()
+ips = TokenBuckets(RATE * IP_MULTIPLIER, BURST * IP_MULTIPLIER)
+_limited_triggers = set()
+
+
+def rate_limit(*prop_ids):
+    """Rate-limit callback requests triggered by these "component-id.property" inputs."""
+    _limited_triggers.update(prop_ids)
+
+
+# ---------------- Backend concurrency limits ---------------- #
+
+class BackendLimiter:
+    """Counting semaphore with a bounded, time-limited wait queue.
+
+    The `limit` slots are lock files in slot_dir, shared by every process
+    using the same directory (in-process locks without one). active and
+    waiting count this process's queries only.
+    """
+
+    def __init__(self, backend, limit=MAX_CONCURRENCY, queue_size=QUEUE_SIZE, queue_timeout=QUEUE_TIMEOUT,
+                 slot_dir=SLOT_DIR):
+        self.backend = backend
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.slot_dir = slot_dir if fcntl is not None else None
+        self._paths = None
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked child inherits none of its parent's record locks, but would
+        # inherit these in whatever state the parent's threads left them
+        self.active = self.waiting = 0
+        self._cond = threading.Condition()
+        self._locks = [threading.Lock() for _ in range(self.limit)]
+
+    def _slot_paths(self):
+        if self._paths is None:
+            paths = []
+            if self.slot_dir:
+                try:
+                    os.makedirs(self.slot_dir, exist_ok=True)
+                    paths = [os.path.join(self.slot_dir, f"{self.backend}.{i}.lock") for i in range(self.limit)]
+                except OSError as e:
+                    logger.warning(f"⚠️ No shared admission slots for {self.backend} ({e}); limits are per process")
+            self._paths = paths
+        return self._paths
+
+    def _take_free_slot(self):
+        """Lock a free slot; (index, fd) or None when all of them are held."""
+        paths = self._slot_paths()
+        first = random.randrange(self.limit) if self.limit else 0
+        for k in range(self.limit):
+            i = (first + k) % self.limit
+            # The in-process lock keeps threads apart (record locks belong to the process)
+            if not self._locks[i].acquire(blocking=False):
+                continue
+            if not paths:
+                return i, None
+            try:
+                fd = os.open(paths[i], os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError:
+                self._locks[i].release()
+                continue
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return i, fd
+            except OSError:
+                os.close(fd)
+                self._locks[i].release()
+        return None
+
+    def try_acquire(self):
+        """A slot if one is free right now, else None."""
+        slot = self._take_free_slot()
+        if slot is not None:
+            with self._cond:
+                self.active += 1
+            ADMISSION.inc(1, self.backend, "admitted")
+        return slot
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if needed; None if the query should be shed."""
+        slot = self.try_acquire()
+        if slot is not None:
+            return slot
+        with self._cond:
+            if self.waiting >= self.queue_size:
+                ADMISSION.inc(1, self.backend, "shed")
+                return None
+            left = deadlines.remaining()
+            until = time.monotonic() + (self.queue_timeout if left is None else min(left, self.queue_timeout))
+            self.waiting += 1
+            try:
+                while True:
+                    slot = self._take_free_slot()
+                    if slot is not None:
+                        self.active += 1
+                        break
+                    wait = until - time.monotonic()
+                    if wait <= 0:
+                        ADMISSION.inc(1, self.backend, "shed")
+                        return None
+                    # Woken by a release in this process; other processes' are polled for
+                    self._cond.wait(min(wait, POLL_INTERVAL))
+            finally:
+                self.waiting -= 1
+        ADMISSION.inc(1, self.backend, "queued")
+        return slot
+
+    def release(self, slot):
+        i, fd = slot
+        if fd is not None:
+            os.close(fd)  # drops the record lock
+        self._locks[i].release()
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+limiters = {backend: BackendLimiter(backend, int(os.getenv(f"{backend.upper()}_MAX_CONCURRENCY", MAX_CONCURRENCY)))
+            for backend in ("mysql", "mongodb", "neo4j")}
+
+
+def _shed(limiter):
+    return deadlines.expired(limiter.backend, f"busy ({limiter.limit} concurrent queries), shed",
+                             error=Overloaded)
+
+
+def _releaser(limiter, slot):
+    held = [slot]
+
+    def release():
+        if held:
+            limiter.release(held.pop())
+    return release
+
+
+def hold(backend):
+    """Take one of backend's slots until the returned release() is called (once is enough).
+
+    For a slot that outlives a block, e.g. a MySQL connection's. Raises
+    Overloaded when shed.
+    """
+    limiter = limiters[backend]
+    slot = limiter.acquire()
+    if slot is None:
+        raise _shed(limiter)
+    return _releaser(limiter, slot)
+
+
+@contextlib.contextmanager
+def slot(backend):
+    """Hold one of backend's query slots for the block; raises Overloaded when shed."""
+    release = hold(backend)
+    try:
+        yield
+    finally:
+        release()
+
+
+@contextlib.asynccontextmanager
+async def async_slot(backend):
+    """slot() for coroutines; a queued wait happens off the event loop."""
+    limiter = limiters[backend]
+    taken = limiter.try_acquire() or await asyncio.to_thread(limiter.acquire)
+    if taken is None:
+        raise _shed(limiter)
+    try:
+        yield
+    finally:
+        limiter.release(taken)
+
+
+@REGISTRY.add_collector
+def _limiter_metrics():
+    yield ("backend_queries_active", "gauge", "Queries holding an admission slot per backend.",
+           [({"backend": b}, l.active) for b, l in limiters.items()])
+    yield ("backend_queries_queued", "gauge", "Queries waiting for an admission slot per backend.",
+           [({"backend": b}, l.waiting) for b, l in limiters.items()])
+
+
+# ---------------- Dash integration ---------------- #
+
+def _client_ip(request):
+    if TRUST_PROXY and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or "unknown"
+
+
+def install(app):
+    """Rate-limit registered triggers on /_dash-update-component with 429 responses."""
+    from flask import g, jsonify, request
+
+    if RATE <= 0:
+        return
+
+    @app.server.before_request
+    def _rate_limit():
+        if not request.path.endswith("/_dash-update-component") or request.args.get("cacheKey"):
+            return None  # background-callback polls are free
+        body = request.get_json(silent=True) or {}
+        if not _limited_triggers.intersection(body.get("changedPropIds") or ()):
+            return None
+        session = request.cookies.get(SESSION_COOKIE)
+        if session is None:
+            session = g.new_session = secrets.token_urlsafe(16)
+        ip = _client_ip(request)
+        session_wait, ip_wait = sessions.take(session), ips.take(ip)
+        wait = max(session_wait, ip_wait)
+        if not wait:
+            ADMISSION.inc(1, "rate_limit", "admitted")
+            return None
+        # A shed request costs nothing: return the token the other bucket gave
+        if not session_wait:
+            sessions.refund(session)
+        if not ip_wait:
+            ips.refund(ip)
+        ADMISSION.inc(1, "rate_limit", "shed")
+        response = jsonify(error="Too many requests, slow down.", retry_after=round(wait, 2))
+        response.status_code = 429
+        response.headers["Retry-After"] = str(max(1, math.ceil(wait)))
+        return response
+
+    @app.server.after_request
+    def _session_cookie(response):
+        session = g.pop("new_session", None)
+        if session is not None:
+            response.set_cookie(SESSION_COOKIE, session, httponly=True, samesite="Lax")
+        return response
@@ -1,9 +1,23 @@
 # app.py
 
+import os
+import threading
+
 import dash
 from dash import html, dcc, Input, Output, State, callback_context
-import widget1, widget2, widget3, widget4, widget5, widget6
+import widget1, widget2, widget3, widget4, widget5, widget6, widget7, widget8
 import mysql_utils
+import metrics
+import slow_query_log
+import profiling
+import deadlines
+import admission
+import health
+import outbox_sync  # registers the outbox lag gauge on /metrics
+import async_data
+import lazy_imports
+from swr_cache import landing_cache
+from graph_cache import research_graph
 
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 app.title = "Academic World Dashboard"
@@ -19,25 +33,82 @@ header = html.Div(
 )
 
 # Dashboard Layout (Grid)
-grid_layout = html.Div(
-    id="grid",
-    className="dashboard-grid",
-    children=[
-        widget1.layout(),
-        widget2.layout(),
-        widget3.layout(),
-        widget4.layout(),
-        widget5.layout(),
-        widget6.layout()
-    ]
-)
+def serve_layout():
+    """Build the page per request so widgets 1/2 pick up refreshed cache data."""
+    grid_layout = html.Div(
+        id="grid",
+        className="dashboard-grid",
+        children=[
+            widget1.layout(),
+            widget2.layout(),
+            widget3.layout(),
+            widget4.layout(),
+            widget5.layout(),
+            widget6.layout(),
+            widget7.layout(),
+            widget8.layout()
+        ]
+    )
 
-# Final Layout
-app.layout = html.Div(
-    id="root",
-    className="page-root",
-    children=[header, grid_layout]
-)
+    return html.Div(
+        id="root",
+        className="page-root",
+        children=[header, grid_layout]
+    )
+
+def warm_landing_cache():
+    """Load the MongoDB and MySQL landing aggregations concurrently into the cache."""
+    try:
+        top_keywords, top_faculty = async_data.run_all(
+            async_data.get_top_keywords(), async_data.get_top_faculty_krc_full())
+    except Exception as e:
+        print(f"⚠️ Landing cache warm-up failed: {e}")
+        return
+    landing_cache.prime("top_keywords", top_keywords, accept=lambda result: bool(result[0]))
+    landing_cache.prime("top_faculty_krc", top_faculty)
+    serve_layout()  # builds the landing figures into figure_cache
+
+def preload_modules():
+    """Import what workers would otherwise import on first use, without touching a database.
+
+    Drivers and numpy (lazy_imports), pandas, and the Plotly trace/layout
+    classes and validators that the first figure build loads.
+    gunicorn.conf.py calls this in the --preload master so the forked workers
+    share them, and start_background_work() calls it before starting any
+    thread: pandas is imported by the neo4j driver and probed by Plotly's
+    validators, and a request thread that finds it half-imported by a
+    background thread fails with "partially initialized module 'pandas'".
+    """
+    import pandas  # noqa: F401
+    modules = lazy_imports.preload()
+    widget1.build_figure(["keyword"], [1])
+    widget2.build_figure(["faculty"], [1.0])
+    return modules
+
+_background_lock = threading.Lock()
+_background_pid = None
+
+def start_background_work():
+    """Start this process's health prober, research graph snapshot and landing-cache warm-up (once per process).
+
+    Nothing queries a database or starts a thread at import, so gunicorn
+    --preload can fork workers from the master safely. gunicorn.conf.py calls
+    this in post_fork; under other servers the first request does. The shared
+    modules are imported here, on the calling thread, before any thread starts;
+    concurrent first requests wait on the lock until they are.
+    """
+    global _background_pid
+    with _background_lock:
+        if _background_pid == os.getpid():
+            return
+        preload_modules()
+        _background_pid = os.getpid()
+    health.prober.ensure_running()
+    research_graph.start()
+    threading.Thread(target=warm_landing_cache, name="landing-warmup", daemon=True).start()
+
+# Final Layout (landing-page caches are warmed in the background, not at import)
+app.layout = serve_layout
 
 # 🧠 Callback Registration (One per widget)
 widget1.register_callbacks(app)
@@ -46,6 +117,31 @@ widget3.register_callbacks(app)
 widget4.register_callbacks(app)
 widget5.register_callbacks(app)
 widget6.register_callbacks(app)
+widget7.register_callbacks(app)
+widget8.register_callbacks(app)
+
+# 📈 Prometheus metrics at /metrics (after all callbacks are registered)
+metrics.install(app)
+
+# 🐢 Slow-query log at /admin/slow-queries
+slow_query_log.install(app)
+
+# 🔬 On-demand profiling of flagged callback requests (PROFILING_ENABLED=1 and ADMIN_TOKEN)
+profiling.install(app)
+
+# ⏱️ Per-request deadline propagated into every database call
+deadlines.install(app)
+
+# 🚦 Per-client rate limiting of database-heavy buttons (429 before any query runs)
+admission.install(app)
+
+# 🩺 /healthz and /readyz from a background prober (no database access per request)
+health.install(app)
+
+@server.before_request
+def _ensure_background_work():
+    if _background_pid != os.getpid():
+        start_background_work()
 
 # 🚀 Launch App (only for local debugging)
 if __name__ == "__main__":
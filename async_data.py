@@ -0,0 +1,346 @@
+# async_data.py - asyncio twins of the data-access helpers, with concurrent fan-out
+#
+# Views that need several independent queries (widget 6's keywords + faculty
+# count, the landing page's MongoDB + MySQL aggregations, widget 3's keyword
+# lookups per publication) used to run them one after another. The coroutines
+# here use the async drivers (PyMongo's AsyncMongoClient, the Neo4j async
+# driver) so they can be awaited together, and run_all() is the sync wrapper
+# the Dash callbacks call:
+#
+#     (keywords, counts), faculty = async_data.run_all(
+#         async_data.get_keywords_by_university(name, 15),
+#         async_data.get_university_faculty_count(name))
+#
+# MySQL helpers run the existing pymysql code on the loop's thread pool, which
+# overlaps them just as well without a second driver. In snapshot mode every
+# helper does the same with the SQLite versions. All coroutines run on one
+# long-lived event loop thread, so the async connection pools are reused
+# across requests; the caller's deadline is carried over. Identical
+# concurrent coroutines are coalesced with @single_flight, like their sync
+# twins.
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+
+import admission
+import deadlines
+import lazy_imports
+import mongodb_utils
+import mysql_utils
+import snapshot
+from deadlines import bounded
+from metrics import timed
+from neo4j_utils import (FIND_FACULTY_QUERY, NEO4J_AUTH, NEO4J_URI, PUBLICATION_KEYWORD_QUERIES,
+                         TOP_PUBLICATION_QUERIES, Neo4jUtils)
+from singleflight import normalize_casefold, single_flight
+from slow_query_log import literals, record as record_query
+
+logger = logging.getLogger(__name__)
+
+pymongo = lazy_imports.module("pymongo")
+neo4j = lazy_imports.module("neo4j")
+
+# ---------------- Event loop ---------------- #
+
+_lock = threading.Lock()
+_loop = None
+_clients = {}  # async clients bound to _loop: "mongo", "neo4j"
+
+
+def _after_fork():
+    # A forked worker or background job has no loop thread, and may have
+    # inherited _lock held by a parent thread that was starting one
+    global _lock, _loop
+    _lock = threading.Lock()
+    _loop = None
+    _clients.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _get_loop():
+    """The shared event loop, started on first use (and again in a forked worker)."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-data-loop", daemon=True).start()
+        return _loop
+
+
+def run(coro):
+    """Run a coroutine on the shared loop from sync code and return its result."""
+    loop = _get_loop()
+    if threading.current_thread().name == "async-data-loop":
+        raise RuntimeError("async_data.run() called from a coroutine; await it instead")
+    left = deadlines.remaining()
+
+    async def with_caller_deadline():
+        with deadlines.deadline(left, replace=True):
+            return await coro
+
+    return asyncio.run_coroutine_threadsafe(with_caller_deadline(), loop).result()
+
+
+async def gather(*aws):
+    """Await independent queries concurrently; results in argument order."""
+    return await asyncio.gather(*aws)
+
+
+def run_all(*aws):
+    """Sync wrapper: run the coroutines concurrently, total latency ≈ the slowest one."""
+    return run(gather(*aws))
+
+
+def _threaded(fn):
+    """Async version of a sync helper, run on the loop's default thread pool."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return wrapper
+
+
+# ---------------- MySQL ---------------- #
+
+get_top_faculty_krc_full = _threaded(mysql_utils.get_top_faculty_krc_full)
+get_faculty_analytics = _threaded(mysql_utils.get_faculty_analytics)
+update_faculty_interest = _threaded(mysql_utils.update_faculty_interest)
+update_faculty_position = _threaded(mysql_utils.update_faculty_position)
+get_faculty_updates_since = _threaded(mysql_utils.get_faculty_updates_since)
+get_faculty_updates_max_id = _threaded(mysql_utils.get_faculty_updates_max_id)
+
+# ---------------- MongoDB ---------------- #
+
+async def _faculty_collection():
+    """The async faculty collection, or None if MongoDB is unavailable (retried on the next call)."""
+    client = _clients.get("mongo")
+    if client is None:
+        try:
+            client = pymongo.AsyncMongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"),
+                                              serverSelectionTimeoutMS=3000)
+            await client.admin.command("ping")
+        except Exception as e:
+            logger.warning(f"⚠️ MongoDB not available: {e}")
+            if client is not None:
+                await client.close()
+            return None
+        if "mongo" in _clients:  # a concurrent query connected first; share its pool
+            await client.close()
+        else:
+            _clients["mongo"] = client
+            logger.info("✅ Connected to MongoDB (async) successfully")
+        client = _clients["mongo"]
+    return client["academicworld"]["faculty"]
+
+
+async def _mongo(op, document, operation, explain):
+    """Await operation() within the deadline and report it to the slow-query log."""
+    deadlines.check("mongodb")
+    left = deadlines.remaining()
+    start = time.perf_counter()
+    try:
+        async with admission.async_slot("mongodb"):
+            if left is None:
+                result = await operation()
+            else:
+                with pymongo.timeout(left):
+                    result = await operation()
+    except pymongo.errors.PyMongoError as e:
+        if e.timeout:
+            raise deadlines.expired("mongodb", str(e)) from e
+        raise
+    rows = len(result) if isinstance(result, list) else 1
+    record_query("mongodb", {f"faculty.{op}": document}, literals(document), time.perf_counter() - start,
+                 rows, explain)
+    return result
+
+
+def _sync_explain(command):
+    """Explain thunk for the slow-query log (runs later on its worker thread, with the sync client)."""
+    def explain():
+        client = mongodb_utils.MongoDBConnection().get_client()
+        return mongodb_utils._explain(client["academicworld"], command) if client else None
+    return explain
+
+
+@timed("mongodb")
+@bounded
+@single_flight(normalize=normalize_casefold)
+async def get_keywords_by_university(university_name, limit=20):
+    """Get top keywords for faculty at a specific university."""
+    if not university_name or not university_name.strip():
+        return [], []
+    try:
+        collection = await _faculty_collection()
+        if collection is None:
+            return [], []
+        pipeline = mongodb_utils.university_keywords_pipeline(university_name, limit)
+        results = await _mongo("aggregate", pipeline, lambda: _to_list(collection.aggregate(pipeline)),
+                               _sync_explain({"aggregate": "faculty", "pipeline": pipeline, "cursor": {}}))
+        return [doc["_id"] for doc in results], [doc["count"] for doc in results]
+    except Exception as e:
+        logger.error(f"Error querying keywords for university {university_name}: {e}")
+        return [], []
+
+
+@timed("mongodb")
+@bounded
+@single_flight(normalize=normalize_casefold)
+async def get_university_faculty_count(university_name):
+    """Get number of faculty members at a university."""
+    try:
+        collection = await _faculty_collection()
+        if collection is None:
+            return 0
+        query = mongodb_utils.university_filter(university_name)
+        return await _mongo("count_documents", query, lambda: collection.count_documents(query),
+                            _sync_explain({"count": "faculty", "query": query}))
+    except Exception as e:
+        logger.error(f"Error counting faculty for {university_name}: {e}")
+        return 0
+
+
+@timed("mongodb")
+@bounded
+@single_flight
+async def get_top_keywords(limit=25):
+    """Return most common faculty keywords (Widget 1)."""
+    try:
+        collection = await _faculty_collection()
+        if collection is None:
+            return [], []
+        pipeline = mongodb_utils.top_keywords_pipeline(limit)
+        results = await _mongo("aggregate", pipeline, lambda: _to_list(collection.aggregate(pipeline)),
+                               _sync_explain({"aggregate": "faculty", "pipeline": pipeline, "cursor": {}}))
+        return [doc["_id"] for doc in results], [doc["count"] for doc in results]
+    except Exception as e:
+        logger.error(f"Error in get_top_keywords: {e}")
+        return [], []
+
+
+async def _to_list(cursor_coro):
+    cursor = await cursor_coro
+    return await cursor.to_list(None)
+
+
+# ---------------- Neo4j ---------------- #
+
+def _driver():
+    driver = _clients.get("neo4j")
+    if driver is None:
+        driver = _clients["neo4j"] = neo4j.AsyncGraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH)
+    return driver
+
+
+async def _cypher(query, **params):
+    """Run one Cypher query within the deadline; list of record dicts."""
+    deadlines.check("neo4j")
+    left = deadlines.remaining()
+    start = time.perf_counter()
+    try:
+        async with admission.async_slot("neo4j"), _driver().session(database="academicworld") as session:
+            result = await session.run(neo4j.Query(query, timeout=left) if left is not None else query, **params)
+            rows = await result.data()
+    except neo4j.exceptions.Neo4jError as e:
+        if "TransactionTimedOut" in (e.code or ""):
+            raise deadlines.expired("neo4j", e.message or "transaction timed out") from e
+        raise
+
+    def explain():
+        db = Neo4jUtils()
+        try:
+            return db._explain(query, params)
+        finally:
+            db.close()
+
+    record_query("neo4j", query, params, time.perf_counter() - start, len(rows), explain)
+    return rows
+
+
+async def _first_rows(queries, **params):
+    """Rows of the first query in the fallback list that returns any."""
+    for query in queries:
+        try:
+            rows = await _cypher(query, **params)
+            if rows:
+                return rows
+        except deadlines.QueryTimeout:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Neo4j query failed, trying the next form: {e}")
+    return []
+
+
+@timed("neo4j")
+@bounded
+@single_flight
+async def get_top_publications(faculty_name):
+    """Get top publications for a faculty member"""
+    try:
+        return await _first_rows(TOP_PUBLICATION_QUERIES, name=faculty_name)
+    except Exception as e:
+        print(f"❌ Publication lookup failed: {e}")
+        return []
+
+
+@timed("neo4j")
+@bounded
+@single_flight
+async def get_keywords_for_publication(pub_id):
+    """Get keywords for a specific publication"""
+    try:
+        return await _first_rows(PUBLICATION_KEYWORD_QUERIES, pid=pub_id)
+    except Exception as e:
+        print(f"❌ Keyword lookup failed: {e}")
+        return []
+
+
+@timed("neo4j")
+@bounded
+@single_flight
+async def find_faculty(faculty_name):
+    """Resolve a faculty name to {id, name}: exact, case-insensitive, then partial match"""
+    try:
+        rows = await _cypher(FIND_FACULTY_QUERY, name=faculty_name)
+        return rows[0] if rows else None
+    except Exception as e:
+        print(f"❌ Faculty lookup failed: {e}")
+        return None
+
+
+async def get_keywords_for_publications(pub_ids):
+    """{pub_id: keyword rows} with every publication looked up concurrently.
+
+    If any lookup ran out of time the map comes back as TimedOutDict, so the
+    caller can tell a missing cluster from a publication without keywords.
+    """
+    results = await gather(*(get_keywords_for_publication(pub_id) for pub_id in pub_ids))
+    keywords = {pub_id: rows or [] for pub_id, rows in zip(pub_ids, results)}
+    late = next((rows for rows in results if isinstance(rows, deadlines.TimedOut)), None)
+    return deadlines.timed_out(keywords, late.backend) if late is not None else keywords
+
+
+# ---------------- Offline snapshot mode ---------------- #
+
+if snapshot.ENABLED:
+    # Local SQLite reads; the sync snapshot helpers on the thread pool overlap just the same
+    def _snapshot_neo4j(name):
+        def call(*args):
+            db = Neo4jUtils()
+            try:
+                return getattr(db, name)(*args)
+            finally:
+                db.close()
+        call.__name__ = name
+        return _threaded(call)
+
+    get_keywords_by_university = _threaded(mongodb_utils.get_keywords_by_university)
+    get_university_faculty_count = _threaded(mongodb_utils.get_university_faculty_count)
+    get_top_keywords = _threaded(mongodb_utils.get_top_keywords)
+    get_top_publications = _snapshot_neo4j("get_top_publications")
+    get_keywords_for_publication = _snapshot_neo4j("get_keywords_for_publication")
+    find_faculty = _snapshot_neo4j("find_faculty")
@@ -0,0 +1,113 @@
+# background_jobs.py - Long-running callbacks off the request workers
+#
+# Callbacks registered with background_jobs.callback() run as Dash background
+# callbacks: the request that triggers one only enqueues a job, and the job
+# runs in its own process with results and progress in a local diskcache.
+# While it runs the browser polls for progress, so gunicorn workers stay free
+# for other users. A new submission of the same callback terminates the
+# previous job (Dash sends it as oldJob), and a job still running after
+# BACKGROUND_JOB_TIMEOUT seconds returns the callback's timeout result.
+#
+# The diskcache manager needs `pip install "dash[diskcache]"`. Without it, or
+# with BACKGROUND_CALLBACKS=0, the same callbacks run synchronously as before.
+import contextvars
+import functools
+import logging
+import os
+import threading
+
+import deadlines
+
+logger = logging.getLogger(__name__)
+
+MODE = os.getenv("BACKGROUND_CALLBACKS", "auto").strip().lower()
+CACHE_DIR = os.getenv("BACKGROUND_CACHE_DIR", "background_cache")
+JOB_TIMEOUT = float(os.getenv("BACKGROUND_JOB_TIMEOUT", "60"))
+# Finished results nobody collected (closed tabs) are dropped after this long
+RESULT_EXPIRE = int(os.getenv("BACKGROUND_RESULT_EXPIRE", "600"))
+# How often the browser polls a running job (Dash's default is 1000 ms)
+POLL_MS = int(os.getenv("BACKGROUND_POLL_MS", "250"))
+
+
+def _create_manager():
+    if MODE in ("0", "off", "false", "sync"):
+        return None
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+
+        manager = DiskcacheManager(diskcache.Cache(CACHE_DIR), expire=RESULT_EXPIRE)
+        logger.info(f"✅ Background callbacks enabled (diskcache at {CACHE_DIR})")
+        return manager
+    except ImportError:
+        level = logging.WARNING if MODE in ("1", "on", "true", "diskcache") else logging.INFO
+        logger.log(level, "ℹ️ diskcache/multiprocess not installed; background callbacks run synchronously")
+        return None
+
+
+MANAGER = _create_manager()
+ENABLED = MANAGER is not None
+
+
+def no_progress(*_):
+    """set_progress stand-in when there is nobody to report to."""
+
+
+def _with_timeout(fn, timeout, on_timeout):
+    """Run fn on a thread of the job process; give up after timeout seconds.
+
+    Its queries run under a deadline of the same length, so the backends
+    cancel them server-side; the job process exiting also stops a thread
+    that is still stuck.
+    """
+    @functools.wraps(fn)
+    def job(set_progress, *args):
+        outcome = {}
+        context = contextvars.copy_context()  # keeps callback_context available
+
+        def run():
+            try:
+                # Queries get the job's own budget, not the enqueuing request's deadline
+                with deadlines.deadline(timeout, replace=True):
+                    outcome["value"] = fn(set_progress, *args)
+            except BaseException as e:
+                outcome["error"] = e
+
+        worker = threading.Thread(target=context.run, args=(run,), name=f"job-{fn.__name__}", daemon=True)
+        worker.start()
+        worker.join(timeout)
+        if worker.is_alive():
+            logger.warning(f"⏱️ {fn.__name__} timed out after {timeout:g}s")
+            return on_timeout(*args)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
+    return job
+
+
+def callback(app, *dependencies, progress=None, progress_default=None, running=None, cancel=None,
+             timeout=JOB_TIMEOUT, on_timeout=None, **kwargs):
+    """app.callback() that runs as a background job when a manager is available.
+
+    The decorated function always receives set_progress as its first
+    argument (a no-op when running synchronously or without progress outputs).
+    on_timeout(*args) builds the outputs returned when the job hits timeout.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            @functools.wraps(fn)
+            def synchronous(*args):
+                return fn(no_progress, *args)
+            return app.callback(*dependencies, **kwargs)(synchronous)
+
+        job = _with_timeout(fn, timeout, on_timeout) if timeout and on_timeout else fn
+        if progress is None:
+            inner = job
+
+            @functools.wraps(fn)
+            def job(*args):
+                return inner(no_progress, *args)
+        kwargs.setdefault("interval", POLL_MS)
+        return app.callback(*dependencies, background=True, manager=MANAGER, progress=progress,
+                            progress_default=progress_default, running=running, cancel=cancel, **kwargs)(job)
+    return decorate
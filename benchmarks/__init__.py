@@ -0,0 +1,2 @@
+# Benchmark scripts. Run from the repository root, e.g.:
+#     python -m benchmarks.bench_figures
@@ -0,0 +1,64 @@
+# bench_figures.py - Build and serialize time of the landing-page charts
+#
+#     python -m benchmarks.bench_figures [--repeat 50]
+#
+# Uses synthetic inputs shaped like the real query results, so no database is
+# needed. "uncached" rebuilds the go.Figure and serializes it every call, as
+# layout() did before figure_cache; "cached" is the figure_cache hit path
+# plus the json encoding of the cached dict that Dash still does per request.
+import argparse
+import json
+import random
+import statistics
+import time
+
+import plotly.io as pio
+
+import widget1
+import widget2
+from figure_cache import FigureCache
+
+
+def sample_inputs(seed=42):
+    rng = random.Random(seed)
+    counts = sorted((rng.randint(20, 900) for _ in range(25)), reverse=True)
+    keywords = [f"keyword {i}" for i in range(25)]
+    krcs = sorted((round(rng.uniform(500, 90000), 2) for _ in range(25)), reverse=True)
+    names = [f"Faculty Member Number {i}" for i in range(25)]
+    return {
+        "widget1": ((keywords, counts), widget1.build_figure),
+        "widget2": ((names, krcs), widget2.build_figure),
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark landing-page figure build and serialization")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'widget':<10}{'build ms':>12}{'serialize ms':>15}{'uncached ms':>14}{'cached ms':>12}{'bytes':>10}")
+    for name, (data, build) in sample_inputs().items():
+        fig = build(*data)
+        build_ms = timed(lambda: build(*data), args.repeat)
+        serialize_ms = timed(lambda: pio.to_json(fig, validate=False), args.repeat)
+        uncached_ms = timed(lambda: pio.to_json(build(*data), validate=False), args.repeat)
+
+        cache = FigureCache()
+        cache.get(name, data, build)  # warm
+        # Cache hit plus the serialization Dash still does of the plain dict
+        cached_ms = timed(lambda: json.dumps(cache.get(name, data, build)), args.repeat)
+        size = len(json.dumps(cache.get(name, data, build)))
+        print(f"{name:<10}{build_ms:>12.2f}{serialize_ms:>15.2f}{uncached_ms:>14.2f}{cached_ms:>12.2f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
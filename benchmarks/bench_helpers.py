@@ -0,0 +1,250 @@
+# bench_helpers.py - Latency of every data-access helper on a fixed dataset
+#
+#     python -m benchmarks.bench_helpers [--backend snapshot|live] [--scale 1] [--repeat 200]
+#     python -m benchmarks.bench_helpers --save-baseline      # record the current numbers
+#     python -m benchmarks.bench_helpers --baseline ci/helpers.json   # gate on a given baseline
+#
+# snapshot (default): the helpers run with DATA_BACKEND=snapshot against a
+# SQLite snapshot of the synthetic dataset (synthetic_data.py, fixed seed), so
+# no database server is needed. This measures the snapshot implementations
+# (SQLite queries standing in for MySQL, MongoDB and Neo4j), not the live
+# helpers; it catches regressions in our own query and post-processing code,
+# not in the database servers. Helpers that are constant stubs in a snapshot
+# (updates, the outbox) are skipped. live: the helpers use the configured
+# MySQL, MongoDB and Neo4j, which must hold the same synthetic dataset;
+# --seed-databases loads it there first, REPLACING their contents. Update
+# helpers only write in live mode with --updates, and the original values are
+# restored afterwards.
+#
+# Reports p50/p95/p99 latency and rows returned per call, and exits 1 when a
+# helper's p95 is slower than the baseline by more than --tolerance. Timings
+# are machine specific, so the default baseline (benchmarks/baselines/) is
+# local and not committed; CI passes its own with --baseline, and a baseline
+# given that way must exist and match the backend, or the run fails.
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Constant answers in snapshot mode (a snapshot never changes): nothing to measure
+SNAPSHOT_STUBS = {"mysql.get_faculty_updates_since", "mysql.get_faculty_updates_max_id"}
+# Absolute slack so microsecond-level jitter never counts as a regression
+SLACK_MS = 0.05
+
+
+def percentile(sorted_samples, q):
+    index = min(len(sorted_samples) - 1, int(round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def rows_returned(result):
+    """Rows a helper handed back: list/dict length, first list of a tuple, 1 for scalars."""
+    if result is None:
+        return 0
+    if isinstance(result, tuple):
+        return len(result[0]) if result else 0
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1
+
+
+def measure(fn, repeat, warmup=3):
+    sink = io.StringIO()  # the helpers print progress; keep it off the terminal
+    with contextlib.redirect_stdout(sink):
+        for _ in range(warmup):
+            fn()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            samples.append((time.perf_counter() - start) * 1000)
+            sink.seek(0)
+            sink.truncate()
+    samples.sort()
+    return {
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "mean": statistics.fmean(samples),
+        "rows": rows_returned(result),
+        "calls": repeat,
+    }
+
+
+def prepare(args):
+    """Point the helpers at the fixed dataset; returns the generated world."""
+    if args.backend == "snapshot":
+        path = os.path.join(tempfile.gettempdir(), f"academicworld_bench_s{args.scale}_seed{args.seed}.sqlite")
+        os.environ["DATA_BACKEND"] = "snapshot"
+        os.environ["SNAPSHOT_PATH"] = path
+    from synthetic_data import SyntheticWorld, load_mongo, load_mysql, load_neo4j
+
+    world = SyntheticWorld(scale=args.scale, seed=args.seed)
+    if args.backend == "snapshot" and not os.path.exists(path):
+        world.write_snapshot(path)
+    if args.backend == "live" and args.seed_databases:
+        with tempfile.TemporaryDirectory() as out_dir:
+            ok = load_mysql(world, out_dir, replace=True)
+        if not (ok and load_mongo(world, replace=True) and load_neo4j(world, replace=True)):
+            sys.exit("❌ Could not seed the databases")
+    return world
+
+
+def cases(world, args):
+    """(name, callable, bulk) for every helper, with inputs taken from the dataset."""
+    import mongodb_utils
+    import mysql_utils
+    from neo4j_utils import Neo4jUtils
+
+    degree = {}
+    for f in world.fp_fac.tolist():
+        degree[f] = degree.get(f, 0) + 1
+    busiest = max(degree, key=degree.get)
+    name = world.faculty_names[busiest]
+    university = world.university_names[int(world.faculty_university[busiest])]
+    pub_id = f"p{int(world.fp_pub[world.fp_fac == busiest][0]) + 1}"
+    db = Neo4jUtils()
+
+    positions = ["Professor", "Associate Professor"]
+    flip = {"position": 0, "interest": 0}
+
+    def update_position():
+        flip["position"] ^= 1
+        return mysql_utils.update_faculty_position(name, positions[flip["position"]])
+
+    def update_interest():
+        flip["interest"] ^= 1
+        return mysql_utils.update_faculty_interest(name, f"benchmark interest {flip['interest']}")
+
+    helpers = [
+        ("mysql.get_top_faculty_krc_full", lambda: mysql_utils.get_top_faculty_krc_full(25), False),
+        ("mysql.get_faculty_analytics", lambda: mysql_utils.get_faculty_analytics(20), False),
+        ("mysql.get_faculty_updates_since", lambda: mysql_utils.get_faculty_updates_since(0), False),
+        ("mysql.get_faculty_updates_max_id", mysql_utils.get_faculty_updates_max_id, False),
+        ("mysql.get_faculty_directory", mysql_utils.get_faculty_directory, True),
+        ("mysql.get_faculty_publication_edges", mysql_utils.get_faculty_publication_edges, True),
+        ("mysql.get_faculty_keyword_weights", mysql_utils.get_faculty_keyword_weights, True),
+        ("mysql.get_keyword_names", mysql_utils.get_keyword_names, True),
+        ("mysql.get_publication_keyword_edges", mysql_utils.get_publication_keyword_edges, True),
+        ("mongo.get_keywords_by_university", lambda: mongodb_utils.get_keywords_by_university(university, 15), False),
+        ("mongo.get_university_faculty_count", lambda: mongodb_utils.get_university_faculty_count(university), False),
+        ("mongo.get_top_keywords", lambda: mongodb_utils.get_top_keywords(25), False),
+        ("mongo.get_faculty_keyword_profiles", mongodb_utils.get_faculty_keyword_profiles, True),
+        ("neo4j.test_connection", db.test_connection, False),
+        ("neo4j.get_sample_faculty_names", lambda: db.get_sample_faculty_names(10), False),
+        ("neo4j.get_top_publications", lambda: db.get_top_publications(name), False),
+        ("neo4j.get_keywords_for_publication", lambda: db.get_keywords_for_publication(pub_id), False),
+        ("neo4j.debug_faculty_structure", lambda: db.debug_faculty_structure(name), False),
+        ("neo4j.find_faculty", lambda: db.find_faculty(name), False),
+        ("neo4j.get_collaboration_hop", lambda: db.get_collaboration_hop([f"f{busiest + 1}"]), False),
+        ("neo4j.get_graph_version", db.get_graph_version, False),
+        ("neo4j.export_faculty_publications", db.export_faculty_publications, True),
+        ("neo4j.export_publication_keywords", db.export_publication_keywords, True),
+    ]
+    if args.backend == "snapshot":
+        helpers = [case for case in helpers if case[0] not in SNAPSHOT_STUBS]
+    elif args.updates:
+        helpers += [
+            ("mysql.update_faculty_position", update_position, False),
+            ("mysql.update_faculty_interest", update_interest, False),
+        ]
+
+    def restore():
+        if args.backend == "live" and args.updates:
+            faculty = next(row for row in world.mysql_rows("faculty") if row[0] == busiest + 1)
+            mysql_utils.update_faculty_position(name, faculty[2])
+            mysql_utils.update_faculty_interest(name, faculty[3])
+        db.close()
+
+    return helpers, restore
+
+
+def baseline_path(args):
+    return args.baseline or os.path.join(BASELINE_DIR, f"helpers_{args.backend}_s{args.scale}.json")
+
+
+def describe_backend(args):
+    if args.backend == "snapshot":
+        return (f"snapshot: SQLite stand-ins for MySQL, MongoDB and Neo4j ({os.environ['SNAPSHOT_PATH']}); "
+                "not live database latency")
+    return (f"live: MySQL {os.getenv('MYSQL_HOST', 'localhost')}, MongoDB and Neo4j as configured"
+            + ("" if args.updates else "; update helpers skipped (no --updates)"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every data-access helper")
+    parser.add_argument("--backend", choices=["snapshot", "live"], default="snapshot")
+    parser.add_argument("--scale", type=float, default=1.0, help="synthetic dataset scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--bulk-repeat", type=int, default=5, help="repeats for full-table exports")
+    parser.add_argument("--only", help="substring filter on helper names")
+    parser.add_argument("--seed-databases", action="store_true",
+                        help="live only: load the synthetic dataset first (replaces existing data)")
+    parser.add_argument("--updates", action="store_true", help="live only: also benchmark the update helpers")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 slowdown vs baseline (0.5 = 50%%)")
+    parser.add_argument("--baseline", help="baseline file to compare with or save to "
+                                           "(default: benchmarks/baselines/, local only)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    world = prepare(args)
+    helpers, restore = cases(world, args)
+    results = {}
+    print(f"🧪 Backend {describe_backend(args)}")
+    print(f"{'helper':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rows':>10}")
+    try:
+        for name, fn, bulk in helpers:
+            if args.only and args.only not in name:
+                continue
+            stats = results[name] = measure(fn, args.bulk_repeat if bulk else args.repeat,
+                                            warmup=1 if bulk else 3)
+            print(f"{name:<40}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}{stats['rows']:>10,}")
+    finally:
+        restore()
+
+    path = baseline_path(args)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"backend": args.backend, "scale": args.scale, "helpers": results}, f, indent=2, sort_keys=True)
+        print(f"✅ Baseline saved to {path}")
+        return 0
+    if not os.path.exists(path):
+        if args.baseline:
+            print(f"❌ Baseline {path} not found")
+            return 2
+        print(f"ℹ️ No baseline at {path}; nothing compared. Run with --save-baseline to record one")
+        return 0
+
+    with open(path) as f:
+        saved = json.load(f)
+    if saved.get("backend") != args.backend or saved.get("scale") != args.scale:
+        print(f"❌ Baseline {path} was recorded for backend {saved.get('backend')} at scale {saved.get('scale')}, "
+              f"not {args.backend} at scale {args.scale}")
+        return 2
+    baseline = saved["helpers"]
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base and stats["p95"] > base["p95"] * (1 + args.tolerance) + SLACK_MS:
+            regressions.append(f"{name}: p95 {stats['p95']:.3f} ms vs baseline {base['p95']:.3f} ms")
+        if base and stats["rows"] != base["rows"]:
+            regressions.append(f"{name}: {stats['rows']} rows vs baseline {base['rows']}")
+    if regressions:
+        print("❌ Regressions against baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print(f"✅ No regressions against {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
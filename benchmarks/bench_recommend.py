@@ -0,0 +1,48 @@
+# bench_recommend.py - Collaboration recommendation: full precompute vs on demand
+#
+#     python -m benchmarks.bench_recommend [--faculty 20000] [--pubs 80000]
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_centrality import synthetic_edges
+from collab_recommend import CollaborationRecommender
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collaboration recommendations")
+    parser.add_argument("--faculty", type=int, default=20_000)
+    parser.add_argument("--pubs", type=int, default=80_000)
+    parser.add_argument("--keywords", type=int, default=3_000)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    fac, pub = synthetic_edges(args.faculty, args.pubs)
+    directory = [{"id": i, "name": f"faculty {i}", "university": "U"} for i in range(args.faculty)]
+    authorship = [{"faculty_id": int(f), "publication_id": int(p)} for f, p in zip(fac, pub)]
+    kw_pub = np.repeat(np.arange(args.pubs), 3)
+    keywords = [{"publication_id": int(p), "keyword_id": int(k), "score": float(s)}
+                for p, k, s in zip(kw_pub, rng.zipf(1.3, kw_pub.size) % args.keywords,
+                                   rng.uniform(0.2, 1.0, kw_pub.size))]
+
+    start = time.perf_counter()
+    recommender = CollaborationRecommender.from_rows(directory, authorship, keywords)
+    print(f"build matrices      {time.perf_counter() - start:8.2f}s")
+
+    samples = []
+    for i in rng.choice(args.faculty, 50, replace=False):
+        start = time.perf_counter()
+        recommender.recommend(int(i), k=10)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    print(f"single faculty      {samples[len(samples) // 2]:8.2f}ms p50, {samples[-1]:.2f}ms max")
+
+    start = time.perf_counter()
+    best, _ = recommender.recommend_all(k=args.k)
+    print(f"all {len(best):,} faculty {time.perf_counter() - start:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
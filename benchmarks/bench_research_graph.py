@@ -0,0 +1,317 @@
+# bench_research_graph.py - Research Focus Graph: batched vs per-edge traces
+#
+#     python -m benchmarks.bench_research_graph [--sizes 5,50,500] [--repeat 20]
+#
+# Compares widget3's batched builder (_build_research_figure) against the
+# previous builder (kept verbatim below as legacy_create_research_graph),
+# which added one go.Scatter per edge. Both read keywords from FakeNeo4j. Reports trace count, JSON payload size, build and serialize time.
+import argparse
+import math
+import random
+import statistics
+import time
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import widget3
+from widget3 import _placeholder
+
+
+class FakeNeo4j:
+    """Returns three keywords per publication, like get_keywords_for_publication."""
+
+    def __init__(self, seed=7):
+        self.rng = random.Random(seed)
+
+    def get_keywords_for_publication(self, pub_id):
+        return [{"kw": f"keyword {pub_id}-{j}", "score": round(self.rng.uniform(0.3, 1.0), 3)}
+                for j in range(3)]
+
+
+def sample_publications(n, seed=11):
+    rng = random.Random(seed)
+    return [{"id": f"p{i}", "title": f"A study of topic number {i} in large-scale systems",
+             "cites": rng.randint(0, 400)} for i in range(n)]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def legacy_create_research_graph(faculty_name, publications, db):
+    """Create a beautiful research focus visualization"""
+    if not publications:
+        return _placeholder(f"No publications found for {faculty_name}", "warning")
+    
+    fig = go.Figure()
+    
+    # Enhanced color palette
+    colors = {
+        'faculty': "#e1e73c",          # Yellow
+        'publication': '#3498db',       # Blue  
+        'keyword': '#27ae60',          # Green
+        'edge_pub': 'rgba(52, 152, 219, 0.6)',    # Blue edges
+        'edge_kw': 'rgba(39, 174, 96, 0.4)'       # Green edges
+    }
+    
+    # Calculate positions for publications in a more organic layout
+    pub_positions = {}
+    n_pubs = len(publications)
+    
+    if n_pubs == 1:
+        # Single publication - place to the right
+        pub_positions[publications[0]["id"]] = {
+            "x": 2, "y": 0, 
+            "title": publications[0]["title"], 
+            "cites": publications[0].get("cites", 0)
+        }
+    else:
+        # Multiple publications - use golden spiral for better distribution
+        for i, pub in enumerate(publications):
+            pub_id = pub["id"]
+            title = pub["title"]
+            cites = pub.get("cites", 0)
+            
+            # Golden spiral positioning
+            golden_angle = math.pi * (3 - math.sqrt(5))  # Golden angle
+            radius = 1.5 + 0.3 * math.sqrt(i)  # Spiral outward
+            theta = i * golden_angle
+            
+            x = radius * math.cos(theta)
+            y = radius * math.sin(theta)
+            
+            pub_positions[pub_id] = {
+                "x": x, "y": y, "title": title, "cites": cites
+            }
+    
+    # Draw elegant connections from faculty to publications
+    for pub_id, pos in pub_positions.items():
+        # Calculate line width based on citations (more prominent for highly cited papers)
+        line_width = max(2, min(6, pos["cites"] / 50))
+        
+        fig.add_trace(go.Scatter(
+            x=[0, pos["x"]], y=[0, pos["y"]], 
+            mode="lines",
+            line={
+                "width": line_width, 
+                "color": colors['edge_pub'],
+                "dash": "solid"
+            },
+            hoverinfo="none",
+            showlegend=False
+        ))
+    
+    # Add beautiful publication nodes with size based on citations
+    pub_x = [pos["x"] for pos in pub_positions.values()]
+    pub_y = [pos["y"] for pos in pub_positions.values()]
+    pub_sizes = [max(20, min(40, pos["cites"] / 30)) for pos in pub_positions.values()]
+    pub_text = [f"{pos['title'][:40]}..." if len(pos['title']) > 40 else pos['title'] 
+                for pos in pub_positions.values()]
+    pub_hover = [f"<b>{pos['title']}</b><br>📊 Citations: {pos['cites']}<br>🔗 Click to explore" 
+                 for pos in pub_positions.values()]
+    
+    fig.add_trace(go.Scatter(
+        x=pub_x, y=pub_y,
+        mode="markers+text",
+        marker={
+            "size": pub_sizes,
+            "color": colors['publication'],
+            "line": {"width": 3, "color": "white"},
+            "opacity": 0.8,
+            "symbol": "circle"
+        },
+        text=pub_text,
+        textposition="top center",
+        textfont={"size": 10, "color": "#2c3e50", "family": "Arial"},
+        hovertext=pub_hover,
+        hoverinfo="text",
+        name="Publications",
+        showlegend=False
+    ))
+    
+    # Add keywords with improved positioning and styling
+    keyword_x, keyword_y, keyword_text, keyword_hover, keyword_sizes = [], [], [], [], []
+    
+    for pub_id, pub_pos in pub_positions.items():
+        keywords = db.get_keywords_for_publication(pub_id)
+        if not keywords:
+            continue
+            
+        # Position keywords in a more natural cluster around publication
+        n_keywords = len(keywords)
+        if n_keywords == 1:
+            # Single keyword - place below publication
+            kw_positions = [(0, -0.6)]
+        else:
+            # Multiple keywords - arrange in a semi-circle
+            kw_positions = []
+            for j in range(n_keywords):
+                angle = math.pi * (j / (n_keywords - 1)) - math.pi/2  # Semi-circle from bottom
+                radius = 0.5 + 0.1 * (j % 2)  # Slight radius variation
+                kw_x = radius * math.cos(angle)
+                kw_y = radius * math.sin(angle) - 0.3  # Offset downward
+                kw_positions.append((kw_x, kw_y))
+        
+        for j, kw in enumerate(keywords):
+            kw_name = kw.get("kw", "Unknown")
+            kw_score = kw.get("score", 0)
+            
+            if j < len(kw_positions):
+                offset_x, offset_y = kw_positions[j]
+                kw_x = pub_pos["x"] + offset_x
+                kw_y = pub_pos["y"] + offset_y
+                
+                keyword_x.append(kw_x)
+                keyword_y.append(kw_y)
+                keyword_text.append(kw_name[:12])
+                keyword_hover.append(f"<b>{kw_name}</b><br>⭐ Score: {kw_score:.2f}")
+                keyword_sizes.append(max(12, min(18, kw_score * 20)))
+                
+                # Draw curved connection from publication to keyword
+                fig.add_trace(go.Scatter(
+                    x=[pub_pos["x"], kw_x], y=[pub_pos["y"], kw_y],
+                    mode="lines",
+                    line={
+                        "width": 2, 
+                        "color": colors['edge_kw'],
+                        "dash": "dot"
+                    },
+                    hoverinfo="none",
+                    showlegend=False
+                ))
+    
+    # Add beautiful keyword nodes
+    if keyword_x:
+        fig.add_trace(go.Scatter(
+            x=keyword_x, y=keyword_y,
+            mode="markers+text",
+            marker={
+                "size": keyword_sizes,
+                "color": colors['keyword'],
+                "line": {"width": 2, "color": "white"},
+                "opacity": 0.7,
+                "symbol": "diamond"
+            },
+            text=keyword_text,
+            textposition="middle center",
+            textfont={"size": 9, "color": "gray", "family": "Arial Black"},
+            hovertext=keyword_hover,
+            hoverinfo="text",
+            name="Keywords",
+            showlegend=False
+        ))
+    
+    # Add the central faculty node with enhanced styling
+    fig.add_trace(go.Scatter(
+        x=[0], y=[0],
+        mode="markers+text",
+        marker={
+            "size": 50,
+            "color": colors['faculty'],
+            "line": {"width": 4, "color": "white"},
+            "opacity": 0.9,
+            "symbol": "star"
+        },
+        text=[faculty_name.split()[-1]],  # Show last name only for cleaner look
+        textposition="bottom center",
+        textfont={"size": 16, "color": "#2c3e50", "family": "Arial Black"},
+        hovertext=f"<b>👨‍🎓 {faculty_name}</b><br>🏫 Faculty Member<br>📚 {len(publications)} Publications",
+        hoverinfo="text",
+        name="Faculty",
+        showlegend=False
+    ))
+    
+    # Create a beautiful layout with improved styling
+    fig.update_layout(
+        showlegend=False,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis={
+            "visible": False, 
+            "range": [-4, 4],
+            "scaleanchor": "y",
+            "scaleratio": 1
+        },
+        yaxis={
+            "visible": False, 
+            "range": [-4, 4]
+        },
+        margin={"l": 40, "r": 40, "t": 60, "b": 40},
+        title={
+            "text": f"🔬 Research Network: {faculty_name}",
+            "x": 0.5,
+            "font": {
+                "size": 20,
+                "color": "#2c3e50",
+                "family": "Arial Black"
+            }
+        },
+        hoverlabel={
+            "bgcolor": "white",
+            "bordercolor": "#3498db",
+            "font": {"size": 12, "color": "#2c3e50"}
+        },
+        # Add subtle animations
+        transition={
+            'duration': 500,
+            'easing': 'cubic-in-out'
+        }
+    )
+    
+    # Add a subtle grid pattern in the background
+    fig.add_shape(
+        type="circle",
+        x0=-3.5, y0=-3.5, x1=3.5, y1=3.5,
+        line=dict(color="rgba(52, 152, 219, 0.1)", width=1, dash="dot"),
+        fillcolor="rgba(0,0,0,0)"
+    )
+    
+    fig.add_shape(
+        type="circle",
+        x0=-3.5, y0=-3.5, x1=3.5, y1=3.5,
+        line=dict(
+            color="rgba(52, 152, 219, 0.6)",   # More saturated, less transparent
+            width=3,                           # Thicker line
+            dash="dot"
+        ),
+        fillcolor="rgba(0,0,0,0)"
+    )
+
+    
+    return fig
+
+
+def batched_create_research_graph(faculty_name, publications, db):
+    keywords_by_pub = {pub["id"]: db.get_keywords_for_publication(pub["id"]) for pub in publications}
+    return widget3._build_research_figure(faculty_name, publications, keywords_by_pub)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Research Focus Graph builder")
+    parser.add_argument("--sizes", default="5,50,500", help="publication counts to test")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    builders = {
+        "legacy": legacy_create_research_graph,
+        "batched": batched_create_research_graph,
+    }
+    print(f"{'pubs':>6} {'builder':<9}{'traces':>8}{'bytes':>10}{'build ms':>11}{'serialize ms':>14}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        pubs = sample_publications(n)
+        for label, build in builders.items():
+            fig = build("Jane Doe", pubs, FakeNeo4j())
+            payload = pio.to_json(fig, validate=False)
+            build_ms = timed(lambda: build("Jane Doe", pubs, FakeNeo4j()), args.repeat)
+            serialize_ms = timed(lambda: pio.to_json(fig, validate=False), args.repeat)
+            print(f"{n:>6} {label:<9}{len(fig.data):>8}{len(payload):>10}{build_ms:>11.2f}{serialize_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_similarity.py - MinHash LSH accuracy, recall and latency vs exact Jaccard
+#
+#     python -m benchmarks.bench_similarity [--faculty 5000] [--k 10]
+#
+# Builds a deterministic fixture of topic-clustered keyword sets, then
+# compares minhash_lsh top-k results against brute-force exact Jaccard.
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from minhash_lsh import MinHashLSH, jaccard
+
+
+def keyword_fixture(n_faculty, n_topics=200, words_per_topic=30, seed=3):
+    rng = random.Random(seed)
+    topics = [[f"topic{t}-kw{w}" for w in range(words_per_topic)] for t in range(n_topics)]
+    profiles = {}
+    for i in range(n_faculty):
+        chosen = rng.sample(range(n_topics), rng.randint(1, 3))
+        pool = [kw for t in chosen for kw in topics[t]]
+        keywords = set(rng.sample(pool, min(len(pool), rng.randint(5, 15))))
+        keywords.add(f"noise{rng.randint(0, 5000)}")
+        profiles[f"faculty {i}"] = keywords
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash LSH faculty similarity")
+    parser.add_argument("--faculty", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--num-perm", type=int, default=256)
+    parser.add_argument("--bands", type=int, default=128)
+    args = parser.parse_args()
+
+    profiles = keyword_fixture(args.faculty)
+    index = MinHashLSH(num_perm=args.num_perm, bands=args.bands)
+    start = time.perf_counter()
+    for name, keywords in profiles.items():
+        index.insert(name, keywords)
+    print(f"indexed {len(index)} faculty in {time.perf_counter() - start:.2f}s")
+
+    names = list(profiles)
+    rng = random.Random(0)
+    queries = rng.sample(names, args.queries)
+    # Time the queries in their own pass: the brute-force baseline below
+    # allocates heavily and its garbage collections would land in the timings
+    latencies, results = [], {}
+    for name in queries:
+        start = time.perf_counter()
+        results[name] = index.query_key(name, k=args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    recalls, errors = [], []
+    for name in queries:
+        approx = results[name]
+        exact = sorted(((other, jaccard(profiles[name], profiles[other]))
+                        for other in names if other != name), key=lambda x: -x[1])[:args.k]
+        exact = [item for item in exact if item[1] > 0]
+        if exact:
+            # Ties at the k-th score are interchangeable, so compare by score cut-off
+            cutoff = exact[-1][1]
+            relevant = {o for o, s in exact}
+            found = {o for o, s in approx if s >= cutoff} | (relevant & {o for o, _ in approx})
+            recalls.append(min(1.0, len(found) / len(relevant)))
+
+        sig = index._signatures[name]
+        for other, score in approx:
+            estimate = float(np.mean(sig == index._signatures[other]))
+            errors.append(abs(estimate - score))
+
+    latencies.sort()
+    print(f"recall@{args.k}: {statistics.mean(recalls):.3f}")
+    print(f"MinHash estimate mean abs error vs exact Jaccard: {statistics.mean(errors):.3f}")
+    print(f"query latency p50 {latencies[len(latencies) // 2]:.3f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
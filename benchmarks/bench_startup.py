@@ -0,0 +1,178 @@
+# bench_startup.py - Cold-start cost: app.py import time and time to first byte
+#
+#     python -m benchmarks.bench_startup [--repeat 5] [--backend snapshot|live]
+#                                        [--workers 2] [--no-preload] [--top 15]
+#
+# "import" runs `import app` in fresh interpreters and reports the median
+# wall time, plus the slowest top-level imports from -X importtime. "serve"
+# starts `gunicorn -c gunicorn.conf.py app:server` on a free port and times,
+# from the moment the process is spawned: the first /healthz answer (boot),
+# the first byte of /, a burst of concurrent /_dash-layout requests, the first
+# /readyz that reports ready, and the median TTFB of / once warm. The burst
+# fails unless every answer is a 200, which catches a worker's background
+# threads racing its request threads through a first import. Run with
+# --no-preload to compare per-worker imports. Snapshot mode (default) uses
+# bench_helpers' synthetic snapshot; live mode uses whatever servers the
+# environment points at.
+import argparse
+import http.client
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def snapshot_path(args):
+    """The synthetic snapshot bench_helpers uses, generated if missing."""
+    path = os.path.join(tempfile.gettempdir(), f"academicworld_bench_s{args.scale}_seed{args.seed}.sqlite")
+    if not os.path.exists(path):
+        from synthetic_data import SyntheticWorld
+
+        SyntheticWorld(scale=args.scale, seed=args.seed).write_snapshot(path)
+    return path
+
+
+def _env(args):
+    env = dict(os.environ, BACKGROUND_CALLBACKS=os.getenv("BACKGROUND_CALLBACKS", "0"),
+               GUNICORN_PRELOAD="0" if args.no_preload else "1")
+    if args.backend == "snapshot":
+        env.update(DATA_BACKEND="snapshot", SNAPSHOT_PATH=snapshot_path(args))
+    return env
+
+
+def import_times(args):
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(args.repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(args), capture_output=True,
+                             text=True, check=True).stdout
+        samples.append(float(out.strip().splitlines()[-1]) * 1000)
+    return samples
+
+
+def slowest_imports(args):
+    """(cumulative ms, module) of app's direct imports, slowest first."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=ROOT, env=_env(args),
+                         capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)$", line)
+        if match and len(match.group(2)) <= 3:  # app itself and its direct imports
+            rows.append((int(match.group(1)) / 1000, match.group(3)))
+    return sorted(rows, reverse=True)[:args.top]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def ttfb(port, path, timeout=30):
+    """(status, ms until the response status line arrived)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    start = time.perf_counter()
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        elapsed = (time.perf_counter() - start) * 1000
+        response.read()
+        return response.status, elapsed
+    finally:
+        conn.close()
+
+
+def first_layouts(port, count):
+    """Request /_dash-layout `count` times at once; raises unless every answer is a 200."""
+    statuses = [None] * count
+
+    def fetch(i):
+        try:
+            statuses[i] = ttfb(port, "/_dash-layout")[0]
+        except OSError as e:
+            statuses[i] = repr(e)
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if any(status != 200 for status in statuses):
+        raise RuntimeError(f"/_dash-layout right after startup answered {statuses}")
+
+
+def serve_times(args):
+    port = _free_port()
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:server",
+           "-b", f"127.0.0.1:{port}", "-w", str(args.workers)]
+    spawned = time.perf_counter()
+    server = subprocess.Popen(cmd, cwd=ROOT, env=_env(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              start_new_session=True)
+    results = {}
+    try:
+        deadline = spawned + args.timeout
+        while "boot" not in results:
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {server.returncode}")
+            if time.perf_counter() > deadline:
+                raise RuntimeError("gunicorn did not answer /healthz in time")
+            try:
+                ttfb(port, "/healthz", timeout=1)
+                results["boot"] = (time.perf_counter() - spawned) * 1000
+            except OSError:
+                time.sleep(0.02)
+        status, first = ttfb(port, "/")
+        results["first /"] = (time.perf_counter() - spawned) * 1000
+        results["first / TTFB"] = first
+        first_layouts(port, args.workers * 4)
+        results["first /_dash-layout"] = (time.perf_counter() - spawned) * 1000
+        while time.perf_counter() < deadline:
+            if ttfb(port, "/readyz")[0] == 200:
+                results["ready"] = (time.perf_counter() - spawned) * 1000
+                break
+            time.sleep(0.05)
+        results["warm / TTFB"] = statistics.median(ttfb(port, "/")[1] for _ in range(args.repeat * 4))
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py import time and time to first byte")
+    parser.add_argument("--backend", choices=["snapshot", "live"], default="snapshot")
+    parser.add_argument("--scale", type=float, default=1.0, help="synthetic dataset scale (snapshot backend)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest direct imports to list")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--no-preload", action="store_true", help="let every worker import app.py itself")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--skip-serve", action="store_true", help="only measure the import")
+    args = parser.parse_args()
+
+    samples = import_times(args)
+    print(f"import app: median {statistics.median(samples):.0f} ms, "
+          f"min {min(samples):.0f} ms over {len(samples)} fresh interpreters")
+    print(f"\n{'module':<28}{'cumulative ms':>14}")
+    for ms, name in slowest_imports(args):
+        print(f"{name:<28}{ms:>14.1f}")
+
+    if args.skip_serve:
+        return
+    mode = "no preload" if args.no_preload else "preload"
+    print(f"\ngunicorn, {args.workers} workers, {mode} (ms since spawn unless TTFB)")
+    for name, ms in serve_times(args).items():
+        print(f"{name:<28}{ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# load_test.py - Concurrent users replaying Dash callbacks against a running server
+#
+#     gunicorn app:server -w 4 --threads 4 -b :8050
+#     python -m benchmarks.load_test [--url http://localhost:8050] [--users 1,8,32]
+#                                    [--duration 30] [--mix research_focus=3,spotlight=2]
+#                                    [--writes] [--output results.json]
+#
+# Each virtual user keeps one HTTP connection open and loops: pick a scenario
+# by weight, POST it to /_dash-update-component like the browser would, wait
+# --think ms. Like the browser, it polls a background callback (widgets 3 and
+# 6) until its job finishes, and runs the callbacks a response triggers (a
+# widget 3 search the snapshot can't answer hands off to its job that way), so
+# each sample is the end-to-end time until the final result arrived. Interval-
+# driven follow-ups (widget 3's keyword streaming) are not replayed. Request
+# bodies are built from the server's /_dash-dependencies, so they track the
+# callback signatures. Every --users stage runs for
+# --duration seconds and reports throughput, latency percentiles and the error
+# rate per callback, which makes it easy to compare worker/thread settings.
+# The update scenarios write to MySQL and only run with --writes.
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+
+from benchmarks.bench_helpers import percentile
+
+# name: (callback output, {input or state "id.property": value factory}, writes)
+SCENARIOS = {
+    "research_focus": ("widget3-graph.figure", lambda d: {
+        "widget3-btn.n_clicks": d.clicks(),
+        "widget3-input.value": d.faculty(),
+        "widget3-mode.value": "focus",
+        "widget3-hops.value": 2,
+    }, False),
+    "collaboration": ("widget3-graph.figure", lambda d: {
+        "widget3-btn.n_clicks": d.clicks(),
+        "widget3-input.value": d.faculty(),
+        "widget3-mode.value": "collab",
+        "widget3-hops.value": 2,
+    }, False),
+    "spotlight": ("w4-faculty-spotlight.children", lambda d: {
+        "w4-next-faculty.n_clicks": d.clicks(),
+    }, False),
+    "university_keywords": ("uni-keyword-chart.figure", lambda d: {
+        "uni-keyword-btn.n_clicks": d.clicks(),
+        "uni-input.value": d.university(),
+    }, False),
+    "leaderboard": ("widget7-table.children", lambda d: {
+        "widget7-metric.value": d.rng.choice(["pagerank", "degree", "weighted_degree", "betweenness"]),
+    }, False),
+    "similar": ("widget8-results.children", lambda d: {
+        "widget8-btn.n_clicks": d.clicks(),
+        "widget8-input.value": d.faculty(),
+        "widget8-method.value": d.rng.choice(["overlap", "profile", "recommend"]),
+    }, False),
+    "update_position": ("w4-update-result.children", lambda d: {
+        "w4-update-position.n_clicks": d.clicks(),
+        "w4-faculty-name.value": d.faculty(),
+        "w4-new-position.value": d.rng.choice(["Professor", "Associate Professor", "Assistant Professor"]),
+    }, True),
+    "update_interest": ("update-result.children", lambda d: {
+        "update-btn.n_clicks": d.clicks(),
+        "faculty-name.value": d.faculty(),
+        "faculty-interest.value": d.rng.choice(["databases", "machine learning", "systems"]),
+    }, True),
+}
+DEFAULT_MIX = "research_focus=3,spotlight=3,university_keywords=2,similar=1,leaderboard=1,update_position=1,update_interest=1"
+
+
+class Inputs:
+    """Random but reproducible input values for one virtual user."""
+
+    def __init__(self, faculty, universities, seed):
+        self.rng = random.Random(seed)
+        self._faculty = faculty
+        self._universities = universities
+
+    def faculty(self):
+        return self.rng.choice(self._faculty)
+
+    def university(self):
+        return self.rng.choice(self._universities)
+
+    def clicks(self):
+        return self.rng.randint(1, 1000)
+
+
+def _parse_outputs(output):
+    """Dash's output string → the renderer's `outputs` field (dict, or list if multi)."""
+    multi = output.startswith("..")
+    parts = output.strip(".").split("...") if multi else [output]
+    outputs = []
+    for part in parts:
+        component, prop = part.rsplit(".", 1)
+        outputs.append({"id": component, "property": prop})
+    return outputs if multi else outputs[0]
+
+
+def request_body(dep, chosen):
+    """The renderer's request for callback `dep`, with values from {"id.property": value}."""
+    fill = lambda items: [dict(item, value=chosen.get(f"{item['id']}.{item['property']}")) for item in items]
+    trigger = dep["inputs"][0]
+    return {
+        "output": dep["output"],
+        "outputs": _parse_outputs(dep["output"]),
+        "inputs": fill(dep["inputs"]),
+        "changedPropIds": [f"{trigger['id']}.{trigger['property']}"],
+        "state": fill(dep["state"]),
+    }
+
+
+def build_requests(dependencies):
+    """{scenario: function(Inputs) -> request body} for callbacks the server has."""
+    by_first_output = {}
+    for dep in dependencies:
+        first = _parse_outputs(dep["output"])
+        first = first[0] if isinstance(first, list) else first
+        by_first_output.setdefault(f"{first['id']}.{first['property']}", dep)
+
+    bodies = {}
+    for name, (output, values, _) in SCENARIOS.items():
+        dep = by_first_output.get(output)
+        if dep is not None:
+            bodies[name] = lambda inputs, dep=dep, values=values: request_body(dep, values(inputs))
+    return bodies
+
+
+class Callbacks:
+    """What the browser does after a response: poll background jobs, run triggered callbacks."""
+
+    def __init__(self, dependencies):
+        # Callbacks triggered by a property another callback sets ("widget3-search.data")
+        self.triggered_by = {}
+        self.poll_interval = {}
+        for dep in dependencies:
+            for item in dep["inputs"]:
+                self.triggered_by.setdefault(f"{item['id']}.{item['property']}", []).append(dep)
+            if dep.get("background"):
+                self.poll_interval[dep["output"]] = dep["background"].get("interval", 1000) / 1000
+
+    def follow_ups(self, response):
+        for component, props in response.items():
+            for prop, value in props.items():
+                for dep in self.triggered_by.get(f"{component}.{prop}", ()):
+                    yield request_body(dep, {f"{component}.{prop}": value})
+
+
+def _post(conn, url, body, query=""):
+    conn.request("POST", url.path.rstrip("/") + "/_dash-update-component" + query, json.dumps(body),
+                 {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, json.loads(data) if response.status == 200 and data else {}
+
+
+def run_callback(conn, url, body, callbacks, timeout):
+    """Replay one interaction until its final result; True if every request succeeded."""
+    give_up = time.monotonic() + timeout
+    pending = [body]
+    while pending:
+        body = pending.pop()
+        status, data = _post(conn, url, body)
+        if status == 200 and "cacheKey" in data:
+            # Background job: poll it like the renderer does until the result is in
+            query = "?" + urlencode({"cacheKey": data["cacheKey"], "job": data["job"]})
+            while status == 200 and "response" not in data:
+                if time.monotonic() > give_up:
+                    return False
+                time.sleep(callbacks.poll_interval.get(body["output"], 1.0))
+                status, data = _post(conn, url, body, query)
+        if status not in (200, 204):  # 204 = PreventUpdate / no_update
+            return False
+        pending.extend(callbacks.follow_ups(data.get("response") or {}))
+    return True
+
+
+def parse_mix(text, writes):
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            sys.exit(f"❌ Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        if SCENARIOS[name][2] and not writes:
+            continue
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def add(self, name, ms, ok):
+        with self._lock:
+            self.samples.setdefault(name, []).append(ms)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed):
+        rows = {}
+        every = []
+        for name, samples in sorted(self.samples.items()):
+            every.extend(samples)
+            rows[name] = self._row(samples, self.errors.get(name, 0), elapsed)
+        rows["TOTAL"] = self._row(every, sum(self.errors.values()), elapsed)
+        return rows
+
+    @staticmethod
+    def _row(samples, errors, elapsed):
+        samples = sorted(samples)
+        if not samples:
+            return {"requests": 0, "rps": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "error_rate": 0.0}
+        return {
+            "requests": len(samples),
+            "rps": len(samples) / elapsed,
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "error_rate": errors / len(samples),
+        }
+
+
+def virtual_user(url, bodies, callbacks, mix, inputs, recorder, deadline, think, timeout):
+    names, weights = list(mix), list(mix.values())
+    conn = None
+    while time.monotonic() < deadline:
+        name = inputs.rng.choices(names, weights)[0]
+        body = bodies[name](inputs)
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+            ok = run_callback(conn, url, body, callbacks, timeout)
+        except Exception:
+            ok = False
+            conn.close() if conn else None
+            conn = None
+        recorder.add(name, (time.perf_counter() - start) * 1000, ok)
+        if think:
+            time.sleep(inputs.rng.uniform(0, 2 * think) / 1000)
+    if conn:
+        conn.close()
+
+
+def run_stage(url, bodies, callbacks, mix, users, duration, think, timeout, faculty, universities, seed):
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for i in range(users):
+            pool.submit(virtual_user, url, bodies, callbacks, mix, Inputs(faculty, universities, seed + i),
+                        recorder, deadline, think, timeout)
+    return recorder.summary(time.perf_counter() - start)
+
+
+def default_names():
+    """Names from the synthetic dataset (matches a server running on its snapshot)."""
+    from synthetic_data import SyntheticWorld
+
+    world = SyntheticWorld(scale=1.0, seed=0)
+    return world.faculty_names[:500], world.university_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Dash callbacks with concurrent users")
+    parser.add_argument("--url", default="http://localhost:8050")
+    parser.add_argument("--users", default="1,8,32", help="comma-separated concurrency stages")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between requests (ms)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight list")
+    parser.add_argument("--writes", action="store_true", help="include the MySQL update scenarios")
+    parser.add_argument("--faculty", help="comma-separated faculty names to search for")
+    parser.add_argument("--universities", help="comma-separated university names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write all stage results to this JSON file")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=args.timeout)
+    conn.request("GET", url.path.rstrip("/") + "/_dash-dependencies")
+    dependencies = json.loads(conn.getresponse().read())
+    conn.close()
+
+    mix = parse_mix(args.mix, args.writes)
+    bodies = build_requests(dependencies)
+    callbacks = Callbacks(dependencies)
+    missing = [name for name in mix if name not in bodies]
+    if missing:
+        print(f"⚠️ Server has no callback for: {', '.join(missing)}")
+    mix = {name: w for name, w in mix.items() if name in bodies}
+    if not mix:
+        sys.exit("❌ Nothing to run")
+
+    faculty, universities = default_names()
+    if args.faculty:
+        faculty = [n.strip() for n in args.faculty.split(",") if n.strip()]
+    if args.universities:
+        universities = [n.strip() for n in args.universities.split(",") if n.strip()]
+
+    results = {}
+    for users in (int(u) for u in args.users.split(",")):
+        print(f"\n👥 {users} concurrent users for {args.duration:.0f}s")
+        print(f"{'callback':<22}{'requests':>10}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+        summary = results[users] = run_stage(url, bodies, callbacks, mix, users, args.duration, args.think,
+                                             args.timeout, faculty, universities, args.seed)
+        for name, row in summary.items():
+            print(f"{name:<22}{row['requests']:>10,}{row['rps']:>9.1f}{row['p50']:>10.1f}"
+                  f"{row['p95']:>10.1f}{row['p99']:>10.1f}{row['error_rate']:>9.1%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"url": args.url, "mix": mix, "duration": args.duration, "stages": results}, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# centrality.py - Offline co-author centrality ranking
+#
+# Exports the faculty–publication bipartite graph from MySQL once, turns it
+# into a sparse co-author adjacency matrix (A = B·Bᵀ without the diagonal) and
+# computes PageRank, degree and an approximate betweenness with vectorized
+# sparse linear algebra. Scores are written to a .npz file that the
+# leaderboard widget loads for instant lookup.
+#
+#     python centrality.py [--pivots 256] [--output centrality_scores.npz]
+import argparse
+import logging
+import os
+import threading
+import time
+
+import lazy_imports
+
+np = lazy_imports.module("numpy")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORES_PATH = os.getenv("CENTRALITY_SCORES_PATH", "centrality_scores.npz")
+
+METRICS = {
+    "pagerank": "PageRank",
+    "degree": "Co-authors",
+    "weighted_degree": "Shared publications",
+    "betweenness": "Betweenness (approx.)",
+}
+
+
+# ---------------- Graph construction ---------------- #
+
+def build_coauthor_matrix(faculty_idx, pub_idx, n_faculty, n_pubs):
+    """Sparse co-author matrix; A[i, j] = number of publications i and j share."""
+    from scipy import sparse
+
+    data = np.ones(len(faculty_idx), dtype=np.float64)
+    incidence = sparse.csr_matrix((data, (faculty_idx, pub_idx)), shape=(n_faculty, n_pubs))
+    incidence.data[:] = 1.0  # duplicate authorship rows count once
+    adjacency = (incidence @ incidence.T).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+
+# ---------------- Scores ---------------- #
+
+def pagerank(adjacency, alpha=0.85, tol=1e-10, max_iter=200):
+    """Weighted PageRank by power iteration; dangling mass is spread uniformly."""
+    from scipy import sparse
+
+    n = adjacency.shape[0]
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inv = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    # Column-stochastic transition as the transpose of the row-normalized matrix
+    transition = (sparse.diags(inv) @ adjacency).T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for iteration in range(max_iter):
+        new_rank = alpha * (transition @ rank + rank[dangling].sum() / n) + (1 - alpha) / n
+        err = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if err < n * tol:
+            break
+    logger.info(f"PageRank converged after {iteration + 1} iterations")
+    return rank
+
+
+def degree(adjacency):
+    """Number of distinct co-authors and number of shared publications per faculty."""
+    distinct = np.diff(adjacency.indptr)
+    weighted = np.asarray(adjacency.sum(axis=1)).ravel()
+    return distinct, weighted
+
+
+def approximate_betweenness(adjacency, pivots=256, batch_size=32, seed=0):
+    """Brandes betweenness estimated from a random sample of source nodes.
+
+    Each batch of sources runs a level-synchronous BFS where path counts
+    advance with one sparse-times-dense product per level, followed by the
+    backward dependency accumulation level by level. Scores are scaled by
+    n / pivots and halved for the undirected graph.
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    graph = adjacency.copy()
+    graph.data[:] = 1.0
+    rng = np.random.default_rng(seed)
+    sources = rng.choice(n, size=min(pivots, n), replace=False)
+    scores = np.zeros(n)
+
+    for start in range(0, len(sources), batch_size):
+        batch = sources[start:start + batch_size]
+        cols = np.arange(len(batch))
+        sigma = np.zeros((n, len(batch)))
+        sigma[batch, cols] = 1.0
+        dist = np.full((n, len(batch)), -1, dtype=np.int32)
+        dist[batch, cols] = 0
+
+        frontier = sigma.copy()
+        level = 0
+        while True:
+            reached = graph @ frontier
+            reached[dist >= 0] = 0
+            new = reached > 0
+            if not new.any():
+                break
+            level += 1
+            dist[new] = level
+            sigma[new] = reached[new]
+            frontier = np.where(new, sigma, 0.0)
+
+        delta = np.zeros_like(sigma)
+        safe_sigma = np.where(sigma > 0, sigma, 1.0)
+        for d in range(level, 0, -1):
+            coeff = np.where(dist == d, (1.0 + delta) / safe_sigma, 0.0)
+            contrib = graph @ coeff
+            parents = dist == d - 1
+            delta[parents] += (sigma * contrib)[parents]
+        delta[batch, cols] = 0.0
+        scores += delta.sum(axis=1)
+
+    return scores * (n / len(sources)) / 2.0
+
+
+# ---------------- Batch job ---------------- #
+
+def compute_scores(faculty_ids, edges, pivots=256):
+    """faculty_ids: array of MySQL ids; edges: (faculty_id, publication_id) arrays."""
+    faculty_ids = np.asarray(faculty_ids)
+    fac_col, pub_col = (np.asarray(col) for col in edges)
+    order = np.argsort(faculty_ids)
+    pos = np.searchsorted(faculty_ids, fac_col, sorter=order)
+    pos = np.clip(pos, 0, max(len(faculty_ids) - 1, 0))
+    known = faculty_ids[order][pos] == fac_col
+    faculty_idx = order[pos][known]
+    pub_ids, pub_idx = np.unique(pub_col[known], return_inverse=True)
+
+    timings = {}
+    start = time.perf_counter()
+    adjacency = build_coauthor_matrix(faculty_idx, pub_idx, len(faculty_ids), len(pub_ids))
+    timings["build"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pr = pagerank(adjacency)
+    timings["pagerank"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    distinct, weighted = degree(adjacency)
+    timings["degree"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    between = approximate_betweenness(adjacency, pivots=pivots)
+    timings["betweenness"] = time.perf_counter() - start
+
+    scores = {"pagerank": pr, "degree": distinct, "weighted_degree": weighted,
+              "betweenness": between}
+    return scores, timings
+
+
+def run_job(output=SCORES_PATH, pivots=256):
+    import mysql_utils
+
+    directory = mysql_utils.get_faculty_directory()
+    edges = mysql_utils.get_faculty_publication_edges()
+    if not directory or not edges:
+        logger.error("❌ No faculty/publication data available; scores not written")
+        return None
+
+    faculty_ids = np.array([row["id"] for row in directory])
+    edge_cols = (np.array([row["faculty_id"] for row in edges]),
+                 np.array([row["publication_id"] for row in edges]))
+    scores, timings = compute_scores(faculty_ids, edge_cols, pivots=pivots)
+
+    tmp_path = f"{output}.tmp.npz"
+    np.savez(
+        tmp_path,
+        faculty_id=faculty_ids,
+        name=np.array([row["name"] or "" for row in directory]),
+        university=np.array([row["university"] or "" for row in directory]),
+        computed_at=np.array(time.time()),
+        **scores,
+    )
+    os.replace(tmp_path, output)
+    logger.info(f"✅ Wrote centrality scores for {len(faculty_ids)} faculty to {output} "
+                f"({', '.join(f'{k} {v:.2f}s' for k, v in timings.items())})")
+    return output
+
+
+# ---------------- Lookup ---------------- #
+
+_scores = None
+_scores_mtime = None
+_lock = threading.Lock()
+
+
+def load_scores(path=SCORES_PATH):
+    """Load (and reload when the file changes) the precomputed scores."""
+    global _scores, _scores_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _lock:
+        if _scores is None or mtime != _scores_mtime:
+            with np.load(path) as data:
+                _scores = {key: data[key] for key in data.files}
+            _scores["_rank"] = {name: i for i, name in enumerate(_scores["name"])}
+            _scores_mtime = mtime
+        return _scores
+
+
+def get_leaderboard(metric="pagerank", limit=25, path=SCORES_PATH):
+    """Top faculty by a centrality metric as a list of dicts (empty if not computed)."""
+    scores = load_scores(path)
+    if scores is None or metric not in METRICS:
+        return []
+    values = scores[metric]
+    top = np.argsort(-values, kind="stable")[:limit]
+    return [{
+        "rank": rank + 1,
+        "name": str(scores["name"][i]),
+        "university": str(scores["university"][i]),
+        "score": float(values[i]),
+        "degree": int(scores["degree"][i]),
+    } for rank, i in enumerate(top)]
+
+
+def get_faculty_scores(name, path=SCORES_PATH):
+    """All centrality scores for one faculty name, or None."""
+    scores = load_scores(path)
+    if scores is None or name not in scores["_rank"]:
+        return None
+    i = scores["_rank"][name]
+    return {metric: float(scores[metric][i]) for metric in METRICS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute co-author centrality scores")
+    parser.add_argument("--output", default=SCORES_PATH)
+    parser.add_argument("--pivots", type=int, default=256,
+                        help="source samples for approximate betweenness")
+    args = parser.parse_args()
+    run_job(args.output, args.pivots)
@@ -0,0 +1,234 @@
+# collab_recommend.py - "People you should collaborate with"
+#
+# Built from two incidence matrices:
+#   F  faculty × publication (authorship)
+#   P  publication × keyword (publication_keyword.score)
+# Topic affinity is the cosine of the faculty × keyword profiles T = F·P, and
+# network proximity is the number of mutual co-authors, (C·C) with C the
+# binary co-author matrix F·Fᵀ. Scores mix both, and existing co-authors and
+# the faculty themself are masked out. Rows are scored in blocks, so all
+# faculty can be precomputed in one pass, or a single row on demand.
+# Lookups never build anything on the request path: the precomputed file
+# is loaded (and reloaded when its mtime changes) and the on-demand
+# recommender is built on background threads (index_loader.py).
+#
+#     python collab_recommend.py [--k 20] [--output collab_recommendations.npz]
+import argparse
+import logging
+import os
+import threading
+import time
+
+import lazy_imports
+from index_loader import BackgroundIndex, Warming, file_version
+
+np = lazy_imports.module("numpy")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_PATH = os.getenv("COLLAB_RECOMMENDATIONS_PATH", "collab_recommendations.npz")
+RETRY_SECONDS = 60
+
+
+def _index_of(ids, values):
+    """Positions of values in sorted ids, and a mask of values that were found."""
+    pos = np.clip(np.searchsorted(ids, values), 0, max(len(ids) - 1, 0))
+    return pos, ids[pos] == values if len(ids) else np.zeros(len(values), dtype=bool)
+
+
+class CollaborationRecommender:
+    """Blocked sparse-product scoring of collaboration candidates."""
+
+    def __init__(self, faculty_ids, names, universities, authorship, pub_keywords,
+                 keyword_names, topic_weight=0.7, network_weight=0.3):
+        from scipy import sparse
+
+        self.faculty_ids = faculty_ids
+        self.names = names
+        self.universities = universities
+        self.keyword_names = keyword_names
+        self.topic_weight = topic_weight
+        self.network_weight = network_weight
+        self._row_by_name = {str(n).casefold(): i for i, n in enumerate(names)}
+
+        binary = authorship.copy()
+        binary.data[:] = 1.0
+        coauthors = (binary @ binary.T).tocsr()
+        coauthors.setdiag(0)
+        coauthors.eliminate_zeros()
+        coauthors.data[:] = 1.0
+        self.coauthors = coauthors
+
+        profiles = (binary @ pub_keywords).tocsr()
+        norms = np.sqrt(np.asarray(profiles.multiply(profiles).sum(axis=1)).ravel())
+        inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        self.profiles = (sparse.diags(inv) @ profiles).tocsr()
+        self._profiles_t = self.profiles.T.tocsr()
+
+    @classmethod
+    def from_rows(cls, directory, authorship_rows, keyword_rows, keyword_names=None, **kwargs):
+        from scipy import sparse
+
+        faculty_ids = np.array(sorted(d["id"] for d in directory))
+        by_id = {d["id"]: d for d in directory}
+        names = np.array([by_id[i]["name"] or "" for i in faculty_ids])
+        universities = np.array([by_id[i]["university"] or "" for i in faculty_ids])
+
+        fac = np.array([r["faculty_id"] for r in authorship_rows])
+        pub = np.array([r["publication_id"] for r in authorship_rows])
+        rows, known = _index_of(faculty_ids, fac)
+        pub_ids, cols = np.unique(pub[known], return_inverse=True)
+        authorship = sparse.csr_matrix((np.ones(cols.size), (rows[known], cols)),
+                                       shape=(len(faculty_ids), len(pub_ids)))
+
+        kp = np.array([r["publication_id"] for r in keyword_rows])
+        kk = np.array([r["keyword_id"] for r in keyword_rows])
+        ks = np.array([float(r["score"] or 0) for r in keyword_rows])
+        prow, pknown = _index_of(pub_ids, kp)
+        keyword_ids, kcols = np.unique(kk[pknown], return_inverse=True)
+        pub_keywords = sparse.csr_matrix((ks[pknown], (prow[pknown], kcols)),
+                                         shape=(len(pub_ids), len(keyword_ids)))
+        keyword_names = keyword_names or {}
+        kw_names = np.array([keyword_names.get(int(k), str(k)) for k in keyword_ids])
+        return cls(faculty_ids, names, universities, authorship, pub_keywords, kw_names, **kwargs)
+
+    @classmethod
+    def from_mysql(cls, **kwargs):
+        import mysql_utils
+
+        directory = mysql_utils.get_faculty_directory()
+        authorship = mysql_utils.get_faculty_publication_edges()
+        keywords = mysql_utils.get_publication_keyword_edges()
+        if not directory or not authorship:
+            return None
+        return cls.from_rows(directory, authorship, keywords, mysql_utils.get_keyword_names(), **kwargs)
+
+    def row(self, name):
+        return self._row_by_name.get(name.strip().casefold()) if name else None
+
+    def score_block(self, rows):
+        """Dense (len(rows) × n_faculty) scores with co-authors and self masked."""
+        rows = np.asarray(rows)
+        topic = (self.profiles[rows] @ self._profiles_t).toarray()
+        own = self.coauthors[rows]
+        mutual = (own @ self.coauthors).toarray()
+        degree = np.maximum(np.asarray(own.sum(axis=1)), 1.0)
+        scores = self.topic_weight * topic + self.network_weight * (mutual / degree)
+        scores[own.nonzero()] = 0.0
+        scores[np.arange(rows.size), rows] = 0.0
+        return scores, mutual
+
+    def recommend(self, i, k=10):
+        """Top-k candidates for one faculty row as (row, score, mutual co-authors)."""
+        scores, mutual = self.score_block([i])
+        scores, mutual = scores[0], mutual[0]
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(j), float(scores[j]), int(mutual[j])) for j in top if scores[j] > 0]
+
+    def recommend_all(self, k=20, block_size=256):
+        """Top-k candidate rows and scores for every faculty (n × k arrays)."""
+        n = len(self.faculty_ids)
+        k = min(k, max(n - 1, 1))
+        best = np.zeros((n, k), dtype=np.int32)
+        best_scores = np.zeros((n, k), dtype=np.float32)
+        for start in range(0, n, block_size):
+            rows = np.arange(start, min(start + block_size, n))
+            scores, _ = self.score_block(rows)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            best[rows] = np.take_along_axis(top, order, axis=1)
+            best_scores[rows] = np.take_along_axis(top_scores, order, axis=1)
+        return best, best_scores
+
+    def shared_keywords(self, i, j, limit=5):
+        product = self.profiles[i].multiply(self.profiles[j]).tocoo()
+        order = np.argsort(-product.data)[:limit]
+        return [str(self.keyword_names[product.col[o]]) for o in order]
+
+
+def precompute(output=RECOMMENDATIONS_PATH, k=20):
+    recommender = CollaborationRecommender.from_mysql()
+    if recommender is None:
+        logger.error("❌ No faculty/publication data available; recommendations not written")
+        return None
+    start = time.perf_counter()
+    best, scores = recommender.recommend_all(k=k)
+    tmp_path = f"{output}.tmp.npz"
+    np.savez(tmp_path, names=recommender.names, universities=recommender.universities,
+             best=best, scores=scores)
+    os.replace(tmp_path, output)
+    logger.info(f"✅ Precomputed {k} recommendations for {len(best)} faculty "
+                f"in {time.perf_counter() - start:.1f}s → {output}")
+    return output
+
+
+# ---------------- Lookup ---------------- #
+
+_files = {}
+_files_lock = threading.Lock()
+_recommender = BackgroundIndex("Collaboration recommender", CollaborationRecommender.from_mysql,
+                               retry_seconds=RETRY_SECONDS)
+
+
+def _read_precomputed(path):
+    with np.load(path) as data:
+        precomputed = {key: data[key] for key in data.files}
+    precomputed["_row"] = {str(n).casefold(): i for i, n in enumerate(precomputed["names"])}
+    return precomputed
+
+
+def _precomputed(path):
+    """Background loader of a precomputed file, reloaded when its mtime changes."""
+    with _files_lock:
+        if path not in _files:
+            _files[path] = BackgroundIndex(f"Collaboration recommendations ({path})",
+                                           lambda: _read_precomputed(path) if os.path.exists(path) else None,
+                                           version=lambda: file_version(path), retry_seconds=RETRY_SECONDS)
+        return _files[path]
+
+
+def recommend_collaborators(name, k=10, path=RECOMMENDATIONS_PATH):
+    """Suggested collaborators who share topics or co-authors but no publication yet.
+
+    Served from the precomputed file when present; otherwise scored on demand.
+    Returns Warming() while the file or the on-demand recommender is loading.
+    """
+    if not name:
+        return []
+    key = name.strip().casefold()
+    if file_version(path) is not None:
+        pre = _precomputed(path).get()
+        if pre is None:
+            return Warming()
+        if key not in pre["_row"]:
+            return []
+        i = pre["_row"][key]
+        return [{"name": str(pre["names"][j]), "university": str(pre["universities"][j]),
+                 "similarity": float(score), "shared": []}
+                for j, score in zip(pre["best"][i][:k], pre["scores"][i][:k]) if score > 0]
+
+    recommender = _recommender.get()
+    if recommender is None:
+        return Warming()
+    i = recommender.row(name)
+    if i is None:
+        return []
+    return [{
+        "name": str(recommender.names[j]),
+        "university": str(recommender.universities[j]),
+        "similarity": score,
+        "mutual": mutual,
+        "shared": recommender.shared_keywords(i, j),
+    } for j, score, mutual in recommender.recommend(i, k=k)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute collaboration recommendations")
+    parser.add_argument("--output", default=RECOMMENDATIONS_PATH)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+    precompute(args.output, args.k)
@@ -0,0 +1,207 @@
+# deadlines.py - Per-request deadlines for every database call
+#
+# Each /_dash-update-component request gets a deadline of
+# REQUEST_DEADLINE_SECONDS (background jobs get their job timeout). It lives
+# in a contextvar, and the query wrappers of each backend turn whatever is
+# left into a server-side limit:
+#   MySQL    - MAX_EXECUTION_TIME hint on SELECTs, read timeout on the
+#              connection, and KILL QUERY when the client gives up first
+#   MongoDB  - pymongo.timeout(), which sends maxTimeMS with each command
+#   Neo4j    - transaction timeout on each query
+#   snapshot - SQLite progress handler that interrupts the statement
+# A wrapper that hits the deadline raises QueryTimeout. The helpers still
+# catch it and return their usual empty fallback, and @bounded turns that
+# fallback into a TimedOut result that widgets can render as a degraded state.
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import math
+import os
+import time
+
+from metrics import HELPER_TIMEOUTS
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE_SECONDS", "20"))
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+_expired = contextvars.ContextVar("deadline_expired", default=None)
+
+
+class QueryTimeout(Exception):
+    """A backend call was cut short by the current deadline."""
+
+    def __init__(self, backend, message="deadline exceeded"):
+        super().__init__(f"{backend}: {message}")
+        self.backend = backend
+
+
+# ---------------- Deadline context ---------------- #
+
+@contextlib.contextmanager
+def deadline(seconds, replace=False):
+    """Run the block with a deadline `seconds` from now.
+
+    Nested deadlines keep the earlier of the two unless replace=True (used by
+    background jobs, which must not inherit the enqueuing request's deadline).
+    """
+    until = None if seconds is None else time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and not replace and (until is None or current < until):
+        until = current
+    token = _deadline.set(until)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left before the deadline (None when there is none)."""
+    until = _deadline.get()
+    return None if until is None else max(0.0, until - time.monotonic())
+
+
+def budget_ms():
+    """Milliseconds left, rounded up to at least 1 (None when unbounded)."""
+    left = remaining()
+    return None if left is None else max(1, math.ceil(left * 1000))
+
+
+def check(backend):
+    """Raise QueryTimeout (and mark the call as timed out) if the deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise expired(backend)
+
+
+def expired(backend, message="deadline exceeded", error=QueryTimeout):
+    """Mark the running helper as timed out; returns the QueryTimeout (or subclass) to raise."""
+    mark_expired(backend)
+    logger.warning(f"⏱️ {backend} query cut short: {message}")
+    return error(backend, message)
+
+
+def mark_expired(backend):
+    """Mark the running helper as timed out by backend, e.g. with a result shared from another call."""
+    _expired.set(backend)
+
+
+def expired_backend():
+    """Backend whose deadline cut the running helper short, or None."""
+    return _expired.get()
+
+
+# ---------------- Typed timeout results ---------------- #
+
+class TimedOut:
+    """Mixin marking a helper result cut short by its deadline.
+
+    The result keeps the shape of the helper's normal fallback (an empty
+    list, a ([], []) tuple, 0, None...), so callers that ignore timeouts keep
+    working, and widgets can check isinstance(result, TimedOut).
+    """
+    backend = None
+
+
+class TimedOutList(TimedOut, list):
+    pass
+
+
+class TimedOutTuple(TimedOut, tuple):
+    pass
+
+
+class TimedOutDict(TimedOut, dict):
+    pass
+
+
+class TimedOutInt(TimedOut, int):
+    pass
+
+
+class TimedOutNone(TimedOut):
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "TimedOutNone()"
+
+
+def timed_out(value, backend):
+    """value re-typed as a TimedOut result of the same shape."""
+    if isinstance(value, TimedOut):
+        return value
+    if isinstance(value, list):
+        result = TimedOutList(value)
+    elif isinstance(value, tuple):
+        result = TimedOutTuple(value)
+    elif isinstance(value, dict):
+        result = TimedOutDict(value)
+    elif isinstance(value, int):  # also bools (test_connection)
+        result = TimedOutInt(value)
+    else:
+        result = TimedOutNone()
+    result.backend = backend
+    return result
+
+
+def _finish(fn, result, backend):
+    if backend is None:
+        return result
+    HELPER_TIMEOUTS.inc(1, backend, fn.__name__)
+    return timed_out(result, backend)
+
+
+def bounded(fn):
+    """Decorator: return a TimedOut version of fn's result if one of its queries hit the deadline."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            token = _expired.set(None)
+            try:
+                result = await fn(*args, **kwargs)
+                backend = _expired.get()
+            finally:
+                _expired.reset(token)
+            return _finish(fn, result, backend)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _expired.set(None)
+        try:
+            result = fn(*args, **kwargs)
+            backend = _expired.get()
+        finally:
+            _expired.reset(token)
+        return _finish(fn, result, backend)
+    return wrapper
+
+
+# ---------------- Dash integration ---------------- #
+
+def install(app, seconds=REQUEST_DEADLINE):
+    """Give every /_dash-update-component request a deadline of `seconds`."""
+    from flask import g, request
+
+    if not seconds or seconds <= 0:
+        return
+
+    @app.server.before_request
+    def _start_deadline():
+        if request.path.endswith("/_dash-update-component"):
+            g.deadline_token = _deadline.set(time.monotonic() + seconds)
+
+    @app.server.teardown_request
+    def _end_deadline(exc=None):
+        # Worker threads are reused, so the deadline must not outlive the request
+        token = g.pop("deadline_token", None)
+        if token is not None:
+            try:
+                _deadline.reset(token)
+            except ValueError:
+                _deadline.set(None)
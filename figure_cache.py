@@ -0,0 +1,64 @@
+# figure_cache.py - Cache finished Plotly figures keyed by their input data
+#
+# Widgets 1 and 2 build large go.Figure objects (gradient colours, per-bar
+# shapes, annotations, an interpolated trend line) from small inputs. The
+# figure is a pure function of that data, so we build it once per distinct
+# input and keep it as a plain-JSON dict (lists, strings and numbers). Later
+# calls skip go.Figure construction, validation and numpy conversion. Dash
+# still serializes the dict with the rest of the layout on every request,
+# but encoding plain lists is the cheap part.
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from metrics import FIGURE_SECONDS
+
+
+def data_hash(data):
+    """Stable SHA-1 of JSON-able widget inputs (Decimals etc. fall back to str)."""
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """Small LRU of (name, data hash) -> plain-dict figure."""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, name, data, build):
+        """Return the figure as a plain dict ready for dcc.Graph(figure=...), building on a miss."""
+        key = (name, data_hash(data))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached
+            self.stats["misses"] += 1
+
+        with FIGURE_SECONDS.time(name):
+            # The JSON round trip turns numpy arrays and Plotly objects into plain types
+            cached = json.loads(pio.to_json(build(*data), validate=False))
+        with self._lock:
+            self._entries[key] = cached
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        with self._lock:
+            return {"entries": len(self._entries), **self.stats}
+
+
+figure_cache = FigureCache()
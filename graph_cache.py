@@ -0,0 +1,219 @@
+# graph_cache.py - In-memory CSR snapshot of the Research Focus graph
+#
+# Widget 3 only needs faculty → top publications (by citations) and
+# publication → top keywords (by score). That graph is read-mostly, so we
+# snapshot it from Neo4j into CSR arrays (row offsets + column indices +
+# weights) with each row pre-sorted by weight. A lookup is then a dict hit
+# plus an array slice, served from RAM without touching Neo4j.
+#
+# The snapshot is loaded in the background (app.start_background_work, or
+# the first lookup) and reloaded when the graph fingerprint (node and
+# relationship counts plus the faculty update log watermark) changes. Set
+# RESEARCH_GRAPH_CACHE=0 to disable it.
+import logging
+import os
+import threading
+import time
+
+import lazy_imports
+
+np = lazy_imports.module("numpy")
+
+logger = logging.getLogger(__name__)
+
+
+def build_csr(rows, cols, weights, n_rows):
+    """CSR arrays with each row's entries sorted by descending weight."""
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    order = np.lexsort((-weights, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32), weights[order]
+
+
+class ResearchGraphSnapshot:
+    """Immutable faculty→publication→keyword graph in CSR form."""
+
+    def __init__(self, faculty_publications, publication_keywords, version=None):
+        # faculty_publications: (name, pub_id, title, cites, faculty_id) rows
+        # publication_keywords: (pub_id, keyword, score) rows
+        self.version = version
+        self.loaded_at = time.time()
+
+        self.faculty_names = sorted({row[0] for row in faculty_publications if row[0]})
+        self.faculty_index = {name: i for i, name in enumerate(self.faculty_names)}
+        self.faculty_casefold = {}
+        for name, i in self.faculty_index.items():
+            self.faculty_casefold.setdefault(name.casefold(), i)
+
+        self.pub_ids, self.pub_titles, self.pub_cites = [], [], []
+        self.pub_index = {}
+        fac_rows, fac_cols, fac_weights = [], [], []
+        for name, pub_id, title, cites, *_ in faculty_publications:
+            if not name:
+                continue
+            j = self.pub_index.get(pub_id)
+            if j is None:
+                j = self.pub_index[pub_id] = len(self.pub_ids)
+                self.pub_ids.append(pub_id)
+                self.pub_titles.append(title)
+                self.pub_cites.append(cites)
+            fac_rows.append(self.faculty_index[name])
+            fac_cols.append(j)
+            fac_weights.append(cites or 0)
+        self.fp_indptr, self.fp_indices, self.fp_weights = build_csr(
+            fac_rows, fac_cols, fac_weights, len(self.faculty_names))
+
+        self.keyword_names = []
+        keyword_index = {}
+        kw_rows, kw_cols, kw_weights = [], [], []
+        for pub_id, keyword, score in publication_keywords:
+            j = self.pub_index.get(pub_id)
+            if j is None:
+                continue  # only publications reachable from a faculty matter
+            k = keyword_index.get(keyword)
+            if k is None:
+                k = keyword_index[keyword] = len(self.keyword_names)
+                self.keyword_names.append(keyword)
+            kw_rows.append(j)
+            kw_cols.append(k)
+            kw_weights.append(score or 0)
+        self.pk_indptr, self.pk_indices, self.pk_weights = build_csr(
+            kw_rows, kw_cols, kw_weights, len(self.pub_ids))
+
+    def resolve(self, faculty_name):
+        """Row index for a name: exact match first, then case-insensitive."""
+        i = self.faculty_index.get(faculty_name)
+        if i is None:
+            i = self.faculty_casefold.get(faculty_name.casefold())
+        return i
+
+    def top_publications(self, faculty_name, limit=5):
+        """Same shape as Neo4jUtils.get_top_publications, or None if unknown."""
+        i = self.resolve(faculty_name)
+        if i is None:
+            return None
+        start = self.fp_indptr[i]
+        cols = self.fp_indices[start:min(start + limit, self.fp_indptr[i + 1])]
+        return [{"id": self.pub_ids[j], "title": self.pub_titles[j], "cites": self.pub_cites[j]}
+                for j in cols.tolist()]
+
+    def keywords_for_publication(self, pub_id, limit=3):
+        """Same shape as Neo4jUtils.get_keywords_for_publication."""
+        j = self.pub_index.get(pub_id)
+        if j is None:
+            return []
+        start, end = self.pk_indptr[j], self.pk_indptr[j + 1]
+        end = min(start + limit, end)
+        return [{"kw": self.keyword_names[k], "score": float(w)}
+                for k, w in zip(self.pk_indices[start:end].tolist(), self.pk_weights[start:end].tolist())]
+
+    def nbytes(self):
+        arrays = (self.fp_indptr, self.fp_indices, self.fp_weights,
+                  self.pk_indptr, self.pk_indices, self.pk_weights)
+        return sum(a.nbytes for a in arrays)
+
+
+def _default_version():
+    from neo4j_utils import Neo4jUtils
+    import mysql_utils
+
+    db = Neo4jUtils()
+    try:
+        counts = db.get_graph_version()
+    finally:
+        db.close()
+    if counts is None:
+        return None
+    # Renames don't change any count, but they do land in faculty_updates_log
+    return tuple(sorted(counts.items())) + (("updates", mysql_utils.get_faculty_updates_max_id()),)
+
+
+def _default_loader():
+    from neo4j_utils import Neo4jUtils
+
+    db = Neo4jUtils()
+    try:
+        return db.export_faculty_publications(), db.export_publication_keywords()
+    finally:
+        db.close()
+
+
+class ResearchGraphCache:
+    """Holds the current snapshot and swaps in a new one when the source changes."""
+
+    def __init__(self, loader=None, version=None, check_interval=60.0, enabled=True):
+        self.loader = loader or _default_loader
+        self.version = version or _default_version
+        self.check_interval = check_interval
+        self.enabled = enabled
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._last_check = 0.0
+
+    def snapshot(self):
+        """Current snapshot (None until the first load completes).
+
+        Never blocks: loading and version checks run in a background thread.
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            due = self._snapshot is None or now - self._last_check >= self.check_interval
+            if due and not self._reloading:
+                self._reloading = True
+                self._last_check = now
+                threading.Thread(target=self.reload, name="research-graph-reload",
+                                  daemon=True).start()
+            return self._snapshot
+
+    def start(self):
+        """Load now and keep checking the source every check_interval, in this process.
+
+        Call it in each server process: the snapshot lives in process memory,
+        and widget 3 looks it up before handing a search to a background job.
+        """
+        if not self.enabled:
+            return
+
+        def refresh():
+            while True:
+                self.snapshot()  # starts a reload when one is due
+                time.sleep(self.check_interval)
+
+        threading.Thread(target=refresh, name="research-graph-refresh", daemon=True).start()
+
+    def reload(self, force=False):
+        """Rebuild the snapshot if the source version changed. Returns True on swap."""
+        try:
+            version = self.version()
+            current = self._snapshot
+            if version is None:
+                return False
+            if not force and current is not None and current.version == version:
+                return False
+            start = time.perf_counter()
+            faculty_publications, publication_keywords = self.loader()
+            snapshot = ResearchGraphSnapshot(faculty_publications, publication_keywords, version)
+            with self._lock:
+                self._snapshot = snapshot
+            logger.info(f"✅ Research graph snapshot loaded: {len(snapshot.faculty_names)} faculty, "
+                        f"{len(snapshot.pub_ids)} publications, {snapshot.nbytes() / 1e6:.1f} MB "
+                        f"in {time.perf_counter() - start:.1f}s")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Research graph snapshot not loaded: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._reloading = False
+
+
+research_graph = ResearchGraphCache(
+    check_interval=float(os.getenv("RESEARCH_GRAPH_CACHE_CHECK", "60")),
+    enabled=os.getenv("RESEARCH_GRAPH_CACHE", "1") == "1",
+)
@@ -0,0 +1,30 @@
+# gunicorn.conf.py - Production server settings (picked up by `gunicorn app:server`)
+#
+# preload_app imports app.py once in the master and forks the workers from
+# it, so pages, callbacks and (via when_ready) the lazily imported drivers,
+# numpy and Plotly figure classes are shared copy-on-write instead of
+# imported by every worker.
+# app.py opens no connection and starts no thread at import; each worker
+# starts its own health prober and landing-cache warm-up in post_fork, and
+# the asyncio data loop restarts itself in a new process on first use.
+# Every setting can be overridden on the command line or with GUNICORN_CMD_ARGS.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8050')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    if preload_app:
+        from app import preload_modules
+
+        server.log.info(f"Preloaded {', '.join(preload_modules())} for the workers")
+
+
+def post_fork(server, worker):
+    from app import start_background_work
+
+    start_background_work()
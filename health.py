@@ -0,0 +1,232 @@
+# health.py - Cached liveness/readiness endpoints for orchestrators
+#
+# A background prober checks MySQL, MongoDB and Neo4j (or the snapshot file
+# with DATA_BACKEND=snapshot) every HEALTH_PROBE_INTERVAL seconds, each probe
+# on its own thread with its own short timeouts, and keeps the last result.
+# The endpoints only read that cache plus a few in-process counters, so they
+# answer in well under a millisecond and never touch a database:
+#   /healthz - liveness: 200 while the process and its prober are running
+#   /readyz  - readiness: 200 when every HEALTH_REQUIRED backend passed its
+#              last probe and that probe is recent, 503 otherwise
+# Both return JSON with per-backend status, probe latency, last error, and
+# the admission slots / in-flight helper calls of each backend.
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import admission
+import snapshot
+from metrics import BACKEND_IN_FLIGHT, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+# A cached result older than this is reported as stale (not ready)
+STALE_AFTER = INTERVAL * 3 + PROBE_TIMEOUT
+BACKENDS = ("snapshot",) if snapshot.ENABLED else ("mysql", "mongodb", "neo4j")
+REQUIRED = [b.strip() for b in os.getenv("HEALTH_REQUIRED", ",".join(BACKENDS)).split(",")
+            if b.strip() in BACKENDS]
+
+
+# ---------------- Probes ---------------- #
+
+def _probe_mysql():
+    import mysql_utils
+
+    # A fresh connection each time: the helpers connect per call too, so this is what they see
+    conn = mysql_utils.connect(connect_timeout=PROBE_TIMEOUT, read_timeout=PROBE_TIMEOUT,
+                               write_timeout=PROBE_TIMEOUT)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+    finally:
+        conn.close()
+
+
+class _Clients:
+    """Long-lived probe clients, separate from the request-path pools."""
+    mongo = None
+    neo4j = None
+
+
+def _probe_mongodb():
+    if _Clients.mongo is None:
+        from pymongo import MongoClient
+
+        ms = int(PROBE_TIMEOUT * 1000)
+        _Clients.mongo = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"), maxPoolSize=1,
+                                     serverSelectionTimeoutMS=ms, connectTimeoutMS=ms, socketTimeoutMS=ms)
+    _Clients.mongo.admin.command("ping")
+
+
+def _probe_neo4j():
+    if _Clients.neo4j is None:
+        from neo4j import GraphDatabase
+        from neo4j_utils import NEO4J_AUTH, NEO4J_URI
+
+        _Clients.neo4j = GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH, max_connection_pool_size=1,
+                                              connection_timeout=PROBE_TIMEOUT,
+                                              connection_acquisition_timeout=PROBE_TIMEOUT)
+    # A plain session run: execute_query() would retry a refused connection for 30 s
+    with _Clients.neo4j.session(database="academicworld") as session:
+        session.run("RETURN 1").consume()
+
+
+def _probe_snapshot():
+    conn = snapshot.get_connection()
+    if conn is None:
+        raise FileNotFoundError(f"snapshot file {snapshot.SNAPSHOT_PATH} not found")
+    conn.execute("SELECT 1").fetchone()
+
+
+PROBES = {"mysql": _probe_mysql, "mongodb": _probe_mongodb, "neo4j": _probe_neo4j, "snapshot": _probe_snapshot}
+
+
+# ---------------- Background prober ---------------- #
+
+class Prober:
+    """Runs every backend probe each interval and caches the outcome."""
+
+    def __init__(self, backends=BACKENDS, interval=INTERVAL, timeout=PROBE_TIMEOUT):
+        self.backends = backends
+        self.interval = interval
+        self.timeout = timeout
+        self.status = {b: {"status": "unknown", "checked_at": None, "latency_ms": None, "error": None,
+                           "failures": 0} for b in backends}
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the prober thread (again, in a forked worker)."""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid != os.getpid():
+                    _Clients.mongo = _Clients.neo4j = None  # not fork-safe; reconnect in this process
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._loop, name="health-prober", daemon=True)
+                self._thread.start()
+
+    def alive(self):
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        # A probe stuck past its timeout keeps its worker busy; the pool has spares
+        executor = ThreadPoolExecutor(max_workers=len(self.backends) * 2, thread_name_prefix="health-probe")
+        while True:
+            try:
+                futures = [executor.submit(self._probe, b) for b in self.backends
+                           if self.status[b].get("running") is not True]
+            except RuntimeError:  # interpreter shutting down
+                return
+            wait(futures, timeout=self.timeout + 1)
+            time.sleep(self.interval)
+
+    def _probe(self, backend):
+        entry = self.status[backend]
+        entry["running"] = True
+        start = time.perf_counter()
+        try:
+            PROBES[backend]()
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        latency = time.perf_counter() - start
+        if error is None and latency > self.timeout:
+            error = f"probe took {latency:.1f}s (timeout {self.timeout:g}s)"
+        if error and entry["status"] != "down":
+            logger.warning(f"⚠️ Health probe: {backend} is down ({error})")
+        elif not error and entry["status"] == "down":
+            logger.info(f"✅ Health probe: {backend} is back up")
+        # Replace the whole entry so readers never see a half-updated one
+        self.status[backend] = {"status": "down" if error else "up", "checked_at": time.time(),
+                                "latency_ms": round(latency * 1000, 2), "error": error,
+                                "failures": entry["failures"] + 1 if error else 0}
+
+    def results(self):
+        """Cached per-backend status with staleness applied."""
+        now = time.time()
+        result = {}
+        for backend, entry in self.status.items():
+            entry = dict(entry)
+            entry.pop("running", None)
+            if entry["checked_at"] is not None and now - entry["checked_at"] > STALE_AFTER:
+                entry["status"] = "stale"
+            result[backend] = entry
+        return result
+
+
+prober = Prober()
+
+
+def _pool_stats(backend):
+    limiter = admission.limiters.get(backend)
+    stats = {"in_flight": BACKEND_IN_FLIGHT._series.get((backend,), 0)}
+    if limiter is not None:
+        stats.update(active=limiter.active, queued=limiter.waiting, limit=limiter.limit)
+    return stats
+
+
+def report():
+    """(ready, body) from the cached probe results; no I/O."""
+    backends = prober.results()
+    for backend, entry in backends.items():
+        entry["required"] = backend in REQUIRED
+        entry["pool"] = _pool_stats(backend)
+    ready = prober.alive() and all(backends[b]["status"] == "up" for b in REQUIRED)
+    return ready, {"status": "ready" if ready else "unavailable", "data_backend": snapshot.BACKEND,
+                   "backends": backends}
+
+
+@REGISTRY.add_collector
+def _health_metrics():
+    status = prober.results()
+    yield ("backend_up", "gauge", "1 if the backend passed its last health probe.",
+           [({"backend": b}, 1 if e["status"] == "up" else 0) for b, e in status.items()])
+    yield ("backend_probe_seconds", "gauge", "Latency of the last health probe.",
+           [({"backend": b}, (e["latency_ms"] or 0) / 1000) for b, e in status.items()])
+
+
+# ---------------- Dash integration ---------------- #
+
+def install(app):
+    """Serve /healthz and /readyz on app.server.
+
+    They are answered from the first before_request hook, ahead of Dash's
+    one-time server setup (which renders the layout, i.e. queries the landing
+    data) and the per-request instrumentation. The prober is started by
+    app.start_background_work() or the first probe, never at import (so
+    gunicorn --preload forks no dead threads).
+    """
+    from flask import Response, request
+
+    def _json(body, status):
+        return Response(json.dumps(body, separators=(",", ":")), status=status, mimetype="application/json",
+                        headers={"Cache-Control": "no-store"})
+
+    @app.server.route("/healthz")
+    def _healthz():
+        prober.ensure_running()
+        _, body = report()
+        body["status"] = "ok" if prober.alive() else "prober stopped"
+        return _json(body, 200 if prober.alive() else 503)
+
+    @app.server.route("/readyz")
+    def _readyz():
+        prober.ensure_running()
+        ready, body = report()
+        return _json(body, 200 if ready else 503)
+
+    endpoints = {"/healthz": _healthz, "/readyz": _readyz}
+
+    def _probe_first():
+        endpoint = endpoints.get(request.path)
+        return endpoint() if endpoint else None
+
+    app.server.before_request_funcs.setdefault(None, []).insert(0, _probe_first)
@@ -0,0 +1,84 @@
+# index_loader.py - Similarity indexes built off the request path
+#
+# The widget 8 indexes (MinHash LSH over MongoDB keyword sets, keyword
+# vectors and collaboration recommendations from MySQL) take seconds to
+# build. A BackgroundIndex loads or builds one on a daemon thread the first
+# time it is asked for, and again when its source version changes (e.g. the
+# mtime of a precomputed file); a lookup never waits for it. Until the first
+# build lands the helpers return Warming(), an empty result that widgets can
+# show as "still warming up" instead of "no results".
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Warming(list):
+    """Empty result: the index it needs is still being built."""
+
+
+def file_version(path):
+    """A file's mtime as a source version (None while it doesn't exist)."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class BackgroundIndex:
+    """Holds the current index and rebuilds it in the background when needed."""
+
+    def __init__(self, name, load, version=None, retry_seconds=60.0, check_interval=10.0):
+        self.name = name
+        self.load = load                  # () -> index, or None without data
+        self.version = version            # () -> hashable source version, optional
+        self.retry_seconds = retry_seconds
+        self.check_interval = check_interval
+        self._index = None
+        self._version = None
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked child has no builder thread, whatever the parent was doing
+        self._lock = threading.Lock()
+        self._building = False
+        self._next_check = 0.0
+
+    def get(self):
+        """The current index (None until the first build lands). Never blocks."""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_check and not self._building and (self._index is None or self.version):
+                self._building = True
+                threading.Thread(target=self._refresh, name=f"{self.name}-build", daemon=True).start()
+            return self._index
+
+    def set(self, index):
+        """Install an index built by the caller."""
+        with self._lock:
+            self._index = index
+            self._version = self.version() if self.version else None
+
+    def _refresh(self):
+        ok = True
+        try:
+            if self._index is not None and self.version() == self._version:
+                return
+            start = time.perf_counter()
+            index = self.load()
+            if index is None:
+                ok = False
+                return
+            self.set(index)
+            logger.info(f"✅ {self.name} ready in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            ok = False
+            logger.warning(f"⚠️ {self.name} not built: {e}")
+        finally:
+            with self._lock:
+                self._building = False
+                wait = self.check_interval if ok and self._index is not None else self.retry_seconds
+                self._next_check = time.monotonic() + wait
@@ -0,0 +1,254 @@
+# keyword_vectors.py - Weighted keyword-vector nearest neighbours across faculty
+#
+# Each faculty gets a sparse keyword vector from the KRC weights in MySQL
+# (publication_keyword.score * publication.num_citations summed per keyword),
+# re-weighted TF-IDF style (log1p(weight) * idf) and L2-normalised, so a dot
+# product is a cosine similarity. Two search modes:
+#   exact   - sparse matrix-vector product over row blocks with a running top-K
+#   approx  - dense random projection to a few dimensions, then exact re-rank
+#             of the best candidates
+# The model is persisted as plain .npy files and memory-mapped on load.
+#
+#     python keyword_vectors.py [--dir keyword_vectors]
+import argparse
+import json
+import logging
+import os
+import time
+
+import lazy_imports
+from index_loader import BackgroundIndex, Warming, file_version
+
+np = lazy_imports.module("numpy")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv("KEYWORD_VECTORS_DIR", "keyword_vectors")
+# Catalogues larger than this default to approximate search
+APPROX_THRESHOLD = 200_000
+
+
+def _top_k(scores, k, exclude=None):
+    """Indices of the k largest scores, best first."""
+    if exclude is not None:
+        scores = scores.copy()
+        scores[exclude] = -np.inf
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class KeywordVectorIndex:
+    """L2-normalised faculty × keyword TF-IDF matrix with cosine top-K search."""
+
+    def __init__(self, matrix, idf, faculty_ids, names, universities, keyword_ids,
+                 keyword_names, projection=None, projected=None):
+        self.matrix = matrix              # CSR, rows L2-normalised
+        self.idf = idf
+        self.faculty_ids = faculty_ids
+        self.names = names
+        self.universities = universities
+        self.keyword_ids = keyword_ids
+        self.keyword_names = keyword_names
+        self.projection = projection      # keywords × d random Gaussian
+        self.projected = projected        # faculty × d, rows normalised
+        self._row_by_name = {str(n).casefold(): i for i, n in enumerate(names)}
+
+    # ---------------- Construction ---------------- #
+
+    @classmethod
+    def build(cls, rows, directory, keyword_names=None, dims=64, seed=0):
+        """rows: (faculty_id, keyword_id, weight) dicts; directory: faculty dicts."""
+        from scipy import sparse
+
+        faculty_ids = np.array([d["id"] for d in directory])
+        order = np.argsort(faculty_ids)
+        faculty_ids = faculty_ids[order]
+        names = np.array([directory[i]["name"] or "" for i in order])
+        universities = np.array([directory[i]["university"] or "" for i in order])
+
+        fac = np.array([r["faculty_id"] for r in rows])
+        kw = np.array([r["keyword_id"] for r in rows])
+        weight = np.array([float(r["weight"] or 0) for r in rows])
+        row_idx = np.searchsorted(faculty_ids, fac)
+        known = (row_idx < len(faculty_ids)) & (faculty_ids[np.minimum(row_idx, len(faculty_ids) - 1)] == fac)
+        keyword_ids, col_idx = np.unique(kw[known], return_inverse=True)
+
+        tf = np.log1p(np.maximum(weight[known], 0))
+        matrix = sparse.csr_matrix((tf, (row_idx[known], col_idx)),
+                                   shape=(len(faculty_ids), len(keyword_ids)))
+        matrix.eliminate_zeros()
+        df = np.bincount(matrix.indices, minlength=len(keyword_ids))
+        idf = np.log((1.0 + len(faculty_ids)) / (1.0 + df)) + 1.0
+        matrix = matrix @ sparse.diags(idf)
+        matrix = cls._normalize(matrix.tocsr())
+
+        keyword_names = keyword_names or {}
+        kw_names = np.array([keyword_names.get(int(k), str(k)) for k in keyword_ids])
+        projection, projected = cls._project(matrix, dims, seed)
+        return cls(matrix, idf, faculty_ids, names, universities, keyword_ids, kw_names,
+                   projection, projected)
+
+    @staticmethod
+    def _normalize(matrix):
+        from scipy import sparse
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        return (sparse.diags(inv) @ matrix).tocsr()
+
+    @staticmethod
+    def _project(matrix, dims, seed):
+        rng = np.random.default_rng(seed)
+        projection = rng.standard_normal((matrix.shape[1], dims)).astype(np.float32) / np.sqrt(dims)
+        projected = np.asarray(matrix @ projection, dtype=np.float32)
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        projected /= np.where(norms > 0, norms, 1.0)
+        return projection, projected
+
+    # ---------------- Persistence ---------------- #
+
+    _ARRAYS = ("idf", "faculty_ids", "names", "universities", "keyword_ids",
+               "keyword_names", "projection", "projected")
+
+    def save(self, directory=MODEL_DIR):
+        tmp = f"{directory}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        np.save(os.path.join(tmp, "indptr.npy"), self.matrix.indptr)
+        np.save(os.path.join(tmp, "indices.npy"), self.matrix.indices)
+        np.save(os.path.join(tmp, "data.npy"), self.matrix.data)
+        for name in self._ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"shape": list(self.matrix.shape), "built_at": time.time()}, f)
+        if os.path.isdir(directory):
+            old = f"{directory}.old"
+            os.replace(directory, old)
+            os.replace(tmp, directory)
+            for name in os.listdir(old):
+                os.remove(os.path.join(old, name))
+            os.rmdir(old)
+        else:
+            os.replace(tmp, directory)
+
+    @classmethod
+    def load(cls, directory=MODEL_DIR):
+        """Memory-map a saved model; pages are read lazily by the OS."""
+        from scipy import sparse
+
+        def arr(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        with open(os.path.join(directory, "meta.json")) as f:
+            shape = tuple(json.load(f)["shape"])
+        matrix = sparse.csr_matrix((arr("data"), arr("indices"), arr("indptr")), shape=shape, copy=False)
+        return cls(matrix, *(arr(name) for name in cls._ARRAYS))
+
+    # ---------------- Search ---------------- #
+
+    def row(self, name):
+        return self._row_by_name.get(name.strip().casefold()) if name else None
+
+    def search(self, i, k=10, mode="exact", block_size=65536, candidates=20):
+        """Top-k (row, cosine) most similar to row i, excluding i itself.
+
+        exact:  blocked sparse products, exact for any catalogue size.
+        approx: random-projection scores pick k * candidates rows, which are
+                then re-ranked exactly.
+        """
+        query = self.matrix[i].T.tocsc()
+        if mode == "approx":
+            rough = self.projected @ self.projected[i]
+            # At most n - 1 candidates, and never i itself: with a small catalogue
+            # _top_k would otherwise return every row, i included (at -inf)
+            pool = _top_k(rough, min(k * candidates, self.matrix.shape[0] - 1), exclude=i)
+            pool = pool[pool != i]
+            scores = np.asarray((self.matrix[pool] @ query).todense()).ravel()
+            best = _top_k(scores, k)
+            return [(int(pool[j]), float(scores[j])) for j in best if scores[j] > 0]
+
+        best_rows, best_scores = np.zeros(0, dtype=np.int64), np.zeros(0)
+        for start in range(0, self.matrix.shape[0], block_size):
+            block = self.matrix[start:start + block_size]
+            scores = np.asarray((block @ query).todense()).ravel()
+            if start <= i < start + block_size:
+                scores[i - start] = -np.inf
+            top = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+            keep = _top_k(best_scores, k)
+            best_rows, best_scores = best_rows[keep], best_scores[keep]
+        return [(int(r), float(s)) for r, s in zip(best_rows, best_scores) if s > 0]
+
+    def shared_keywords(self, i, j, limit=5):
+        """Keywords contributing most to the cosine between rows i and j."""
+        a, b = self.matrix[i], self.matrix[j]
+        product = a.multiply(b).tocoo()
+        order = np.argsort(-product.data)[:limit]
+        return [str(self.keyword_names[product.col[o]]) for o in order]
+
+
+# ---------------- Collaborator search ---------------- #
+
+def build_index(directory=MODEL_DIR):
+    """Build from MySQL and persist; returns the index (None without data)."""
+    import mysql_utils
+
+    rows = mysql_utils.get_faculty_keyword_weights()
+    faculty = mysql_utils.get_faculty_directory()
+    if not rows or not faculty:
+        logger.error("❌ No KRC data available; keyword vectors not built")
+        return None
+    start = time.perf_counter()
+    index = KeywordVectorIndex.build(rows, faculty, mysql_utils.get_keyword_names())
+    index.save(directory)
+    logger.info(f"✅ Built keyword vectors {index.matrix.shape} in {time.perf_counter() - start:.1f}s")
+    return KeywordVectorIndex.load(directory)
+
+
+def _load_or_build(directory=MODEL_DIR):
+    if os.path.exists(os.path.join(directory, "meta.json")):
+        return KeywordVectorIndex.load(directory)
+    return build_index(directory)
+
+
+# Loaded (or built, then persisted) in the background; a rebuilt model on
+# disk (`python keyword_vectors.py`) is picked up through meta.json's mtime
+_index = BackgroundIndex("Keyword vectors", _load_or_build,
+                         version=lambda: file_version(os.path.join(MODEL_DIR, "meta.json")))
+
+
+def get_index():
+    """The model, or None while it is still being loaded or built."""
+    return _index.get()
+
+
+def find_collaborators(name, k=10, mode=None):
+    """Faculty with the most similar weighted keyword profile (cosine).
+
+    Warming() while the model is still being loaded or built.
+    """
+    index = get_index()
+    if index is None:
+        return Warming()
+    i = index.row(name)
+    if i is None:
+        return []
+    if mode is None:
+        mode = "approx" if index.matrix.shape[0] > APPROX_THRESHOLD else "exact"
+    return [{
+        "name": str(index.names[j]),
+        "university": str(index.universities[j]),
+        "similarity": score,
+        "shared": index.shared_keywords(i, j),
+    } for j, score in index.search(i, k=k, mode=mode)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the faculty keyword-vector index")
+    parser.add_argument("--dir", default=MODEL_DIR)
+    args = parser.parse_args()
+    build_index(args.dir)
@@ -0,0 +1,56 @@
+# lazy_imports.py - Defer heavy imports to first use
+#
+# The database drivers and numpy account for most of app.py's import time,
+# yet a worker only needs them once a callback actually queries or computes.
+# Modules that use them bind a proxy instead:
+#
+#     np = lazy_imports.module("numpy")
+#
+# and the real import happens on the first attribute access (np.asarray,
+# pymongo.MongoClient...). Under `gunicorn --preload`, gunicorn.conf.py calls
+# preload() in the master so workers fork with the drivers already imported.
+import importlib
+import threading
+
+_lock = threading.RLock()  # an import may itself touch another proxy
+_proxies = {}
+
+
+class LazyModule:
+    """Stand-in for a module, imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._load()
+        return getattr(module, attr)
+
+    def _load(self):
+        with _lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+            return self._module
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def module(name):
+    """Proxy for module `name` (one shared proxy per name)."""
+    with _lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = LazyModule(name)
+        return proxy
+
+
+def preload():
+    """Import every module a proxy was created for; returns their names."""
+    for proxy in list(_proxies.values()):
+        proxy._load()
+    return sorted(_proxies)
@@ -0,0 +1,305 @@
+# metrics.py - Low-overhead latency metrics in Prometheus text format
+#
+# Histograms are fixed-bucket counters behind one lock per metric, so a
+# sample costs a bisect and a few additions. Helpers are timed per backend
+# with @timed("mysql" | "mongodb" | "neo4j"), Dash callbacks and
+# /_dash-update-component requests by install(app), and figure builds by
+# figure_cache. Cache, single-flight and snapshot gauges are read only when
+# /metrics is scraped. METRICS_ENABLED=0 turns all instrumentation off.
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+PREFIX = "academicworld_"
+# Seconds; database round trips through multi-second graph expansions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = PREFIX + name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            series = dict(self._series)
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}"
+                                for k, v in sorted(series.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._series[labels] = value
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts, then +Inf, then sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def collect(self):
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        lines = self.header()
+        for labels, series in sorted(snapshot.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                total += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, {'le': _number(bound)})} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {total}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn):
+        """fn() -> iterable of (name, type, help, [(labels dict, value)]), called per scrape."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                lines.append(f"# collector {collector.__name__} failed: {_escape(e)}")
+                continue
+            for name, kind, help, samples in families:
+                lines += [f"# HELP {PREFIX}{name} {help}", f"# TYPE {PREFIX}{name} {kind}"]
+                lines += [f"{PREFIX}{name}{_labels(labels, labels.values())} {_number(value)}"
+                          for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HELPER_SECONDS = REGISTRY.register(Histogram(
+    "helper_seconds", "Data-access helper latency.", ("backend", "helper")))
+HELPER_ERRORS = REGISTRY.register(Counter(
+    "helper_errors_total", "Helper calls that raised.", ("backend", "helper")))
+HELPER_TIMEOUTS = REGISTRY.register(Counter(
+    "helper_timeouts_total", "Helper calls cut short by their request deadline.", ("backend", "helper")))
+BACKEND_IN_FLIGHT = REGISTRY.register(Gauge(
+    "backend_in_flight", "Helper calls currently running against each backend.", ("backend",)))
+CALLBACK_SECONDS = REGISTRY.register(Histogram(
+    "dash_callback_seconds", "Dash callback run time including response serialization.", ("callback",)))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "dash_request_seconds", "Whole /_dash-update-component request time.", ("callback",)))
+REQUESTS = REGISTRY.register(Counter(
+    "dash_requests_total", "/_dash-update-component requests by HTTP status.", ("callback", "status")))
+FIGURE_SECONDS = REGISTRY.register(Histogram(
+    "figure_build_seconds", "Plotly figure build and serialization time on a figure cache miss.", ("figure",)))
+
+
+def timed(backend):
+    """Decorator recording a helper's (or async helper's) latency under (backend, function name)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        name = fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                BACKEND_IN_FLIGHT.inc(1, backend)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    HELPER_ERRORS.inc(1, backend, name)
+                    raise
+                finally:
+                    HELPER_SECONDS.observe(time.perf_counter() - start, backend, name)
+                    BACKEND_IN_FLIGHT.dec(1, backend)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            BACKEND_IN_FLIGHT.inc(1, backend)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                HELPER_ERRORS.inc(1, backend, name)
+                raise
+            finally:
+                HELPER_SECONDS.observe(time.perf_counter() - start, backend, name)
+                BACKEND_IN_FLIGHT.dec(1, backend)
+        return wrapper
+    return decorate
+
+
+# ---------------- Gauges read at scrape time ---------------- #
+
+@REGISTRY.add_collector
+def _cache_metrics():
+    from figure_cache import figure_cache
+    from swr_cache import landing_cache
+
+    landing, figures = landing_cache.info(), figure_cache.info()
+    yield ("cache_entries", "gauge", "Entries held by each in-process cache.",
+           [({"cache": "landing"}, len(landing["entries"])), ({"cache": "figure"}, figures["entries"])])
+    yield ("cache_events_total", "counter", "Cache lookups by outcome.",
+           [({"cache": "landing", "event": k}, v) for k, v in landing.items() if k != "entries"]
+           + [({"cache": "figure", "event": k}, v) for k, v in figures.items() if k != "entries"])
+    yield ("cache_entry_age_seconds", "gauge", "Age of each stale-while-revalidate entry.",
+           [({"cache": "landing", "key": k}, e["age"]) for k, e in landing["entries"].items()])
+
+
+@REGISTRY.add_collector
+def _singleflight_metrics():
+    import singleflight
+
+    stats = singleflight.stats()
+    yield ("singleflight_calls_total", "counter", "Calls through single_flight, executed or shared.",
+           [({"function": name, "kind": kind}, s[kind])
+            for name, s in sorted(stats.items()) for kind in ("calls", "executions", "shared")])
+
+
+@REGISTRY.add_collector
+def _data_metrics():
+    import snapshot
+    from graph_cache import research_graph
+
+    yield ("data_backend_info", "gauge", "Active data backend (live databases or offline snapshot).",
+           [({"backend": snapshot.BACKEND}, 1)])
+    graph = research_graph._snapshot
+    yield ("research_graph_snapshot_bytes", "gauge", "Memory held by the research graph CSR snapshot.",
+           [({}, graph.nbytes() if graph else 0)])
+    yield ("research_graph_snapshot_age_seconds", "gauge", "Seconds since the research graph snapshot loaded.",
+           [({}, round(time.time() - graph.loaded_at, 1) if graph else -1)])
+
+
+# ---------------- Dash integration ---------------- #
+
+def _callback_name(cb):
+    fn = cb["callback"]
+    return f"{fn.__module__}.{fn.__name__}"
+
+
+def _instrument_callback(fn, name):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            CALLBACK_SECONDS.observe(time.perf_counter() - start, name)
+    return wrapper
+
+
+def install(app):
+    """Time every registered callback and serve /metrics on app.server.
+
+    Call after all widgets have registered their callbacks.
+    """
+    from flask import Response, g, request
+
+    names = {}
+    if ENABLED:
+        for output, cb in app.callback_map.items():
+            names[output] = _callback_name(cb)
+            cb["callback"] = _instrument_callback(cb["callback"], names[output])
+
+        @app.server.before_request
+        def _start_timer():
+            if request.path.endswith("/_dash-update-component"):
+                g.metrics_start = time.perf_counter()
+
+        @app.server.after_request
+        def _record_request(response):
+            start = g.pop("metrics_start", None)
+            if start is not None:
+                body = request.get_json(silent=True) or {}
+                name = names.get(body.get("output"), "unknown")
+                REQUEST_SECONDS.observe(time.perf_counter() - start, name)
+                REQUESTS.inc(1, name, str(response.status_code))
+            return response
+
+    @app.server.route("/metrics")
+    def _metrics():
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
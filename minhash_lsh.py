@@ -0,0 +1,218 @@
+# minhash_lsh.py - "Who works on similar things?" via MinHash + LSH
+#
+# Each faculty's keyword set (Mongo faculty.keywords) is summarised by a
+# MinHash signature. Signatures are split into bands; faculty whose band
+# hashes collide become candidates, and only those are ranked by exact
+# Jaccard similarity. That replaces a quadratic all-pairs comparison with a
+# handful of dict lookups per query. Profiles can be inserted or replaced
+# one at a time. The shared faculty index is built on a background thread
+# (index_loader.py), never on the request path, and rebuilt there when
+# faculty_updates_log grows, so edited profiles reach it without a restart.
+import hashlib
+import logging
+import threading
+
+import lazy_imports
+from index_loader import BackgroundIndex, Warming
+
+np = lazy_imports.module("numpy")
+
+logger = logging.getLogger(__name__)
+
+_PRIME = (1 << 61) - 1
+_MASK32 = 0xFFFFFFFF
+
+
+def _hash32(token):
+    digest = hashlib.blake2b(token.casefold().encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little")
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSH:
+    """MinHash signatures with banded locality-sensitive hashing."""
+
+    # Keyword sets are small and drawn from a large vocabulary, so true
+    # neighbours often have Jaccard of only 0.1-0.3. Two rows per band puts
+    # the LSH threshold near (1/bands) ** (1/rows) ~= 0.09.
+    def __init__(self, num_perm=256, bands=128, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # a < 2^31 and 32-bit inputs keep a*x + b inside uint64
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._tables = [dict() for _ in range(bands)]
+        self._signatures = {}
+        self._bands = {}  # key -> its band hashes, so queries by key skip re-hashing
+        self._sets = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._sets)
+
+    def __contains__(self, key):
+        return key in self._sets
+
+    def signature(self, tokens):
+        prime, mask = np.uint64(_PRIME), np.uint64(_MASK32)
+        hashes = np.fromiter((_hash32(t) for t in tokens), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, mask, dtype=np.uint64)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % prime & mask
+        return permuted.min(axis=1)
+
+    def _band_keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def insert(self, key, tokens):
+        """Add or replace the keyword set stored under key."""
+        tokens = {t.casefold() for t in tokens if t}
+        sig = self.signature(tokens)
+        bands = self._band_keys(sig)
+        with self._lock:
+            self.remove(key)
+            for table, band in zip(self._tables, bands):
+                table.setdefault(band, set()).add(key)
+            self._signatures[key] = sig
+            self._bands[key] = bands
+            self._sets[key] = tokens
+
+    def remove(self, key):
+        with self._lock:
+            self._signatures.pop(key, None)
+            self._sets.pop(key, None)
+            bands = self._bands.pop(key, None)
+            if bands is None:
+                return
+            for table, band in zip(self._tables, bands):
+                bucket = table.get(band)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del table[band]
+
+    def _collisions(self, bands):
+        found = set()
+        for table, band in zip(self._tables, bands):
+            bucket = table.get(band)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def candidates(self, tokens):
+        bands = self._band_keys(self.signature({t.casefold() for t in tokens if t}))
+        with self._lock:
+            return self._collisions(bands)
+
+    def _rank(self, tokens, candidates, k, exclude):
+        scored = [(key, jaccard(tokens, self._sets[key])) for key in candidates if key != exclude]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return [item for item in scored[:k] if item[1] > 0]
+
+    def query(self, tokens, k=10, exclude=None):
+        """Top-k (key, jaccard) among LSH candidates, most similar first."""
+        tokens = {t.casefold() for t in tokens if t}
+        if not tokens:
+            return []
+        bands = self._band_keys(self.signature(tokens))
+        with self._lock:
+            return self._rank(tokens, self._collisions(bands), k, exclude)
+
+    def query_key(self, key, k=10):
+        """Top-k neighbours of an indexed key (the key itself excluded), from its stored bands."""
+        with self._lock:
+            tokens = self._sets.get(key)
+            if not tokens:
+                return []
+            return self._rank(tokens, self._collisions(self._bands[key]), k, key)
+
+    def keywords(self, key):
+        return self._sets.get(key, set())
+
+
+# ---------------- Faculty similarity helpers ---------------- #
+
+_universities = {}
+RETRY_SECONDS = 60
+
+
+def _build(profiles):
+    index = MinHashLSH()
+    universities = {}
+    for profile in profiles:
+        index.insert(profile["name"], profile["keywords"])
+        universities[profile["name"]] = profile.get("university")
+    return index, universities
+
+
+def _load():
+    global _universities
+    from mongodb_utils import get_faculty_keyword_profiles
+
+    profiles = get_faculty_keyword_profiles()
+    if not profiles:
+        return None
+    index, _universities = _build(profiles)
+    return index
+
+
+def _source_version():
+    # Faculty edits (e.g. a rename) land in faculty_updates_log; rebuild when it grows
+    import mysql_utils
+    return mysql_utils.get_faculty_updates_max_id()
+
+
+_index = BackgroundIndex("Keyword MinHash index", _load, version=_source_version, retry_seconds=RETRY_SECONDS)
+
+
+def build_faculty_index(profiles=None):
+    """Build the index from Mongo faculty keyword profiles (or given profiles), synchronously."""
+    global _universities
+    if profiles is None:
+        from mongodb_utils import get_faculty_keyword_profiles
+        profiles = get_faculty_keyword_profiles()
+    index, universities = _build(profiles)
+    if profiles:
+        _universities = universities
+        _index.set(index)
+        logger.info(f"✅ Built keyword MinHash index for {len(index)} faculty")
+    return index
+
+
+def get_faculty_index():
+    """The shared index; None until its background build (retried once a minute) lands."""
+    return _index.get()
+
+
+def find_similar_faculty(name, k=10):
+    """Most similar faculty by keyword-set Jaccard.
+
+    Returns a list of dicts (name, university, similarity, shared keywords);
+    empty if the name is unknown, Warming() while the index is being built.
+    """
+    if not name:
+        return []
+    index = get_faculty_index()
+    if index is None:
+        return Warming()
+    if name not in index:
+        matches = [key for key in index._sets if key.casefold() == name.strip().casefold()]
+        if not matches:
+            return []
+        name = matches[0]
+    own = index.keywords(name)
+    return [{
+        "name": other,
+        "university": _universities.get(other),
+        "similarity": score,
+        "shared": sorted(own & index.keywords(other)),
+    } for other, score in index.query_key(name, k=k)]
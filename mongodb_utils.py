@@ -1,6 +1,15 @@
 # mongodb_utils.py - Cloud-safe MongoDB functions
-from pymongo import MongoClient
-import logging, os
+import lazy_imports
+import logging, os, time
+from singleflight import single_flight, normalize_casefold
+from metrics import timed
+import admission
+import deadlines
+from deadlines import bounded
+import snapshot
+from slow_query_log import literals, record as record_query
+
+pymongo = lazy_imports.module("pymongo")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +31,7 @@ class MongoDBConnection:
             try:
                 # Use environment variable first (Render), fallback to localhost
                 mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-                self._client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
+                self._client = pymongo.MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
                 self._client.admin.command("ping")  # test connection
                 logger.info("✅ Connected to MongoDB successfully")
             except Exception as e:
@@ -35,8 +44,94 @@ class MongoDBConnection:
             self._client.close()
             logger.info("MongoDB connection closed")
 
+# ---------------- Query wrappers (slow-query log) ---------------- #
+
+def _bounded(operation):
+    """Run operation() under pymongo.timeout() for the time left before the deadline.
+
+    pymongo sends the remaining budget as maxTimeMS with every command, so
+    the server abandons the query too.
+    """
+    deadlines.check("mongodb")
+    left = deadlines.remaining()
+    try:
+        with admission.slot("mongodb"):
+            if left is None:
+                return operation()
+            with pymongo.timeout(left):
+                return operation()
+    except pymongo.errors.PyMongoError as e:
+        if e.timeout:
+            raise deadlines.expired("mongodb", str(e)) from e
+        raise
+
+
+def _record(collection, op, document, seconds, rows, explain):
+    record_query("mongodb", {f"{collection.name}.{op}": document}, literals(document), seconds, rows, explain)
+
+
+def _explain(database, command):
+    """The query plan for a command. queryPlanner only plans; executionStats would run the query again."""
+    return database.command("explain", command, verbosity="queryPlanner")
+
+
+def _aggregate(collection, pipeline):
+    """list(collection.aggregate(pipeline)), reported to the slow-query log."""
+    start = time.perf_counter()
+    results = _bounded(lambda: list(collection.aggregate(pipeline)))
+    _record(collection, "aggregate", pipeline, time.perf_counter() - start, len(results),
+            lambda: _explain(collection.database, {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}}))
+    return results
+
+
+def _count(collection, query):
+    """collection.count_documents(query), reported to the slow-query log."""
+    start = time.perf_counter()
+    count = _bounded(lambda: collection.count_documents(query))
+    _record(collection, "count_documents", query, time.perf_counter() - start, 1,
+            lambda: _explain(collection.database, {"count": collection.name, "query": query}))
+    return count
+
+
+def _find(collection, query, projection=None):
+    """list(collection.find(query, projection)), reported to the slow-query log."""
+    start = time.perf_counter()
+    docs = _bounded(lambda: list(collection.find(query, projection)))
+    _record(collection, "find", query, time.perf_counter() - start, len(docs),
+            lambda: _explain(collection.database, {"find": collection.name, "filter": query,
+                                                   **({"projection": projection} if projection else {})}))
+    return docs
+
+# ---------------- Query documents (shared with async_data.py) ---------------- #
+
+def university_filter(university_name):
+    """Faculty whose affiliation matches university_name (case-insensitive regex)."""
+    return {"affiliation.name": {"$regex": university_name.strip(), "$options": "i"}}
+
+
+def university_keywords_pipeline(university_name, limit):
+    return [
+        {"$match": university_filter(university_name)},
+        {"$unwind": "$keywords"},
+        {"$group": {"_id": "$keywords.name", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit}
+    ]
+
+
+def top_keywords_pipeline(limit):
+    return [
+        {"$unwind": "$keywords"},
+        {"$group": {"_id": "$keywords.name", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit}
+    ]
+
 # ---------------- Core query functions ---------------- #
 
+@timed("mongodb")
+@bounded
+@single_flight(normalize=normalize_casefold)  # $regex match is case-insensitive
 def get_keywords_by_university(university_name, limit=20):
     """Get top keywords for faculty at a specific university."""
     if not university_name or not university_name.strip():
@@ -51,15 +146,7 @@ def get_keywords_by_university(university_name, limit=20):
         db = client["academicworld"]
         faculty_collection = db["faculty"]
 
-        pipeline = [
-            {"$match": {"affiliation.name": {"$regex": university_name.strip(), "$options": "i"}}},
-            {"$unwind": "$keywords"},
-            {"$group": {"_id": "$keywords.name", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
-        ]
-
-        results = list(faculty_collection.aggregate(pipeline))
+        results = _aggregate(faculty_collection, university_keywords_pipeline(university_name, limit))
         if results:
             keywords = [doc["_id"] for doc in results]
             counts = [doc["count"] for doc in results]
@@ -70,6 +157,9 @@ def get_keywords_by_university(university_name, limit=20):
         logger.error(f"Error querying keywords for university {university_name}: {e}")
         return [], []
 
+@timed("mongodb")
+@bounded
+@single_flight(normalize=normalize_casefold)
 def get_university_faculty_count(university_name):
     """Get number of faculty members at a university."""
     try:
@@ -80,13 +170,14 @@ def get_university_faculty_count(university_name):
 
         db = client["academicworld"]
         faculty_collection = db["faculty"]
-        return faculty_collection.count_documents({
-            "affiliation.name": {"$regex": university_name.strip(), "$options": "i"}
-        })
+        return _count(faculty_collection, university_filter(university_name))
     except Exception as e:
         logger.error(f"Error counting faculty for {university_name}: {e}")
         return 0
 
+@timed("mongodb")
+@bounded
+@single_flight
 def get_top_keywords(limit=25):
     """Return most common faculty keywords (Widget 1)."""
     try:
@@ -98,14 +189,79 @@ def get_top_keywords(limit=25):
         db = client["academicworld"]
         faculty_collection = db["faculty"]
 
-        pipeline = [
-            {"$unwind": "$keywords"},
-            {"$group": {"_id": "$keywords.name", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
-        ]
-        results = list(faculty_collection.aggregate(pipeline))
+        results = _aggregate(faculty_collection, top_keywords_pipeline(limit))
         return [doc["_id"] for doc in results], [doc["count"] for doc in results]
     except Exception as e:
         logger.error(f"Error in get_top_keywords: {e}")
         return [], []
+
+@timed("mongodb")
+@bounded
+def get_faculty_keyword_profiles():
+    """Return name, university and keyword names of every faculty document."""
+    try:
+        connection = MongoDBConnection()
+        client = connection.get_client()
+        if not client:
+            return []
+
+        db = client["academicworld"]
+        faculty_collection = db["faculty"]
+        cursor = _find(
+            faculty_collection, {}, {"_id": 0, "name": 1, "affiliation.name": 1, "keywords.name": 1}
+        )
+        return [
+            {
+                "name": doc.get("name"),
+                "university": (doc.get("affiliation") or {}).get("name"),
+                "keywords": [kw["name"] for kw in doc.get("keywords") or [] if kw.get("name")],
+            }
+            for doc in cursor if doc.get("name")
+        ]
+    except Exception as e:
+        logger.error(f"Error in get_faculty_keyword_profiles: {e}")
+        return []
+
+# ---------------- Offline snapshot backend ---------------- #
+# DATA_BACKEND=snapshot: same results from the exported SQLite file. The
+# case-insensitive $regex on affiliation.name becomes a LIKE substring match.
+
+if snapshot.ENABLED:
+    @timed("mongodb")
+    @bounded
+    def get_keywords_by_university(university_name, limit=20):
+        """Get top keywords for faculty at a specific university (snapshot)."""
+        if not university_name or not university_name.strip():
+            return [], []
+        rows = snapshot.query(
+            """SELECT k.keyword, COUNT(*) AS count
+               FROM mongo_faculty f JOIN mongo_faculty_keyword k ON k.faculty = f.id
+               WHERE f.university LIKE ? ESCAPE '\\'
+               GROUP BY k.keyword ORDER BY count DESC, k.keyword LIMIT ?""",
+            (snapshot.like_pattern(university_name.strip()), limit))
+        return [r["keyword"] for r in rows], [r["count"] for r in rows]
+
+    @timed("mongodb")
+    @bounded
+    def get_university_faculty_count(university_name):
+        """Get number of faculty members at a university (snapshot)."""
+        rows = snapshot.query("SELECT COUNT(*) AS n FROM mongo_faculty WHERE university LIKE ? ESCAPE '\\'",
+                              (snapshot.like_pattern((university_name or "").strip()),))
+        return rows[0]["n"] if rows else 0
+
+    @timed("mongodb")
+    @bounded
+    def get_top_keywords(limit=25):
+        """Return most common faculty keywords (snapshot)."""
+        rows = snapshot.query("SELECT keyword, count FROM mongo_top_keywords LIMIT ?", (limit,))
+        return [r["keyword"] for r in rows], [r["count"] for r in rows]
+
+    @timed("mongodb")
+    @bounded
+    def get_faculty_keyword_profiles():
+        """Return name, university and keyword names of every faculty (snapshot)."""
+        keywords = {}
+        for row in snapshot.query("SELECT faculty, keyword FROM mongo_faculty_keyword"):
+            keywords.setdefault(row["faculty"], []).append(row["keyword"])
+        return [{"name": row["name"], "university": row["university"], "keywords": keywords.get(row["id"], [])}
+                for row in snapshot.query("SELECT id, name, university FROM mongo_faculty")]
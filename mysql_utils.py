@@ -1,27 +1,135 @@
+import json
 import os
-import pymysql
-from typing import List, Dict, Any
+import re
+import time
+import lazy_imports
+from typing import List, Dict, Any, Optional
+from singleflight import single_flight
+from metrics import timed
+import admission
+import deadlines
+from deadlines import bounded
+import snapshot
+from slow_query_log import record as record_query
 
-def get_mysql_connection():
+pymysql = lazy_imports.module("pymysql")
+
+def connect(**options):
+    """pymysql.connect() with the configured server; raises on failure."""
+    return pymysql.connect(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", "Ian910504#"),
+        db=os.getenv("MYSQL_DB", "academicworld"),
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+        **options
+    )
+
+
+def get_mysql_connection(**options):
     """
     Establish a connection to the MySQL database.
     Uses environment variables if provided; falls back to localhost.
+    Extra keyword options are passed on to pymysql.connect.
+    The connection holds a MySQL admission slot from before it connects
+    until it is closed, so connections are bounded as well as queries.
     """
     try:
-        conn = pymysql.connect(
-            host=os.getenv("MYSQL_HOST", "localhost"),
-            user=os.getenv("MYSQL_USER", "root"),
-            password=os.getenv("MYSQL_PASSWORD", "Ian910504#"),
-            db=os.getenv("MYSQL_DB", "academicworld"),
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return conn
+        deadlines.check("mysql")
+        release = admission.hold("mysql")
+    except deadlines.QueryTimeout as e:
+        print(f"⚠️ MySQL connection not opened: {e}")
+        return None
+    try:
+        left = deadlines.remaining()
+        if left is not None:
+            # Client-side backstop; the MAX_EXECUTION_TIME hint should fire first
+            options.setdefault("read_timeout", left + 1)
+            options.setdefault("write_timeout", left + 1)
+            options.setdefault("connect_timeout", max(1.0, min(10.0, left)))
+        conn = connect(**options)
     except Exception as e:
+        release()
         print(f"⚠️ MySQL connection failed: {e}")
         return None
+    close = conn.close
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            release()
+    conn.close = close_and_release
+    return conn
+
+
+def _explain(query, params):
+    conn = get_mysql_connection()
+    if not conn:
+        return "MySQL not connected."
+    try:
+        with conn.cursor() as cur:
+            cur.execute("EXPLAIN FORMAT=JSON " + query, params)
+            return json.loads(cur.fetchone()["EXPLAIN"])
+    finally:
+        conn.close()
+
+
+_SELECT = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+ER_QUERY_TIMEOUT = 3024  # "maximum statement execution time exceeded"
+CR_SERVER_LOST = 2013
+
 
+def _kill_query(thread_id):
+    """KILL QUERY from a separate connection, once the client stopped waiting."""
+    try:
+        # No admission slot: the query being killed may hold the last one
+        conn = connect(connect_timeout=2)
+    except Exception as e:
+        print(f"❌ KILL QUERY {thread_id} failed: {e}")
+        return
+    try:
+        with conn.cursor() as cur:
+            cur.execute("KILL QUERY %s", (thread_id,))
+    except Exception as e:
+        print(f"❌ KILL QUERY {thread_id} failed: {e}")
+    finally:
+        conn.close()
+
+
+def _execute(cur, query, params=None):
+    """cur.execute() bounded by the current deadline.
 
+    SELECTs get a MAX_EXECUTION_TIME hint for the time left; anything else
+    relies on the connection's read timeout, after which the statement is
+    killed server-side. Slow statements, with their EXPLAIN, go to the
+    slow-query log.
+    """
+    deadlines.check("mysql")
+    sql = query
+    budget = deadlines.budget_ms()
+    if budget is not None and _SELECT.match(query):
+        sql = _SELECT.sub(f"SELECT /*+ MAX_EXECUTION_TIME({budget}) */", query, count=1)
+    start = time.perf_counter()
+    try:
+        cur.execute(sql, params)  # the connection holds the admission slot
+    except pymysql.err.OperationalError as e:
+        code = e.args[0] if e.args else None
+        if code == ER_QUERY_TIMEOUT:
+            raise deadlines.expired("mysql", "MAX_EXECUTION_TIME exceeded") from e
+        if code == CR_SERVER_LOST and budget is not None and deadlines.remaining() == 0:
+            _kill_query(cur.connection.thread_id())
+            raise deadlines.expired("mysql", "read timeout, query killed") from e
+        raise
+    record_query("mysql", query, params, time.perf_counter() - start, cur.rowcount,
+                 explain=lambda: _explain(query, params))
+    return cur.rowcount
+
+
+@timed("mysql")
+@bounded
+@single_flight
 def get_top_faculty_krc_full(limit: int = 25) -> List[Dict[str, Any]]:
     """Get top faculty by KRC score. Returns a list of dictionaries."""
     query = """
@@ -45,7 +153,7 @@ def get_top_faculty_krc_full(limit: int = 25) -> List[Dict[str, Any]]:
 
     try:
         with conn.cursor() as cur:
-            cur.execute(query)
+            _execute(cur, query)
             rows = cur.fetchall()
     except Exception as e:
         print(f"❌ Error fetching KRC: {e}")
@@ -65,6 +173,8 @@ def get_top_faculty_krc_full(limit: int = 25) -> List[Dict[str, Any]]:
     return sorted_rows[:limit]
 
 
+@timed("mysql")
+@bounded
 def update_faculty_interest(name: str, new_interest: str) -> Dict[str, Any]:
     """Update a faculty's research interest."""
     conn = get_mysql_connection()
@@ -74,7 +184,7 @@ def update_faculty_interest(name: str, new_interest: str) -> Dict[str, Any]:
     query = "UPDATE faculty SET research_interest = %s WHERE name = %s"
     try:
         with conn.cursor() as cur:
-            cur.execute(query, (new_interest, name))
+            _execute(cur, query, (new_interest, name))
             conn.commit()
             updated = cur.rowcount > 0
             if updated:
@@ -88,6 +198,9 @@ def update_faculty_interest(name: str, new_interest: str) -> Dict[str, Any]:
         conn.close()
 
 
+@timed("mysql")
+@bounded
+@single_flight
 def get_faculty_analytics(limit=20) -> List[Dict[str, Any]]:
     """Return top faculty analytics with name, position, email, and publication count."""
     query = """
@@ -110,7 +223,7 @@ def get_faculty_analytics(limit=20) -> List[Dict[str, Any]]:
 
     try:
         with conn.cursor() as cur:
-            cur.execute(query, (limit,))
+            _execute(cur, query, (limit,))
             rows = cur.fetchall()
     except Exception as e:
         print(f"❌ Error fetching faculty analytics: {e}")
@@ -131,6 +244,8 @@ def get_faculty_analytics(limit=20) -> List[Dict[str, Any]]:
     return result
 
 
+@timed("mysql")
+@bounded
 def update_faculty_position(name: str, new_position: str) -> Dict[str, Any]:
     """Update the position/title of a faculty member by name."""
     conn = get_mysql_connection()
@@ -140,14 +255,238 @@ def update_faculty_position(name: str, new_position: str) -> Dict[str, Any]:
     query = "UPDATE faculty SET position = %s WHERE name = %s"
     try:
         with conn.cursor() as cur:
-            cur.execute(query, (new_position, name))
+            _execute(cur, query, (new_position, name))
             conn.commit()
             if cur.rowcount == 0:
                 return {"error": f"No faculty found with name '{name}'."}
-            cur.execute("SELECT name, position, email FROM faculty WHERE name = %s", (name,))
+            _execute(cur, "SELECT name, position, email FROM faculty WHERE name = %s", (name,))
             row = cur.fetchone()
             return row or {"error": "Updated but could not fetch record."}
     except Exception as e:
         return {"error": str(e)}
     finally:
         conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_faculty_updates_since(last_id: int, limit: int = 500) -> Optional[List[Dict[str, Any]]]:
+    """Return rows of faculty_updates_log with id > last_id, oldest first (None if unreachable)."""
+    query = """
+        SELECT id, faculty_id, old_name, new_name, old_position, new_position
+        FROM faculty_updates_log
+        WHERE id > %s
+        ORDER BY id ASC
+        LIMIT %s
+    """
+    conn = get_mysql_connection()
+    if not conn:
+        return None
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, query, (last_id, limit))
+            return list(cur.fetchall())
+    except Exception as e:
+        print(f"❌ Error reading faculty_updates_log: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_faculty_updates_max_id() -> Optional[int]:
+    """Return the newest id in faculty_updates_log (0 if empty, None if unreachable)."""
+    conn = get_mysql_connection()
+    if not conn:
+        return None
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, "SELECT COALESCE(MAX(id), 0) AS max_id FROM faculty_updates_log")
+            row = cur.fetchone()
+            return int(row["max_id"]) if row else 0
+    except Exception as e:
+        print(f"❌ Error reading faculty_updates_log: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_faculty_directory() -> List[Dict[str, Any]]:
+    """Return id, name and university of every faculty member."""
+    query = """
+        SELECT f.id, f.name, u.name AS university
+        FROM faculty f
+        LEFT JOIN university u ON f.university_id = u.id
+    """
+    conn = get_mysql_connection()
+    if not conn:
+        return []
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, query)
+            return list(cur.fetchall())
+    except Exception as e:
+        print(f"❌ Error fetching faculty directory: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_faculty_publication_edges() -> List[Dict[str, Any]]:
+    """Return every (faculty_id, publication_id) pair of the bipartite authorship graph."""
+    conn = get_mysql_connection()
+    if not conn:
+        return []
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, "SELECT faculty_id, publication_id FROM faculty_publication")
+            return list(cur.fetchall())
+    except Exception as e:
+        print(f"❌ Error fetching faculty_publication: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_faculty_keyword_weights() -> List[Dict[str, Any]]:
+    """Return KRC weight SUM(score * citations) per (faculty_id, keyword_id)."""
+    query = """
+        SELECT
+            fp.faculty_id,
+            pk.keyword_id,
+            SUM(pk.score * pub.num_citations) AS weight
+        FROM faculty_publication fp
+        JOIN publication pub ON fp.publication_id = pub.id
+        JOIN publication_keyword pk ON pub.id = pk.publication_id
+        GROUP BY fp.faculty_id, pk.keyword_id
+    """
+    conn = get_mysql_connection()
+    if not conn:
+        return []
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, query)
+            return list(cur.fetchall())
+    except Exception as e:
+        print(f"❌ Error fetching faculty keyword weights: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_keyword_names() -> Dict[int, str]:
+    """Return {keyword id: name} for every keyword."""
+    conn = get_mysql_connection()
+    if not conn:
+        return {}
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, "SELECT id, name FROM keyword")
+            return {row["id"]: row["name"] for row in cur.fetchall()}
+    except Exception as e:
+        print(f"❌ Error fetching keywords: {e}")
+        return {}
+    finally:
+        conn.close()
+
+
+@timed("mysql")
+@bounded
+def get_publication_keyword_edges() -> List[Dict[str, Any]]:
+    """Return every (publication_id, keyword_id, score) row of publication_keyword."""
+    conn = get_mysql_connection()
+    if not conn:
+        return []
+
+    try:
+        with conn.cursor() as cur:
+            _execute(cur, "SELECT publication_id, keyword_id, score FROM publication_keyword")
+            return list(cur.fetchall())
+    except Exception as e:
+        print(f"❌ Error fetching publication_keyword: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+# ---------------- Offline snapshot backend ---------------- #
+# With DATA_BACKEND=snapshot the helpers above are replaced by the same
+# queries against the exported SQLite file (see snapshot.py).
+
+if snapshot.ENABLED:
+    @timed("mysql")
+    @bounded
+    def get_top_faculty_krc_full(limit: int = 25) -> List[Dict[str, Any]]:
+        """Get top faculty by KRC score from the snapshot."""
+        return snapshot.query(
+            "SELECT faculty_name, keyword, university, krc FROM krc_top ORDER BY krc DESC LIMIT ?",
+            (limit,))
+
+    @timed("mysql")
+    @bounded
+    def get_faculty_analytics(limit=20) -> List[Dict[str, Any]]:
+        """Return top faculty analytics from the snapshot."""
+        return snapshot.query(
+            """SELECT name, position, email, university, publication_count FROM faculty_analytics
+               ORDER BY publication_count DESC, name ASC LIMIT ?""",
+            (limit,))
+
+    @timed("mysql")
+    @bounded
+    def update_faculty_interest(name: str, new_interest: str) -> Dict[str, Any]:
+        return {"success": False, "message": snapshot.READ_ONLY_MESSAGE}
+
+    @timed("mysql")
+    @bounded
+    def update_faculty_position(name: str, new_position: str) -> Dict[str, Any]:
+        return {"error": snapshot.READ_ONLY_MESSAGE}
+
+    @timed("mysql")
+    @bounded
+    def get_faculty_updates_since(last_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+        return []  # a snapshot never changes
+
+    @timed("mysql")
+    @bounded
+    def get_faculty_updates_max_id() -> int:
+        return 0
+
+    @timed("mysql")
+    @bounded
+    def get_faculty_directory() -> List[Dict[str, Any]]:
+        return snapshot.query("SELECT id, name, university FROM faculty")
+
+    @timed("mysql")
+    @bounded
+    def get_faculty_publication_edges() -> List[Dict[str, Any]]:
+        return snapshot.query("SELECT faculty_id, publication_id FROM faculty_publication")
+
+    @timed("mysql")
+    @bounded
+    def get_faculty_keyword_weights() -> List[Dict[str, Any]]:
+        return snapshot.query("SELECT faculty_id, keyword_id, weight FROM faculty_keyword_weight")
+
+    @timed("mysql")
+    @bounded
+    def get_keyword_names() -> Dict[int, str]:
+        return {row["id"]: row["name"] for row in snapshot.query("SELECT id, name FROM keyword")}
+
+    @timed("mysql")
+    @bounded
+    def get_publication_keyword_edges() -> List[Dict[str, Any]]:
+        return snapshot.query("SELECT publication_id, keyword_id, score FROM publication_keyword")
@@ -1,25 +1,162 @@
-from neo4j import GraphDatabase
+import lazy_imports
+from singleflight import single_flight
+from metrics import timed
+import admission
+import deadlines
+from deadlines import bounded
+from slow_query_log import PROFILE_CYPHER, record as record_query
+import json
+import time
+import snapshot
+
+neo4j = lazy_imports.module("neo4j")
+
+NEO4J_URI = "bolt://localhost:7687"
+NEO4J_AUTH = ("neo4j", "Ian910504")
+
+# Query text shared with the asyncio twin in async_data.py
+# Tried in order until one returns rows (label/relationship spellings vary)
+TOP_PUBLICATION_QUERIES = [
+    # Standard query
+    """
+    MATCH (f:FACULTY {name: $name})-[:PUBLISH]->(p:PUBLICATION)
+    RETURN p.id AS id, p.title AS title, p.numCitations AS cites
+    ORDER BY cites DESC LIMIT 5
+    """,
+    
+    # Case insensitive exact match
+    """
+    MATCH (f:FACULTY)-[:PUBLISH]->(p:PUBLICATION)
+    WHERE toLower(f.name) = toLower($name)
+    RETURN p.id AS id, p.title AS title, p.numCitations AS cites
+    ORDER BY cites DESC LIMIT 5
+    """,
+    
+    # Partial name match
+    """
+    MATCH (f:FACULTY)-[:PUBLISH]->(p:PUBLICATION)
+    WHERE toLower(f.name) CONTAINS toLower($name)
+    RETURN p.id AS id, p.title AS title, p.numCitations AS cites
+    ORDER BY cites DESC LIMIT 5
+    """,
+    
+    # Try different relationship name
+    """
+    MATCH (f:FACULTY {name: $name})-[:AUTHORED]->(p:PUBLICATION)
+    RETURN p.id AS id, p.title AS title, p.numCitations AS cites
+    ORDER BY cites DESC LIMIT 5
+    """,
+    
+    # Try with Faculty label (capital F)
+    """
+    MATCH (f:Faculty {name: $name})-[:PUBLISH]->(p:PUBLICATION)
+    RETURN p.id AS id, p.title AS title, p.numCitations AS cites
+    ORDER BY cites DESC LIMIT 5
+    """
+]
+
+PUBLICATION_KEYWORD_QUERIES = [
+    # Standard query
+    """
+    MATCH (p:PUBLICATION {id: $pid})-[r:LABEL_BY]->(k:KEYWORD)
+    RETURN k.name AS kw, r.score AS score
+    ORDER BY score DESC LIMIT 3
+    """,
+    
+    # Try different relationship names
+    """
+    MATCH (p:PUBLICATION {id: $pid})-[r]->(k:KEYWORD)
+    WHERE type(r) IN ['LABEL_BY', 'TAGGED_BY', 'HAS_KEYWORD']
+    RETURN k.name AS kw, 
+           CASE WHEN r.score IS NOT NULL THEN r.score ELSE 1.0 END AS score
+    ORDER BY score DESC LIMIT 3
+    """,
+    
+    # Generic keyword relationship
+    """
+    MATCH (p:PUBLICATION {id: $pid})-[r]->(k:KEYWORD)
+    RETURN k.name AS kw, 
+           CASE WHEN r.score IS NOT NULL THEN r.score 
+                WHEN r.weight IS NOT NULL THEN r.weight 
+                ELSE 1.0 END AS score
+    ORDER BY score DESC LIMIT 3
+    """,
+    
+    # Try with Keyword label (capital K)
+    """
+    MATCH (p:PUBLICATION {id: $pid})-[r:LABEL_BY]->(k:Keyword)
+    RETURN k.name AS kw, r.score AS score
+    ORDER BY score DESC LIMIT 3
+    """
+]
+
+FIND_FACULTY_QUERY = """
+    MATCH (f:FACULTY)
+    WHERE f.name = $name OR toLower(f.name) CONTAINS toLower($name)
+    RETURN f.id AS id, f.name AS name
+    ORDER BY CASE WHEN f.name = $name THEN 0
+                  WHEN toLower(f.name) = toLower($name) THEN 1
+                  ELSE 2 END, size(f.name)
+    LIMIT 1
+    """
+
+
+def _plan_text(plan, depth=0):
+    """Indented operator tree of an EXPLAIN/PROFILE plan (a dict from the result summary)"""
+    details = plan.get("arguments", {}).get("Details", "")
+    hits = f" rows={plan['rows']} dbHits={plan['dbHits']}" if "dbHits" in plan else ""
+    line = f"{'  ' * depth}{plan.get('operatorType', '?')}{hits} {details}".rstrip()
+    return "\n".join([line] + [_plan_text(child, depth + 1) for child in plan.get("children", [])])
 
 class Neo4jUtils:
     def __init__(self):
-        self.driver = GraphDatabase.driver("bolt://localhost:7687", auth=("neo4j", "Ian910504"))
+        self.driver = neo4j.GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH)
+
+    def _run(self, session, query, **params):
+        """session.run() drained into a list of records, reported to the slow-query log.
+
+        With a deadline, the query runs with the time left as its transaction
+        timeout, so Neo4j terminates it server-side.
+        """
+        deadlines.check("neo4j")
+        left = deadlines.remaining()
+        start = time.perf_counter()
+        try:
+            with admission.slot("neo4j"):
+                records = list(session.run(neo4j.Query(query, timeout=left) if left is not None else query, **params))
+        except neo4j.exceptions.Neo4jError as e:
+            if "TransactionTimedOut" in (e.code or ""):
+                raise deadlines.expired("neo4j", e.message or "transaction timed out") from e
+            raise
+        record_query("neo4j", query, params, time.perf_counter() - start, len(records),
+                     lambda: self._explain(query, params))
+        return records
 
+    def _explain(self, query, params):
+        prefix = "PROFILE" if PROFILE_CYPHER else "EXPLAIN"
+        with self.driver.session(database="academicworld") as session:
+            summary = session.run(f"{prefix} {query}", **params).consume()
+        plan = summary.profile if PROFILE_CYPHER else summary.plan
+        return _plan_text(plan) if plan else "no plan returned"
+
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
     def test_connection(self):
         """Test if the connection works and print database info"""
         try:
             with self.driver.session(database="academicworld") as session:
                 # Test connection
-                result = session.run("RETURN 'Connected to Neo4j' AS message")
-                record = result.single()
+                record = self._run(session, "RETURN 'Connected to Neo4j' AS message")[0]
                 print(f"✅ {record['message']}")
                 
                 # Show available labels
-                result = session.run("CALL db.labels()")
+                result = self._run(session, "CALL db.labels()")
                 labels = [record["label"] for record in result]
                 print(f"Available node labels: {labels}")
                 
                 # Show available relationships
-                result = session.run("CALL db.relationshipTypes()")
+                result = self._run(session, "CALL db.relationshipTypes()")
                 rels = [record["relationshipType"] for record in result]
                 print(f"Available relationships: {rels}")
                 
@@ -28,6 +165,9 @@ class Neo4jUtils:
             print(f"❌ Connection failed: {e}")
             return False
 
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
     def get_sample_faculty_names(self, limit=5):
         """Get some faculty names to test with"""
         queries = [
@@ -40,7 +180,7 @@ class Neo4jUtils:
         with self.driver.session(database="academicworld") as session:
             for query in queries:
                 try:
-                    result = session.run(query, limit=limit)
+                    result = self._run(session, query, limit=limit)
                     names = [record["name"] for record in result if record["name"]]
                     if names:
                         print(f"Found faculty names: {names}")
@@ -51,51 +191,17 @@ class Neo4jUtils:
             print("❌ No faculty found. Check your data loading.")
             return []
 
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
     def get_top_publications(self, faculty_name):
         """Get top publications for a faculty member"""
-        queries = [
-            # Standard query
-            """
-            MATCH (f:FACULTY {name: $name})-[:PUBLISH]->(p:PUBLICATION)
-            RETURN p.id AS id, p.title AS title, p.numCitations AS cites
-            ORDER BY cites DESC LIMIT 5
-            """,
-            
-            # Case insensitive exact match
-            """
-            MATCH (f:FACULTY)-[:PUBLISH]->(p:PUBLICATION)
-            WHERE toLower(f.name) = toLower($name)
-            RETURN p.id AS id, p.title AS title, p.numCitations AS cites
-            ORDER BY cites DESC LIMIT 5
-            """,
-            
-            # Partial name match
-            """
-            MATCH (f:FACULTY)-[:PUBLISH]->(p:PUBLICATION)
-            WHERE toLower(f.name) CONTAINS toLower($name)
-            RETURN p.id AS id, p.title AS title, p.numCitations AS cites
-            ORDER BY cites DESC LIMIT 5
-            """,
-            
-            # Try different relationship name
-            """
-            MATCH (f:FACULTY {name: $name})-[:AUTHORED]->(p:PUBLICATION)
-            RETURN p.id AS id, p.title AS title, p.numCitations AS cites
-            ORDER BY cites DESC LIMIT 5
-            """,
-            
-            # Try with Faculty label (capital F)
-            """
-            MATCH (f:Faculty {name: $name})-[:PUBLISH]->(p:PUBLICATION)
-            RETURN p.id AS id, p.title AS title, p.numCitations AS cites
-            ORDER BY cites DESC LIMIT 5
-            """
-        ]
+        queries = TOP_PUBLICATION_QUERIES
         
         with self.driver.session(database="academicworld") as session:
             for i, query in enumerate(queries):
                 try:
-                    result = session.run(query, name=faculty_name)
+                    result = self._run(session, query, name=faculty_name)
                     records = [record.data() for record in result]
                     if records:
                         print(f"✅ Query {i+1} succeeded, these are top {len(records)} publications")
@@ -107,47 +213,17 @@ class Neo4jUtils:
             print(f"❌ No publications found for '{faculty_name}'")
             return []
 
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
     def get_keywords_for_publication(self, pub_id):
         """Get keywords for a specific publication"""
-        queries = [
-            # Standard query
-            """
-            MATCH (p:PUBLICATION {id: $pid})-[r:LABEL_BY]->(k:KEYWORD)
-            RETURN k.name AS kw, r.score AS score
-            ORDER BY score DESC LIMIT 3
-            """,
-            
-            # Try different relationship names
-            """
-            MATCH (p:PUBLICATION {id: $pid})-[r]->(k:KEYWORD)
-            WHERE type(r) IN ['LABEL_BY', 'TAGGED_BY', 'HAS_KEYWORD']
-            RETURN k.name AS kw, 
-                   CASE WHEN r.score IS NOT NULL THEN r.score ELSE 1.0 END AS score
-            ORDER BY score DESC LIMIT 3
-            """,
-            
-            # Generic keyword relationship
-            """
-            MATCH (p:PUBLICATION {id: $pid})-[r]->(k:KEYWORD)
-            RETURN k.name AS kw, 
-                   CASE WHEN r.score IS NOT NULL THEN r.score 
-                        WHEN r.weight IS NOT NULL THEN r.weight 
-                        ELSE 1.0 END AS score
-            ORDER BY score DESC LIMIT 3
-            """,
-            
-            # Try with Keyword label (capital K)
-            """
-            MATCH (p:PUBLICATION {id: $pid})-[r:LABEL_BY]->(k:Keyword)
-            RETURN k.name AS kw, r.score AS score
-            ORDER BY score DESC LIMIT 3
-            """
-        ]
+        queries = PUBLICATION_KEYWORD_QUERIES
         
         with self.driver.session(database="academicworld") as session:
             for i, query in enumerate(queries):
                 try:
-                    result = session.run(query, pid=pub_id)
+                    result = self._run(session, query, pid=pub_id)
                     records = [record.data() for record in result]
                     if records:
                         print(f"✅ Keyword query {i+1} succeeded, found {len(records)} keywords")
@@ -159,6 +235,9 @@ class Neo4jUtils:
             print(f"❌ No keywords found for publication {pub_id}")
             return []
 
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
     def debug_faculty_structure(self, faculty_name):
         """Debug what properties and relationships a faculty has"""
         query = """
@@ -174,8 +253,8 @@ class Neo4jUtils:
         
         with self.driver.session(database="academicworld") as session:
             try:
-                result = session.run(query, name=faculty_name)
-                record = result.single()
+                records = self._run(session, query, name=faculty_name)
+                record = records[0] if records else None
                 if record:
                     print(f"Faculty: {record['faculty_name']}")
                     print(f"Properties: {record['faculty_properties']}")
@@ -189,7 +268,277 @@ class Neo4jUtils:
                 print(f"Debug query failed: {e}")
                 return None
 
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
+    def find_faculty(self, faculty_name):
+        """Resolve a faculty name to {id, name}: exact, case-insensitive, then partial match"""
+        query = FIND_FACULTY_QUERY
+        with self.driver.session(database="academicworld") as session:
+            try:
+                records = self._run(session, query, name=faculty_name)
+                record = records[0] if records else None
+                return record.data() if record else None
+            except Exception as e:
+                print(f"❌ Faculty lookup failed: {e}")
+                return None
+
+    @timed("neo4j")
+    @bounded
+    @single_flight(skip_self=True)
+    def get_collaboration_hop(self, frontier_ids, pub_cap=8, coauthor_cap=8, edge_limit=500):
+        """Co-authorship edges one hop out from frontier faculty.
+
+        Each faculty contributes at most pub_cap of its most cited publications
+        and each publication at most coauthor_cap co-authors; both caps and the
+        overall edge_limit are applied server-side so high-degree authors
+        cannot blow up the result.
+        """
+        query = """
+        UNWIND $frontier AS fid
+        MATCH (f:FACULTY {id: fid})
+        CALL {
+            WITH f
+            MATCH (f)-[:PUBLISH]->(p:PUBLICATION)
+            RETURN p ORDER BY p.numCitations DESC LIMIT $pub_cap
+        }
+        CALL {
+            WITH f, p
+            MATCH (p)<-[:PUBLISH]-(c:FACULTY)
+            WHERE c <> f
+            RETURN c ORDER BY c.name LIMIT $coauthor_cap
+        }
+        RETURN f.id AS source, p.id AS pub_id, p.title AS title, p.numCitations AS cites,
+               c.id AS coauthor_id, c.name AS coauthor_name
+        LIMIT $edge_limit
+        """
+        if not frontier_ids or edge_limit <= 0:
+            return []
+        with self.driver.session(database="academicworld") as session:
+            try:
+                result = self._run(session, query, frontier=list(frontier_ids), pub_cap=pub_cap,
+                                   coauthor_cap=coauthor_cap, edge_limit=edge_limit)
+                return [record.data() for record in result]
+            except Exception as e:
+                print(f"❌ Collaboration hop query failed: {e}")
+                return []
+
+    def start_collaboration(self, faculty_name, hops=2, node_budget=250, edge_budget=500,
+                            pub_cap=8, coauthor_cap=8):
+        """Initial JSON-able state for expand_collaboration_step (None if not found)"""
+        seed = self.find_faculty(faculty_name)
+        if not seed:
+            return None
+        return {
+            "seed": seed,
+            "hop": 0,
+            "hops": hops,
+            "limits": {"nodes": node_budget, "edges": edge_budget,
+                       "pub_cap": pub_cap, "coauthor_cap": coauthor_cap},
+            "nodes": [{"id": seed["id"], "label": seed["name"], "type": "faculty", "hop": 0}],
+            "edges": [],
+            "frontier": [seed["id"]],
+            "done": False,
+        }
+
+    def expand_collaboration_step(self, state):
+        """Expand one more hop of a collaboration state within its budgets.
+
+        Returns the updated state; nodes and edges are only ever appended, so
+        callers can render each hop incrementally.
+        """
+        if state["done"]:
+            return state
+        limits = state["limits"]
+        node_ids = {n["id"] for n in state["nodes"]}
+        edge_keys = {tuple(e) for e in state["edges"]}
+        nodes, edges = list(state["nodes"]), list(state["edges"])
+        hop = state["hop"] + 1
+
+        records = self.get_collaboration_hop(
+            state["frontier"],
+            pub_cap=limits["pub_cap"],
+            coauthor_cap=limits["coauthor_cap"],
+            edge_limit=max(0, limits["edges"] - len(edges)),
+        )
+
+        next_frontier = []
+        for r in records:
+            if len(edges) >= limits["edges"]:
+                break
+            for node_id, label, node_type in ((r["pub_id"], r["title"], "publication"),
+                                              (r["coauthor_id"], r["coauthor_name"], "faculty")):
+                if node_id not in node_ids:
+                    if len(nodes) >= limits["nodes"]:
+                        break
+                    node_ids.add(node_id)
+                    nodes.append({"id": node_id, "label": label, "type": node_type, "hop": hop,
+                                  "cites": r["cites"] if node_type == "publication" else None})
+                    if node_type == "faculty":
+                        next_frontier.append(node_id)
+            for edge in ((r["source"], r["pub_id"]), (r["pub_id"], r["coauthor_id"])):
+                if edge not in edge_keys and edge[0] in node_ids and edge[1] in node_ids:
+                    edge_keys.add(edge)
+                    edges.append(list(edge))
+
+        done = (hop >= state["hops"] or not next_frontier
+                or len(nodes) >= limits["nodes"] or len(edges) >= limits["edges"])
+        return dict(state, hop=hop, nodes=nodes, edges=edges, frontier=next_frontier, done=done)
+
+    def expand_collaboration(self, faculty_name, **kwargs):
+        """Yield the collaboration state after each hop (see start_collaboration)"""
+        state = self.start_collaboration(faculty_name, **kwargs)
+        while state and not state["done"]:
+            state = self.expand_collaboration_step(state)
+            yield state
+
+    @timed("neo4j")
+    @bounded
+    def get_graph_version(self):
+        """Cheap fingerprint of the research graph (served from Neo4j's count store)"""
+        queries = {
+            "faculty": "MATCH (f:FACULTY) RETURN count(f) AS n",
+            "publish": "MATCH ()-[r:PUBLISH]->() RETURN count(r) AS n",
+            "label_by": "MATCH ()-[r:LABEL_BY]->() RETURN count(r) AS n",
+        }
+        with self.driver.session(database="academicworld") as session:
+            try:
+                return {key: self._run(session, query)[0]["n"] for key, query in queries.items()}
+            except Exception as e:
+                print(f"❌ Graph version query failed: {e}")
+                return None
+
+    @timed("neo4j")
+    @bounded
+    def export_faculty_publications(self):
+        """Every FACULTY-[:PUBLISH]->PUBLICATION edge with publication title and citations"""
+        query = """
+        MATCH (f:FACULTY)-[:PUBLISH]->(p:PUBLICATION)
+        RETURN f.name AS name, p.id AS pub_id, p.title AS title, p.numCitations AS cites,
+               f.id AS faculty_id
+        """
+        with self.driver.session(database="academicworld") as session:
+            return [record.values() for record in self._run(session, query)]
+
+    @timed("neo4j")
+    @bounded
+    def export_publication_keywords(self):
+        """Every PUBLICATION-[:LABEL_BY]->KEYWORD edge with its score"""
+        query = """
+        MATCH (p:PUBLICATION)-[r:LABEL_BY]->(k:KEYWORD)
+        RETURN p.id AS pub_id, k.name AS kw, r.score AS score
+        """
+        with self.driver.session(database="academicworld") as session:
+            return [record.values() for record in self._run(session, query)]
+
     def close(self):
         """Close the database connection"""
         if self.driver:
             self.driver.close()
+
+
+class SnapshotNeo4jUtils(Neo4jUtils):
+    """Neo4jUtils answering from the offline snapshot (DATA_BACKEND=snapshot)"""
+
+    def __init__(self):
+        self.driver = None
+
+    @timed("neo4j")
+    @bounded
+    def test_connection(self):
+        return snapshot.get_connection() is not None
+
+    @timed("neo4j")
+    @bounded
+    def get_sample_faculty_names(self, limit=5):
+        return [r["name"] for r in snapshot.query("SELECT name FROM graph_faculty LIMIT ?", (limit,))]
+
+    @timed("neo4j")
+    @bounded
+    def get_top_publications(self, faculty_name):
+        """Same fallbacks as the Cypher version: exact, case-insensitive, then partial match"""
+        query = """
+        SELECT p.pub_id AS id, p.title AS title, p.cites AS cites
+        FROM graph_faculty f JOIN graph_publish p ON p.faculty_id = f.id
+        WHERE {condition}
+        ORDER BY cites DESC LIMIT 5
+        """
+        for condition, param in (("f.name = ?", faculty_name),
+                                 ("f.name = ? COLLATE NOCASE", faculty_name),
+                                 ("f.name LIKE ? ESCAPE '\\'", snapshot.like_pattern(faculty_name))):
+            records = snapshot.query(query.format(condition=condition), (param,))
+            if records:
+                return records
+        return []
+
+    @timed("neo4j")
+    @bounded
+    def get_keywords_for_publication(self, pub_id):
+        return snapshot.query(
+            "SELECT keyword AS kw, score FROM graph_label WHERE pub_id = ? ORDER BY score DESC LIMIT 3",
+            (pub_id,))
+
+    @timed("neo4j")
+    @bounded
+    def debug_faculty_structure(self, faculty_name):
+        return self.find_faculty(faculty_name)
+
+    @timed("neo4j")
+    @bounded
+    def find_faculty(self, faculty_name):
+        # One query per step, so the exact and case-insensitive steps each use the
+        # name index of their collation; only the partial match scans
+        for condition, param in (("name = ?", faculty_name),
+                                 ("name = ? COLLATE NOCASE", faculty_name),
+                                 ("name LIKE ? ESCAPE '\\'", snapshot.like_pattern(faculty_name))):
+            rows = snapshot.query(f"SELECT id, name FROM graph_faculty WHERE {condition} ORDER BY length(name) LIMIT 1",
+                                  (param,))
+            if rows:
+                return rows[0]
+        return None
+
+    @timed("neo4j")
+    @bounded
+    def get_collaboration_hop(self, frontier_ids, pub_cap=8, coauthor_cap=8, edge_limit=500):
+        query = """
+        WITH pubs AS (
+            SELECT faculty_id AS source, pub_id, title, cites,
+                   ROW_NUMBER() OVER (PARTITION BY faculty_id ORDER BY cites DESC) AS rank
+            FROM graph_publish
+            WHERE faculty_id IN (SELECT value FROM json_each(?))
+        ), coauthors AS (
+            SELECT p.source, p.pub_id, p.title, p.cites, f.id AS coauthor_id, f.name AS coauthor_name,
+                   ROW_NUMBER() OVER (PARTITION BY p.source, p.pub_id ORDER BY f.name) AS rank
+            FROM pubs p
+            JOIN graph_publish c ON c.pub_id = p.pub_id AND c.faculty_id <> p.source
+            JOIN graph_faculty f ON f.id = c.faculty_id
+            WHERE p.rank <= ?
+        )
+        SELECT source, pub_id, title, cites, coauthor_id, coauthor_name
+        FROM coauthors WHERE rank <= ? LIMIT ?
+        """
+        if not frontier_ids or edge_limit <= 0:
+            return []
+        return snapshot.query(query, (json.dumps(list(frontier_ids)), pub_cap, coauthor_cap, edge_limit))
+
+    @timed("neo4j")
+    @bounded
+    def get_graph_version(self):
+        rows = snapshot.query("SELECT key, value FROM meta WHERE key IN ('exported_at', 'graph_publish')")
+        return {r["key"]: r["value"] for r in rows} or None
+
+    @timed("neo4j")
+    @bounded
+    def export_faculty_publications(self):
+        return [tuple(r.values()) for r in snapshot.query(
+            """SELECT f.name, p.pub_id, p.title, p.cites, p.faculty_id
+               FROM graph_publish p JOIN graph_faculty f ON f.id = p.faculty_id""")]
+
+    @timed("neo4j")
+    @bounded
+    def export_publication_keywords(self):
+        return [tuple(r.values()) for r in snapshot.query("SELECT pub_id, keyword, score FROM graph_label")]
+
+
+if snapshot.ENABLED:
+    Neo4jUtils = SnapshotNeo4jUtils
@@ -0,0 +1,247 @@
+# outbox_sync.py - Propagate faculty edits from MySQL to MongoDB and Neo4j
+#
+# faculty_update_trigger writes every name/position change into
+# faculty_updates_log. This consumer tails that table by id watermark,
+# coalesces repeated edits of the same faculty into their final state and
+# applies each batch with one Mongo bulk_write and one Neo4j UNWIND statement.
+# /metrics exports the lag (academicworld_outbox_lag_rows) from the shared
+# checkpoint, so a stalled consumer can be alerted on.
+#
+# Run it next to the dashboard:
+#     python outbox_sync.py              # poll forever
+#     python outbox_sync.py --once       # drain the backlog and exit
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import deadlines
+import mysql_utils
+from metrics import REGISTRY
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NEO4J_UPDATE_QUERY = """
+UNWIND $rows AS row
+MATCH (f:FACULTY {id: row.node_id})
+SET f.name = row.name, f.position = row.position
+RETURN count(f) AS updated
+"""
+
+
+class OutboxConsumer:
+    """Tail faculty_updates_log and apply coalesced edits in batches.
+
+    Every backend is injectable so the consumer can run against local
+    stand-ins (e.g. a mongomock collection and a fake Neo4j driver).
+    """
+
+    def __init__(self, fetch_updates=None, fetch_max_id=None, mongo_collection=None,
+                 neo4j_driver=None, checkpoint_path=None, batch_size=500,
+                 max_retries=5, retry_delay=0.5, neo4j_id_prefix=None):
+        self.fetch_updates = fetch_updates or mysql_utils.get_faculty_updates_since
+        self.fetch_max_id = fetch_max_id or mysql_utils.get_faculty_updates_max_id
+        self._mongo_collection = mongo_collection
+        self._neo4j_driver = neo4j_driver
+        self.checkpoint_path = checkpoint_path or os.getenv(
+            "OUTBOX_CHECKPOINT", "outbox_checkpoint.json")
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # Academic World stores Neo4j faculty ids as "f<mysql id>"
+        self.neo4j_id_prefix = (neo4j_id_prefix if neo4j_id_prefix is not None
+                                else os.getenv("NEO4J_FACULTY_ID_PREFIX", "f"))
+
+        self.last_id = self._load_checkpoint()
+        self.stats = {
+            "rows_read": 0,
+            "faculty_applied": 0,
+            "batches": 0,
+            "retries": 0,
+            "failures": 0,
+            "read_errors": 0,
+            "lag_rows": 0,
+            "last_sync_time": None,
+        }
+
+    # ---------------- Backends ---------------- #
+
+    @property
+    def mongo_collection(self):
+        if self._mongo_collection is None:
+            from mongodb_utils import MongoDBConnection
+            client = MongoDBConnection().get_client()
+            if client is not None:
+                self._mongo_collection = client["academicworld"]["faculty"]
+        return self._mongo_collection
+
+    @property
+    def neo4j_driver(self):
+        if self._neo4j_driver is None:
+            from neo4j_utils import Neo4jUtils
+            self._neo4j_driver = Neo4jUtils().driver
+        return self._neo4j_driver
+
+    # ---------------- Checkpointing ---------------- #
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return int(json.load(f).get("last_id", 0))
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read outbox checkpoint, starting from 0: {e}")
+            return 0
+
+    def _save_checkpoint(self, last_id):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"last_id": last_id, "saved_at": time.time()}, f)
+        os.replace(tmp_path, self.checkpoint_path)  # atomic on POSIX and Windows
+        self.last_id = last_id
+
+    # ---------------- Batch processing ---------------- #
+
+    @staticmethod
+    def coalesce(rows):
+        """Collapse log rows to the final name/position per faculty_id."""
+        changes = {}
+        for row in rows:
+            changes[row["faculty_id"]] = {
+                "faculty_id": row["faculty_id"],
+                "name": row["new_name"],
+                "position": row["new_position"],
+            }
+        return list(changes.values())
+
+    def apply_mongo(self, changes):
+        from pymongo import UpdateOne
+
+        collection = self.mongo_collection
+        if collection is None:
+            raise ConnectionError("MongoDB not available")
+        ops = [
+            UpdateOne({"id": c["faculty_id"]},
+                      {"$set": {"name": c["name"], "position": c["position"]}})
+            for c in changes
+        ]
+        collection.bulk_write(ops, ordered=False)
+
+    def apply_neo4j(self, changes):
+        rows = [
+            {"node_id": f"{self.neo4j_id_prefix}{c['faculty_id']}",
+             "name": c["name"],
+             "position": c["position"]}
+            for c in changes
+        ]
+        with self.neo4j_driver.session(database="academicworld") as session:
+            session.run(NEO4J_UPDATE_QUERY, rows=rows).consume()
+
+    def _apply_with_retry(self, changes):
+        delay = self.retry_delay
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                # Both writes are idempotent "set to final state", so a retry
+                # after a partial failure is safe.
+                self.apply_mongo(changes)
+                self.apply_neo4j(changes)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"❌ Outbox batch failed after {attempt} attempts: {e}")
+                    return False
+                self.stats["retries"] += 1
+                logger.warning(f"⚠️ Outbox batch attempt {attempt} failed, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+        return False
+
+    def run_once(self):
+        """Drain everything after the watermark. Returns faculty rows applied."""
+        applied = 0
+        while True:
+            rows = self.fetch_updates(self.last_id, self.batch_size)
+            if rows is None or isinstance(rows, deadlines.TimedOut):
+                # MySQL couldn't be read: not the same as being caught up
+                self.stats["read_errors"] += 1
+                logger.warning("⚠️ Could not read faculty_updates_log; retrying on the next poll")
+                break
+            if not rows:
+                break
+
+            self.stats["rows_read"] += len(rows)
+            changes = self.coalesce(rows)
+            if not self._apply_with_retry(changes):
+                self.stats["failures"] += 1
+                break
+
+            self._save_checkpoint(max(row["id"] for row in rows))
+            self.stats["batches"] += 1
+            self.stats["faculty_applied"] += len(changes)
+            self.stats["last_sync_time"] = time.time()
+            applied += len(changes)
+            logger.info(f"✅ Synced {len(changes)} faculty ({len(rows)} log rows) up to id {self.last_id}")
+
+            if len(rows) < self.batch_size:
+                break
+
+        self.stats["lag_rows"] = self.lag()
+        return applied
+
+    def lag(self):
+        """Number of log rows not yet applied downstream (None if MySQL can't be read)."""
+        newest = self.fetch_max_id()
+        if newest is None or isinstance(newest, deadlines.TimedOut):
+            return None
+        return max(0, newest - self.last_id)
+
+    def run_forever(self, interval=5.0, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Outbox sync error: {e}")
+            stop_event.wait(interval)
+
+
+@REGISTRY.add_collector
+def _outbox_metrics():
+    # Read from the shared checkpoint, so this works wherever the consumer runs
+    consumer = OutboxConsumer()
+    lag = consumer.lag()
+    yield ("outbox_lag_rows", "gauge", "faculty_updates_log rows not yet applied to MongoDB and Neo4j.",
+           [({}, lag)] if lag is not None else [])
+    yield ("outbox_lag_known", "gauge", "1 if the outbox lag could be read from MySQL.",
+           [({}, 0 if lag is None else 1)])
+    yield ("outbox_checkpoint_id", "gauge", "Last faculty_updates_log id applied downstream.",
+           [({}, consumer.last_id)])
+
+
+def start_background_sync(interval=5.0, **kwargs):
+    """Run an OutboxConsumer in a daemon thread; returns (consumer, stop_event)."""
+    consumer = OutboxConsumer(**kwargs)
+    stop_event = threading.Event()
+    thread = threading.Thread(target=consumer.run_forever, args=(interval, stop_event),
+                              name="outbox-sync", daemon=True)
+    thread.start()
+    return consumer, stop_event
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync faculty_updates_log to MongoDB and Neo4j")
+    parser.add_argument("--once", action="store_true", help="drain the backlog and exit")
+    parser.add_argument("--interval", type=float, default=5.0, help="poll interval in seconds")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    consumer = OutboxConsumer(batch_size=args.batch_size)
+    if args.once:
+        consumer.run_once()
+        print(json.dumps(consumer.stats, indent=2))
+    else:
+        consumer.run_forever(args.interval)
@@ -0,0 +1,242 @@
+# profiling.py - On-demand profiling of single Dash callback requests
+#
+# A /_dash-update-component request carrying an `X-Profile: 1` header or a
+# `profile=1` query flag (on the request itself or on the page URL, which the
+# browser sends as the Referer, so opening /?profile=1 profiles every callback
+# the page fires) is sampled end to end: a background thread records the
+# request thread's stack every PROFILE_INTERVAL_MS. Nothing runs for other
+# requests, so it needs no restart once PROFILING_ENABLED=1.
+#
+# Each profile is written to PROFILE_DIR as
+#   <id>.folded - collapsed stacks for flamegraph.pl, speedscope or inferno
+#   <id>.json   - time split into database, plotly, json and other
+# The response carries X-Profile-Id and a Server-Timing header with the split,
+# and /admin/profiles lists recent profiles. Profiling is off by default, and
+# both the flag and /admin/profiles need ADMIN_TOKEN (X-Admin-Token or
+# token=...): without a token configured the flag is ignored and the admin
+# routes answer 403.
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+# (category, path fragments): the innermost frame matching one decides a sample
+CATEGORIES = (
+    ("database", ("/pymysql/", "/pymongo/", "/bson/", "/neo4j/", "/sqlite3/")),
+    ("json", ("/json/", "/orjson", "/plotly/io/_json.py", "/_plotly_utils/utils.py", "/dash/_utils.py")),
+    ("plotly", ("/plotly/", "/_plotly_utils/")),
+)
+# Our own database entry points, for time spent inside C drivers (sqlite3)
+DATABASE_FUNCTIONS = {("snapshot.py", "query"), ("snapshot.py", "_explain")}
+
+_switch_lock = threading.Lock()
+_active = 0
+_default_switch_interval = sys.getswitchinterval()
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def categorize(stack):
+    """Category of one sample; stack is a list of code objects, root first."""
+    for code in reversed(stack):
+        filename = code.co_filename.replace("\\", "/")
+        if (os.path.basename(filename), code.co_name) in DATABASE_FUNCTIONS:
+            return "database"
+        for category, fragments in CATEGORIES:
+            if any(fragment in filename for fragment in fragments):
+                return category
+    return "other"
+
+
+class Sampler:
+    """Samples one thread's Python stack on a background thread until stop()."""
+
+    def __init__(self, thread_id, interval=INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.categories = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        global _active
+        # A shorter GIL switch interval lets the sampler run close to its schedule
+        with _switch_lock:
+            _active += 1
+            sys.setswitchinterval(min(_default_switch_interval, self.interval / 2))
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        global _active
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        with _switch_lock:
+            _active -= 1
+            if not _active:
+                sys.setswitchinterval(_default_switch_interval)
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if not stack or Sampler.stop.__code__ in stack:
+                continue
+            stack.reverse()
+            key = tuple(stack)
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            category = categorize(stack)
+            self.categories[category] = self.categories.get(category, 0) + 1
+            self.samples += 1
+
+    def folded(self):
+        """Collapsed-stack lines: 'root;child;leaf count'."""
+        return "".join(f"{';'.join(_frame_label(code) for code in stack)} {count}\n"
+                       for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+    def summary(self):
+        """Milliseconds per category, scaled so the categories add up to the wall time."""
+        wall_ms = self.elapsed * 1000
+        per_sample = wall_ms / self.samples if self.samples else 0.0
+        return {
+            "wall_ms": round(wall_ms, 2),
+            "samples": self.samples,
+            "categories_ms": {name: round(self.categories.get(name, 0) * per_sample, 2)
+                              for name in ("database", "plotly", "json", "other")},
+        }
+
+
+def save(profile_id, sampler, details):
+    """Write <id>.folded and <id>.json into PROFILE_DIR; returns the summary dict."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    summary = dict(details, id=profile_id, **sampler.summary())
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.folded"), "w") as f:
+        f.write(sampler.folded())
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    _prune()
+    return summary
+
+
+def _prune():
+    names = sorted(n for n in os.listdir(PROFILE_DIR) if n.endswith(".json"))
+    for name in names[:-KEEP] if KEEP > 0 else []:
+        for ext in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name[:-5] + ext))
+            except OSError:
+                pass
+
+
+def recent():
+    """Summaries of the saved profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    summaries = []
+    for name in sorted((n for n in os.listdir(PROFILE_DIR) if n.endswith(".json")), reverse=True):
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                summaries.append(json.load(f))
+        except Exception:
+            continue
+    return summaries
+
+
+# ---------------- Dash integration ---------------- #
+
+def _flag(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _requested(request):
+    referer = parse_qs(urlparse(request.headers.get("Referer", "")).query)
+    wanted = (_flag(request.headers.get("X-Profile", "")) or _flag(request.args.get("profile", ""))
+              or _flag(referer.get("profile", [""])[0]))
+    if not wanted or not ADMIN_TOKEN:
+        return False
+    return ADMIN_TOKEN in (request.headers.get("X-Admin-Token"), request.args.get("token"),
+                           referer.get("token", [None])[0])
+
+
+def _callback_name(app, output):
+    cb = app.callback_map.get(output)
+    if cb is None:
+        return "unknown"
+    fn = cb["callback"]
+    return f"{fn.__module__}.{fn.__name__}"
+
+
+def install(app):
+    """Profile flagged /_dash-update-component requests and serve /admin/profiles."""
+    from flask import abort, g, jsonify, request, send_from_directory
+
+    if ENABLED and not ADMIN_TOKEN:
+        logger.warning("⚠️ PROFILING_ENABLED=1 but ADMIN_TOKEN is not set; profile flags are ignored")
+
+    if ENABLED and ADMIN_TOKEN:
+        @app.server.before_request
+        def _start_profile():
+            if request.path.endswith("/_dash-update-component") and _requested(request):
+                g.profiler = Sampler(threading.get_ident()).start()
+
+        @app.server.after_request
+        def _finish_profile(response):
+            sampler = g.pop("profiler", None)
+            if sampler is None:
+                return response
+            sampler.stop()
+            body = request.get_json(silent=True) or {}
+            callback = _callback_name(app, body.get("output"))
+            profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-" \
+                         f"{re.sub(r'[^A-Za-z0-9_.-]', '_', callback)}"
+            try:
+                summary = save(profile_id, sampler, {"callback": callback, "status": response.status_code,
+                                                     "time": time.time()})
+            except Exception as e:
+                logger.error(f"❌ Could not save profile {profile_id}: {e}")
+                return response
+            parts = summary["categories_ms"]
+            response.headers["X-Profile-Id"] = profile_id
+            response.headers["Server-Timing"] = ", ".join(
+                [f"{name};dur={ms}" for name, ms in parts.items()] + [f"total;dur={summary['wall_ms']}"])
+            logger.info(f"🔬 Profiled {callback}: {summary['wall_ms']:.1f} ms "
+                        f"({', '.join(f'{k} {v:.1f}' for k, v in parts.items())}) → {profile_id}")
+            return response
+
+    def _check_token():
+        if not ADMIN_TOKEN or ADMIN_TOKEN not in (request.args.get("token"), request.headers.get("X-Admin-Token")):
+            abort(403)
+
+    @app.server.route("/admin/profiles")
+    def _profiles():
+        _check_token()
+        return jsonify(profiles=recent())
+
+    @app.server.route("/admin/profiles/<path:filename>")
+    def _profile_file(filename):
+        _check_token()
+        if not filename.endswith((".folded", ".json")):
+            abort(404)
+        return send_from_directory(os.path.abspath(PROFILE_DIR), filename)
@@ -0,0 +1,205 @@
+# singleflight.py - Coalesce identical concurrent calls into one execution
+#
+# When many users search the same faculty or university at once, each Dash
+# worker thread would otherwise run the same database query. Wrapping a helper
+# with @single_flight makes concurrent calls with the same (function,
+# normalized arguments) wait for the first caller and share its result.
+# Calls are only shared while one is in flight; nothing is cached afterwards.
+# A result the first caller got cut short by its deadline reaches the others
+# as a TimedOut result too, and a waiter whose own deadline passes first stops
+# waiting. When a result was shared, every caller (the first one included)
+# gets its own deep copy, so one caller sorting a list or editing a row dict
+# doesn't change what the others see. Coroutine helpers (the async_data
+# twins) are coalesced the same way on their event loop.
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+
+import deadlines
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "expired", "waiters")
+
+    def __init__(self, event):
+        self.event = event
+        self.result = None
+        self.error = None
+        self.expired = None  # backend whose deadline cut the leader's call short
+        self.waiters = 0
+
+
+def _share(value):
+    """A caller's own copy of a shared result (same types, TimedOut kept)."""
+    return copy.deepcopy(value)
+
+
+class SingleFlight:
+    """Group of in-flight calls keyed by an arbitrary hashable key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {}
+
+    def _join(self, name, key, make_event):
+        """(call, leader) for key, registering a new call if none is in flight."""
+        with self._lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "executions": 0, "shared": 0})
+            stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                stats["shared"] += 1
+                return call, False
+            call = self._calls[key] = _Call(make_event())
+            stats["executions"] += 1
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            self._calls.pop(key, None)
+            shared = call.waiters > 0
+        call.event.set()
+        # Waiters copy call.result, so the leader must not keep the original either
+        return _share(call.result) if shared else call.result
+
+    @staticmethod
+    def _follow(call):
+        if call.error is not None:
+            raise call.error
+        if call.expired is not None:
+            deadlines.mark_expired(call.expired)  # so @bounded counts it for this caller too
+            return deadlines.timed_out(_share(call.result), call.expired)
+        return _share(call.result)
+
+    def do(self, name, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless an identical call is already running."""
+        call, leader = self._join(name, key, threading.Event)
+        if not leader:
+            if not call.event.wait(deadlines.remaining()):
+                # Our deadline passed first. With no time left fn fails fast, at its
+                # first query, and returns the helper's own timed-out fallback
+                return fn(*args, **kwargs)
+            return self._follow(call)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            call.expired = deadlines.expired_backend()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            result = self._finish(key, call)
+        return result
+
+    async def do_async(self, name, key, fn, *args, **kwargs):
+        """await fn(*args, **kwargs) unless an identical call is already running."""
+        call, leader = self._join(name, key, asyncio.Event)
+        if not leader:
+            try:
+                await asyncio.wait_for(call.event.wait(), deadlines.remaining())
+            except asyncio.TimeoutError:
+                return await fn(*args, **kwargs)
+            return self._follow(call)
+
+        try:
+            call.result = await fn(*args, **kwargs)
+            call.expired = deadlines.expired_backend()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            result = self._finish(key, call)
+        return result
+
+    def stats(self):
+        """Per-function counters plus the share of calls served by another caller."""
+        with self._lock:
+            snapshot = {}
+            for name, s in self._stats.items():
+                snapshot[name] = dict(s, dedup_ratio=s["shared"] / s["calls"] if s["calls"] else 0.0)
+            return snapshot
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+default_group = SingleFlight()
+
+
+def _normalize(value):
+    """Make argument values hashable and insensitive to stray whitespace."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    return value
+
+
+def normalize_casefold(value):
+    """Like the default normalizer, but also ignores letter case."""
+    value = _normalize(value)
+    return value.casefold() if isinstance(value, str) else value
+
+
+def single_flight(fn=None, *, normalize=_normalize, skip_self=False, group=None):
+    """Decorator sharing one execution among identical concurrent calls.
+
+    normalize: maps each argument value to its key form (e.g. str.lower for
+        case-insensitive lookups).
+    skip_self: leave the bound instance out of the key so calls through
+        different instances of the same class are coalesced too.
+    """
+    if fn is None:
+        return functools.partial(single_flight, normalize=normalize,
+                                 skip_self=skip_self, group=group)
+
+    sig = inspect.signature(fn)
+    is_async = inspect.iscoroutinefunction(fn)
+    # Coroutines share results only with each other: a thread can't await them
+    name = f"{fn.__module__}.{fn.__qualname__}" if is_async else fn.__qualname__
+
+    def make_key(args, kwargs):
+        try:
+            bound = sig.bind(*args, **kwargs)
+        except TypeError:
+            return None  # let the real call raise the error
+        bound.apply_defaults()
+        items = list(bound.arguments.items())
+        if skip_self:
+            items = items[1:]
+        key = (name, tuple((k, normalize(v)) for k, v in items))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    if is_async:
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            if key is None:
+                return await fn(*args, **kwargs)
+            return await (group or default_group).do_async(name, key, fn, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        if key is None:
+            return fn(*args, **kwargs)
+        return (group or default_group).do(name, key, fn, *args, **kwargs)
+
+    return wrapper
+
+
+def stats():
+    return default_group.stats()
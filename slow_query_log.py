@@ -0,0 +1,168 @@
+# slow_query_log.py - Ring buffer of slow MySQL / MongoDB / Cypher queries
+#
+# The helpers send their queries through thin wrappers (mysql_utils._execute,
+# mongodb_utils._aggregate/_count/_find, Neo4jUtils._run, snapshot.query)
+# that report the elapsed time here. Queries slower than SLOW_QUERY_MS are
+# kept in a bounded ring buffer with normalized text, parameters and row
+# count. Their plan (EXPLAIN FORMAT=JSON, explain(), Cypher EXPLAIN/PROFILE,
+# EXPLAIN QUERY PLAN) is captured afterwards on a background thread, so no
+# request ever waits for it. The newest entries are shown at
+# /admin/slow-queries.
+import html
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+CAPACITY = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+# Cypher plans come from PROFILE (re-runs the query) instead of EXPLAIN
+PROFILE_CYPHER = os.getenv("SLOW_QUERY_PROFILE", "0") == "1"
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+MAX_PARAM_CHARS = 500
+
+
+def normalize(query):
+    """Query text with whitespace collapsed; Mongo documents with literals replaced by '?'."""
+    if isinstance(query, str):
+        return " ".join(query.split())
+    return json.dumps(_shape(query), separators=(",", ":"))
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shape(v) for v in value]
+    # field paths like "$keywords.name" are structure, not parameters
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+
+def literals(query):
+    """The literal values _shape() replaced, in document order (the Mongo 'parameters')."""
+    if isinstance(query, dict):
+        return [v for item in query.values() for v in literals(item)]
+    if isinstance(query, (list, tuple)):
+        return [v for item in query for v in literals(item)]
+    if isinstance(query, str) and query.startswith("$"):
+        return []
+    return [query]
+
+
+class SlowQueryLog:
+    """Bounded log of slow queries with plans captured off the request path."""
+
+    def __init__(self, threshold_ms=THRESHOLD_MS, capacity=CAPACITY, explain_backlog=32):
+        self.threshold_ms = threshold_ms
+        self._entries = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._explains = queue.Queue(maxsize=explain_backlog)
+        self._worker = None
+
+    def record(self, backend, query, params, seconds, rows, explain=None):
+        """Log the query if it was slow; explain() is called later on a worker thread."""
+        ms = seconds * 1000
+        if ms < self.threshold_ms:
+            return None
+        params_text = repr(params)
+        entry = {
+            "id": next(self._ids),
+            "time": time.time(),
+            "backend": backend,
+            "query": normalize(query),
+            "params": params_text if len(params_text) <= MAX_PARAM_CHARS else params_text[:MAX_PARAM_CHARS] + "…",
+            "duration_ms": round(ms, 1),
+            "rows": rows,
+            "plan": "pending" if explain else None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning(f"🐢 Slow {backend} query: {ms:.0f} ms, {rows} rows: {entry['query'][:120]}")
+        if explain:
+            try:
+                self._explains.put_nowait((entry, explain))
+                self._ensure_worker()
+            except queue.Full:
+                entry["plan"] = "skipped (explain backlog full)"
+        return entry
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_loop, name="slow-query-explain",
+                                                daemon=True)
+                self._worker.start()
+
+    def _explain_loop(self):
+        while True:
+            entry, explain = self._explains.get()
+            try:
+                plan = explain()
+                entry["plan"] = plan if isinstance(plan, str) else json.dumps(plan, indent=1, default=str)
+            except Exception as e:
+                entry["plan"] = f"EXPLAIN failed: {e}"
+
+    def entries(self):
+        """Logged queries, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog()
+
+
+def record(backend, query, params, seconds, rows, explain=None):
+    return slow_queries.record(backend, query, params, seconds, rows, explain)
+
+
+# ---------------- Admin page ---------------- #
+
+def _render(entries, threshold_ms):
+    rows = "".join(
+        f"<tr><td>{time.strftime('%H:%M:%S', time.localtime(e['time']))}</td>"
+        f"<td>{html.escape(e['backend'])}</td><td>{e['duration_ms']:,.1f}</td><td>{e['rows']}</td>"
+        f"<td><code>{html.escape(e['query'])}</code><br><small>params: {html.escape(e['params'])}</small>"
+        f"<details><summary>plan</summary><pre>{html.escape(str(e['plan']))}</pre></details></td></tr>"
+        for e in entries
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Slow queries</title><style>"
+        "body{font-family:sans-serif;margin:20px;color:#2c3e50}table{border-collapse:collapse;width:100%}"
+        "td,th{border-bottom:1px solid #ecf0f1;padding:6px 8px;text-align:left;vertical-align:top;font-size:13px}"
+        "th{border-bottom:2px solid #3498db}code{white-space:pre-wrap}pre{max-height:400px;overflow:auto}"
+        "</style></head><body>"
+        f"<h2>🐢 Slow queries (≥ {threshold_ms:g} ms, newest first)</h2>"
+        "<table><tr><th>Time</th><th>Backend</th><th>ms</th><th>Rows</th><th>Query</th></tr>"
+        f"{rows or '<tr><td colspan=5>None recorded yet.</td></tr>'}</table></body></html>"
+    )
+
+
+def install(app):
+    """Serve the log at /admin/slow-queries (?format=json for JSON).
+
+    Needs ADMIN_TOKEN, passed as ?token=... or an X-Admin-Token header; without
+    a token configured the route answers 403.
+    """
+    from flask import Response, abort, jsonify, request
+
+    @app.server.route("/admin/slow-queries")
+    def _slow_queries():
+        if not ADMIN_TOKEN or ADMIN_TOKEN not in (request.args.get("token"), request.headers.get("X-Admin-Token")):
+            abort(403)
+        entries = slow_queries.entries()
+        if request.args.get("format") == "json":
+            return jsonify(threshold_ms=slow_queries.threshold_ms, entries=entries)
+        return Response(_render(entries, slow_queries.threshold_ms), mimetype="text/html")
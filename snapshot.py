@@ -0,0 +1,281 @@
+# snapshot.py - Offline snapshot of everything the widgets read
+#
+# `python snapshot.py export` copies the inputs of every widget out of MySQL,
+# MongoDB and Neo4j into a single SQLite file. Starting the app with
+# DATA_BACKEND=snapshot makes mysql_utils, mongodb_utils and Neo4jUtils answer
+# from that file instead: it is opened read-only and memory-mapped, so the
+# dashboard runs with no database servers and lookups are indexed reads from
+# the page cache. Updates are refused in snapshot mode.
+#
+#     python snapshot.py export [--path academicworld_snapshot.sqlite]
+#     python snapshot.py info
+#     DATA_BACKEND=snapshot python app.py
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import deadlines
+from slow_query_log import record as record_query
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKEND = os.getenv("DATA_BACKEND", "live").strip().lower()
+ENABLED = BACKEND == "snapshot"
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "academicworld_snapshot.sqlite")
+MMAP_BYTES = int(os.getenv("SNAPSHOT_MMAP_BYTES", str(1 << 30)))
+READ_ONLY_MESSAGE = "Read-only snapshot mode: updates are disabled."
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+
+-- MongoDB: faculty documents (affiliation.name, keywords[].name)
+CREATE TABLE mongo_faculty (id INTEGER PRIMARY KEY, name TEXT, university TEXT);
+CREATE TABLE mongo_faculty_keyword (faculty INTEGER, keyword TEXT);
+CREATE TABLE mongo_top_keywords (keyword TEXT, count INTEGER);
+
+-- MySQL: widget results plus the tables the offline jobs read
+CREATE TABLE krc_top (faculty_name TEXT, keyword TEXT, university TEXT, krc REAL);
+CREATE TABLE faculty_analytics (name TEXT, position TEXT, email TEXT, university TEXT,
+                                publication_count INTEGER);
+CREATE TABLE faculty (id INTEGER PRIMARY KEY, name TEXT, university TEXT);
+CREATE TABLE faculty_publication (faculty_id INTEGER, publication_id INTEGER);
+CREATE TABLE publication_keyword (publication_id INTEGER, keyword_id INTEGER, score REAL);
+CREATE TABLE keyword (id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE faculty_keyword_weight (faculty_id INTEGER, keyword_id INTEGER, weight REAL);
+
+-- Neo4j: FACULTY-[:PUBLISH]->PUBLICATION-[:LABEL_BY]->KEYWORD
+CREATE TABLE graph_faculty (id, name TEXT);
+CREATE TABLE graph_publish (faculty_id, pub_id, title TEXT, cites INTEGER);
+CREATE TABLE graph_label (pub_id, keyword TEXT, score REAL);
+"""
+
+INDEXES = """
+CREATE INDEX idx_mongo_faculty_university ON mongo_faculty (university);
+CREATE INDEX idx_mongo_faculty_keyword ON mongo_faculty_keyword (faculty);
+CREATE INDEX idx_krc_top ON krc_top (krc DESC);
+CREATE INDEX idx_faculty_analytics ON faculty_analytics (publication_count DESC, name);
+CREATE INDEX idx_graph_faculty_id ON graph_faculty (id);
+-- One index per collation: exact `name = ?` lookups need BINARY, the
+-- case-insensitive fallback (`name = ? COLLATE NOCASE`) needs NOCASE
+CREATE INDEX idx_graph_faculty_name ON graph_faculty (name);
+CREATE INDEX idx_graph_faculty_name_nocase ON graph_faculty (name COLLATE NOCASE);
+CREATE INDEX idx_graph_publish_faculty ON graph_publish (faculty_id, cites DESC);
+CREATE INDEX idx_graph_publish_pub ON graph_publish (pub_id);
+CREATE INDEX idx_graph_label_pub ON graph_label (pub_id, score DESC);
+"""
+
+
+# ---------------- Reading ---------------- #
+
+_local = threading.local()
+
+
+def _connect(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+def get_connection(path=SNAPSHOT_PATH):
+    """Per-thread read-only connection to the snapshot (None if it is missing)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ Snapshot file {path} not found; run `python snapshot.py export`")
+            return None
+        conn = _local.conn = _connect(path)
+    return conn
+
+
+def query(sql, params=()):
+    """Run a read query against the snapshot; list of dicts ([] on error)."""
+    conn = get_connection()
+    if conn is None:
+        return []
+    left = deadlines.remaining()
+    if left is not None:
+        if left <= 0:
+            deadlines.expired("snapshot")
+            return []
+        # SQLite has no statement timeout; the progress handler interrupts it instead
+        until = time.monotonic() + left
+        conn.set_progress_handler(lambda: time.monotonic() > until, 1000)
+    try:
+        start = time.perf_counter()
+        rows = [dict(row) for row in conn.execute(sql, params)]
+        record_query("snapshot", sql, params, time.perf_counter() - start, len(rows),
+                     lambda: _explain(sql, params))
+        return rows
+    except sqlite3.OperationalError as e:
+        if left is not None and "interrupted" in str(e):
+            deadlines.expired("snapshot", "statement interrupted")
+        else:
+            logger.error(f"❌ Snapshot query failed: {e}")
+        return []
+    except Exception as e:
+        logger.error(f"❌ Snapshot query failed: {e}")
+        return []
+    finally:
+        if left is not None:
+            conn.set_progress_handler(None, 0)
+
+
+def _explain(sql, params):
+    conn = _connect(SNAPSHOT_PATH)
+    try:
+        return "\n".join(f"{row['id']:>3} {row['parent']:>3} {row['detail']}"
+                         for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    finally:
+        conn.close()
+
+
+def like_pattern(text):
+    """Escape LIKE wildcards so text matches as a plain substring."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# ---------------- Export ---------------- #
+
+def _insert(conn, table, columns, rows):
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                     ([row[c] for c in columns] for row in rows))
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def write(path, profiles, krc_top, analytics, directory, authorship, publication_keywords,
+          keyword_names, keyword_weights, graph_publications, graph_keywords):
+    """Write a snapshot file from already-collected rows (same shapes as the helpers return).
+
+    graph_publications are (name, pub_id, title, cites, faculty_id) tuples and
+    graph_keywords (pub_id, keyword, score) tuples, as exported from Neo4j.
+    """
+    start = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    counts = {}
+    try:
+        conn.executescript(SCHEMA)
+
+        # MongoDB
+        conn.executemany("INSERT INTO mongo_faculty (id, name, university) VALUES (?, ?, ?)",
+                         ((i, p["name"], p["university"]) for i, p in enumerate(profiles)))
+        conn.executemany("INSERT INTO mongo_faculty_keyword (faculty, keyword) VALUES (?, ?)",
+                         ((i, kw) for i, p in enumerate(profiles) for kw in p["keywords"]))
+        conn.execute("""
+            INSERT INTO mongo_top_keywords (keyword, count)
+            SELECT keyword, COUNT(*) FROM mongo_faculty_keyword
+            GROUP BY keyword ORDER BY COUNT(*) DESC, keyword
+        """)
+        counts["mongo_faculty"] = len(profiles)
+
+        # MySQL
+        counts["krc_top"] = _insert(conn, "krc_top", ("faculty_name", "keyword", "university", "krc"), krc_top)
+        counts["faculty_analytics"] = _insert(
+            conn, "faculty_analytics", ("name", "position", "email", "university", "publication_count"),
+            analytics)
+        counts["faculty"] = _insert(conn, "faculty", ("id", "name", "university"), directory)
+        counts["faculty_publication"] = _insert(conn, "faculty_publication",
+                                                ("faculty_id", "publication_id"), authorship)
+        counts["publication_keyword"] = _insert(conn, "publication_keyword",
+                                                ("publication_id", "keyword_id", "score"),
+                                                publication_keywords)
+        conn.executemany("INSERT INTO keyword (id, name) VALUES (?, ?)", keyword_names.items())
+        counts["faculty_keyword_weight"] = _insert(conn, "faculty_keyword_weight",
+                                                   ("faculty_id", "keyword_id", "weight"), keyword_weights)
+
+        # Neo4j
+        faculty = {(fid, name) for name, _, _, _, fid in graph_publications}
+        conn.executemany("INSERT INTO graph_faculty (id, name) VALUES (?, ?)", sorted(faculty, key=str))
+        conn.executemany("INSERT INTO graph_publish (faculty_id, pub_id, title, cites) VALUES (?, ?, ?, ?)",
+                         ((fid, pub_id, title, cites) for _, pub_id, title, cites, fid in graph_publications))
+        conn.executemany("INSERT INTO graph_label (pub_id, keyword, score) VALUES (?, ?, ?)", graph_keywords)
+        counts["graph_publish"] = len(graph_publications)
+        counts["graph_label"] = conn.execute("SELECT COUNT(*) FROM graph_label").fetchone()[0]
+
+        conn.executescript(INDEXES)
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                         [("exported_at", str(time.time()))] + [(k, str(v)) for k, v in counts.items()])
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+    empty = [name for name, n in counts.items() if not n]
+    if empty:
+        logger.warning(f"⚠️ Snapshot tables left empty (source unavailable?): {', '.join(empty)}")
+    logger.info(f"✅ Snapshot written to {path} ({os.path.getsize(path) / 1e6:.1f} MB) "
+                f"in {time.perf_counter() - start:.1f}s")
+    return counts
+
+
+def export(path=SNAPSHOT_PATH):
+    """Dump the widget inputs from the live databases into a new snapshot file."""
+    if ENABLED:
+        raise SystemExit("❌ export reads the live databases; unset DATA_BACKEND=snapshot first")
+    import mysql_utils
+    import mongodb_utils
+    from neo4j_utils import Neo4jUtils
+
+    db = Neo4jUtils()
+    try:
+        graph_publications = db.export_faculty_publications()
+        graph_keywords = db.export_publication_keywords()
+    except Exception as e:
+        logger.warning(f"⚠️ Neo4j export failed: {e}")
+        graph_publications, graph_keywords = [], []
+    finally:
+        db.close()
+
+    return write(
+        path,
+        profiles=mongodb_utils.get_faculty_keyword_profiles(),
+        krc_top=mysql_utils.get_top_faculty_krc_full(limit=sys.maxsize),
+        analytics=mysql_utils.get_faculty_analytics(limit=sys.maxsize),
+        directory=mysql_utils.get_faculty_directory(),
+        authorship=mysql_utils.get_faculty_publication_edges(),
+        publication_keywords=mysql_utils.get_publication_keyword_edges(),
+        keyword_names=mysql_utils.get_keyword_names(),
+        keyword_weights=mysql_utils.get_faculty_keyword_weights(),
+        graph_publications=graph_publications,
+        graph_keywords=graph_keywords,
+    )
+
+
+def info(path=SNAPSHOT_PATH):
+    if not os.path.exists(path):
+        print(f"❌ No snapshot at {path}")
+        return None
+    conn = _connect(path)
+    try:
+        meta = {row["key"]: row["value"] for row in conn.execute("SELECT key, value FROM meta")}
+    finally:
+        conn.close()
+    exported = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(meta.pop("exported_at", 0))))
+    print(f"📦 {path}: exported {exported}")
+    for key, value in meta.items():
+        print(f"   {key}: {value}")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or inspect the offline data snapshot")
+    parser.add_argument("command", choices=["export", "info"])
+    parser.add_argument("--path", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+    if args.command == "export":
+        export(args.path)
+    else:
+        info(args.path)
@@ -0,0 +1,151 @@
+# swr_cache.py - Stale-while-revalidate cache for expensive widget data
+#
+# Entries younger than soft_ttl are served as-is. Between soft_ttl and
+# hard_ttl the cached value is still served immediately, and a single
+# background thread reloads it. Only a missing entry or one older than
+# hard_ttl is loaded on the request path. Failed loads back off
+# exponentially so a down database isn't hammered on every page view: until
+# the backoff ends, even an expired entry keeps being served as is, and a
+# reload that fails keeps the last good value (counted as an expired hit).
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "loaded_at", "refreshing", "failures", "retry_at")
+
+    def __init__(self, value, loaded_at):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.refreshing = False
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class SWRCache:
+    """Keyed cache with soft/hard TTLs and background revalidation."""
+
+    def __init__(self, soft_ttl=300, hard_ttl=3600, failure_backoff=15, max_backoff=600):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.failure_backoff = failure_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._entries = {}
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "expired_hits": 0, "misses": 0,
+                      "refreshes": 0, "refresh_failures": 0}
+
+    def get(self, key, loader, accept=bool):
+        """Return the value for key, calling loader() when it must be (re)built.
+
+        accept decides whether a loaded value is usable; helpers in this repo
+        return empty results instead of raising when a database is down, and
+        those must not replace a good cached value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.loaded_at < self.hard_ttl:
+                if now - entry.loaded_at < self.soft_ttl:
+                    self.stats["fresh_hits"] += 1
+                elif not entry.refreshing and now >= entry.retry_at:
+                    entry.refreshing = True
+                    self.stats["stale_hits"] += 1
+                    threading.Thread(target=self._refresh, args=(key, loader, accept),
+                                     name=f"swr-refresh-{key}", daemon=True).start()
+                else:
+                    self.stats["stale_hits"] += 1
+                return entry.value
+            if entry is not None and now < entry.retry_at:
+                # Expired, but the last load failed: no new attempt until the backoff ends
+                self.stats["expired_hits"] += 1
+                return entry.value
+            self.stats["misses"] += 1
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Cold or expired: load on the request path, one caller at a time.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                now = time.monotonic()
+                if entry is not None and (now - entry.loaded_at < self.hard_ttl or now < entry.retry_at):
+                    return entry.value
+            value = self._load(loader)
+            ok = value is not None and accept(value)
+            self._store(key, value, ok)
+            if not ok and entry is not None:
+                logger.warning(f"⚠️ Reloading cached {key} failed; serving the value from "
+                               f"{now - entry.loaded_at:.0f}s ago")
+                with self._lock:
+                    self.stats["expired_hits"] += 1
+                return entry.value
+            return value
+
+    def _load(self, loader):
+        try:
+            return loader()
+        except Exception as e:
+            logger.error(f"❌ Cache load failed: {e}")
+            return None
+
+    def _store(self, key, value, ok):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if ok or entry is None:
+                entry = self._entries[key] = _Entry(value, now)
+            if not ok:
+                # Keep serving what we have, but look again after a backoff.
+                entry.failures += 1
+                entry.retry_at = now + min(self.failure_backoff * 2 ** (entry.failures - 1),
+                                           self.max_backoff)
+                if entry.value is value:
+                    # A cold miss that failed: treat it as stale so it is retried
+                    # in the background rather than on the next request.
+                    entry.loaded_at = now - self.soft_ttl
+            entry.refreshing = False
+
+    def _refresh(self, key, loader, accept):
+        value = self._load(loader)
+        ok = value is not None and accept(value)
+        with self._lock:
+            self.stats["refreshes"] += 1
+            if not ok:
+                self.stats["refresh_failures"] += 1
+        if ok:
+            logger.info(f"🔄 Refreshed cached {key}")
+        self._store(key, value if ok else None, ok)
+
+    def prime(self, key, value, accept=bool):
+        """Store a value loaded elsewhere (e.g. fetched together with other keys at startup)."""
+        if value is not None and accept(value):
+            self._store(key, value, True)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def info(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "entries": {k: {"age": round(now - e.loaded_at, 1), "failures": e.failures,
+                                "expired": now - e.loaded_at >= self.hard_ttl}
+                            for k, e in self._entries.items()},
+                **self.stats,
+            }
+
+
+landing_cache = SWRCache(
+    soft_ttl=float(os.getenv("WIDGET_CACHE_SOFT_TTL", "300")),
+    hard_ttl=float(os.getenv("WIDGET_CACHE_HARD_TTL", "3600")),
+    failure_backoff=float(os.getenv("WIDGET_CACHE_RETRY_BACKOFF", "15")),
+)
@@ -0,0 +1,467 @@
+# synthetic_data.py - Deterministic synthetic Academic World at any scale
+#
+# Generates schema-compatible data for all three databases from one seed:
+#   MySQL   university, keyword, faculty, publication and the join tables
+#   MongoDB faculty documents (affiliation, keywords) and publications
+#   Neo4j   FACULTY / INSTITUTE / PUBLICATION / KEYWORD graph
+# Faculty productivity and university sizes follow Pareto distributions,
+# keyword popularity a Zipf law and citations a heavy-tailed Pareto, so a few
+# authors, topics and papers dominate the way they do in real data. Co-authors
+# come from the first author's university with probability `locality`.
+#
+# Scale 1 is 2.5k faculty and 40k publications; every count grows linearly.
+#
+#     python synthetic_data.py --scale 10                 # TSV files only
+#     python synthetic_data.py --scale 10 --mysql --mongo --neo4j --replace
+#     python synthetic_data.py --scale 100 --snapshot synthetic.sqlite
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASE_COUNTS = {"universities": 100, "faculty": 2_500, "publications": 40_000, "keywords": 3_000}
+OUTPUT_DIR = "synthetic_out"
+BATCH_SIZE = 10_000
+
+FIRST_NAMES = ["Alice", "Bo", "Carlos", "Dana", "Elif", "Feng", "Grace", "Hiro", "Ines", "Jamal",
+               "Kavya", "Luca", "Mei", "Nikolai", "Olu", "Priya", "Quinn", "Rosa", "Sven", "Tariq",
+               "Uma", "Victor", "Wei", "Ximena", "Yusuf", "Zoe", "Anika", "Ben", "Chloe", "Diego",
+               "Emma", "Farid", "Gita", "Hugo", "Ivy", "Jonas", "Kenji", "Lena", "Mateo", "Nadia"]
+LAST_NAMES = ["Abbott", "Bauer", "Chen", "Diaz", "Eriksen", "Fischer", "Gupta", "Haddad", "Ito",
+              "Jensen", "Kim", "Lopez", "Murphy", "Nguyen", "Okafor", "Patel", "Quist", "Rossi",
+              "Singh", "Tanaka", "Ueda", "Vargas", "Wang", "Xu", "Yilmaz", "Zhang", "Adler", "Brown",
+              "Costa", "Dubois", "Evans", "Ferreira", "Garcia", "Hoffman", "Iqbal", "Jones", "Kowalski",
+              "Larsen", "Moreau", "Novak"]
+PLACES = ["Northfield", "Lakeside", "Riverton", "Eastbrook", "Westmoor", "Hillcrest", "Oakridge",
+          "Pinecrest", "Stonebridge", "Fairview", "Maplewood", "Ashford", "Brighton", "Clearwater",
+          "Danbury", "Elmstead", "Glenwood", "Harborview", "Ironwood", "Kingsport"]
+UNIVERSITY_KINDS = ["University", "State University", "Institute of Technology", "College",
+                    "Polytechnic"]
+TOPIC_PREFIXES = ["distributed", "probabilistic", "neural", "secure", "scalable", "interactive",
+                  "quantum", "approximate", "federated", "robust", "embedded", "semantic",
+                  "parallel", "adaptive", "formal", "statistical", "visual", "energy-efficient",
+                  "causal", "streaming"]
+TOPIC_NOUNS = ["systems", "inference", "networks", "databases", "learning", "compilers",
+               "algorithms", "graphics", "cryptography", "robotics", "verification", "retrieval",
+               "optimization", "storage", "vision", "languages", "sensing", "scheduling",
+               "simulation", "analytics"]
+VENUES = ["SIGMOD", "VLDB", "ICDE", "NeurIPS", "ICML", "KDD", "WWW", "SOSP", "OSDI", "CHI",
+          "CVPR", "ACL", "PLDI", "CCS", "STOC", "SIGCOMM"]
+POSITIONS = ["Professor", "Associate Professor", "Assistant Professor", "Lecturer", "Research Professor"]
+POSITION_WEIGHTS = [0.35, 0.25, 0.25, 0.1, 0.05]
+
+# (table, columns) in load order
+MYSQL_TABLES = [
+    ("university", ("id", "name", "photo_url")),
+    ("keyword", ("id", "name")),
+    ("faculty", ("id", "name", "position", "research_interest", "email", "phone", "photo_url",
+                 "university_id")),
+    ("publication", ("id", "title", "venue", "year", "num_citations")),
+    ("faculty_keyword", ("faculty_id", "keyword_id", "score")),
+    ("faculty_publication", ("faculty_id", "publication_id")),
+    ("publication_keyword", ("publication_id", "keyword_id", "score")),
+]
+
+
+def _combine(i, first, second, sep=" "):
+    """i-th distinct name from two word lists, numbered once the pairs run out."""
+    pairs = len(first) * len(second)
+    name = f"{first[i % len(first)]}{sep}{second[(i // len(first)) % len(second)]}"
+    return name if i < pairs else f"{name} {i // pairs + 1}"
+
+
+def _pareto_weights(rng, n, alpha, cap=None):
+    """Pareto weights normalised to 1, optionally capped at cap × the minimum."""
+    weights = rng.pareto(alpha, n) + 1.0
+    if cap:
+        weights = np.minimum(weights, cap)
+    return weights / weights.sum()
+
+
+def _zipf_weights(rng, n, s):
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return rng.permutation(weights / weights.sum())
+
+
+def _unique_pairs(rows, cols, n_cols):
+    """De-duplicated (row, col) pairs sorted by row then col."""
+    keys = np.unique(rows.astype(np.int64) * n_cols + cols)
+    return keys // n_cols, keys % n_cols
+
+
+def _top_per_row(matrix, k):
+    """(rows, cols, values) of the k largest entries in each CSR row."""
+    coo = matrix.tocoo()
+    order = np.lexsort((-coo.data, coo.row))
+    rows, cols, data = coo.row[order], coo.col[order], coo.data[order]
+    starts = np.searchsorted(rows, rows, side="left")
+    keep = np.arange(rows.size) - starts < k
+    return rows[keep], cols[keep], data[keep]
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SyntheticWorld:
+    """All entities and relationships of one generated dataset, as numpy arrays.
+
+    Array positions are 0-based; database ids are position + 1 (MySQL, Mongo)
+    or a prefixed string such as "f12" (Neo4j).
+    """
+
+    def __init__(self, scale=1.0, seed=0, faculty_alpha=1.5, university_alpha=1.2,
+                 keyword_zipf=1.1, citation_alpha=1.3, mean_authors=3.0, mean_keywords=4.0,
+                 locality=0.6, max_productivity=50.0, max_citations=100_000, keywords_per_faculty=10):
+        rng = np.random.default_rng(seed)
+        counts = {key: max(1, int(round(n * scale))) for key, n in BASE_COUNTS.items()}
+        n_uni, n_fac = counts["universities"], counts["faculty"]
+        n_pub, n_kw = counts["publications"], counts["keywords"]
+        self.counts = counts
+        self.keywords_per_faculty = keywords_per_faculty
+
+        self.university_names = [_combine(i, PLACES, UNIVERSITY_KINDS) for i in range(n_uni)]
+        self.keyword_names = [_combine(i, TOPIC_PREFIXES, TOPIC_NOUNS) for i in range(n_kw)]
+        self.faculty_names = [_combine(i, FIRST_NAMES, LAST_NAMES) for i in range(n_fac)]
+
+        # Faculty are grouped by university so each one owns a contiguous id range
+        self.faculty_university = np.sort(rng.choice(n_uni, size=n_fac, p=_pareto_weights(rng, n_uni, university_alpha)))
+        uni_start = np.searchsorted(self.faculty_university, np.arange(n_uni))
+        uni_size = np.bincount(self.faculty_university, minlength=n_uni)
+        self.faculty_position = rng.choice(len(POSITIONS), size=n_fac, p=POSITION_WEIGHTS)
+
+        # Authorship: a productivity-weighted first author plus local or global co-authors
+        productivity = _pareto_weights(rng, n_fac, faculty_alpha, cap=max_productivity)
+        first = rng.choice(n_fac, size=n_pub, p=productivity)
+        extra = rng.poisson(max(mean_authors - 1.0, 0.0), size=n_pub)
+        slot_pub = np.repeat(np.arange(n_pub), extra)
+        slot_first = first[slot_pub]
+        local = rng.random(slot_pub.size) < locality
+        uni = self.faculty_university[slot_first]
+        coauthor = np.where(
+            local,
+            uni_start[uni] + (rng.random(slot_pub.size) * uni_size[uni]).astype(np.int64),
+            rng.choice(n_fac, size=slot_pub.size, p=productivity),
+        )
+        self.fp_pub, self.fp_fac = _unique_pairs(np.concatenate([np.arange(n_pub), slot_pub]),
+                                                 np.concatenate([first, coauthor]), n_fac)
+
+        # Publications: heavy-tailed citations, Zipf-popular keywords
+        self.pub_citations = np.minimum((rng.pareto(citation_alpha, n_pub) * 10).astype(np.int64), max_citations)
+        self.pub_year = rng.integers(1990, 2025, size=n_pub)
+        self.pub_venue = rng.integers(0, len(VENUES), size=n_pub)
+        per_pub = np.minimum(1 + rng.poisson(max(mean_keywords - 1.0, 0.0), size=n_pub), n_kw)
+        kw_pub = np.repeat(np.arange(n_pub), per_pub)
+        kw = rng.choice(n_kw, size=kw_pub.size, p=_zipf_weights(rng, n_kw, keyword_zipf))
+        self.pk_pub, self.pk_kw = _unique_pairs(kw_pub, kw, n_kw)
+        self.pk_score = np.round(rng.uniform(0.05, 1.0, size=self.pk_pub.size), 4)
+
+        # Faculty keywords: the strongest topics of their own publications
+        from scipy import sparse
+        authorship = sparse.csr_matrix((np.ones(self.fp_pub.size), (self.fp_fac, self.fp_pub)), shape=(n_fac, n_pub))
+        labels = sparse.csr_matrix((self.pk_score, (self.pk_pub, self.pk_kw)), shape=(n_pub, n_kw))
+        topic = (authorship @ labels).tocsr()
+        self.fk_fac, self.fk_kw, score = _top_per_row(topic, keywords_per_faculty)
+        self.fk_score = np.round(score / np.maximum(topic.max(axis=1).toarray().ravel()[self.fk_fac], 1e-9), 4)
+        # KRC weight per (faculty, keyword): SUM(score * num_citations)
+        self._krc = (authorship @ sparse.diags(self.pub_citations.astype(np.float64)) @ labels).tocsr()
+
+        pub_first_kw = self.pk_kw[np.searchsorted(self.pk_pub, np.arange(n_pub))]
+        pub_last_kw = self.pk_kw[np.searchsorted(self.pk_pub, np.arange(n_pub), side="right") - 1]
+        self.pub_titles = [f"Towards {self.keyword_names[a].title()} with {self.keyword_names[b]} ({i + 1})"
+                           if a != b else f"On {self.keyword_names[a].title()} ({i + 1})"
+                           for i, (a, b) in enumerate(zip(pub_first_kw.tolist(), pub_last_kw.tolist()))]
+
+    def summary(self):
+        degree = np.bincount(self.fp_fac, minlength=self.counts["faculty"])
+        top = np.sort(degree)[::-1][:max(1, degree.size // 100)].sum() / max(degree.sum(), 1)
+        return (f"{self.counts['universities']:,} universities, {self.counts['faculty']:,} faculty, "
+                f"{self.counts['publications']:,} publications, {self.counts['keywords']:,} keywords, "
+                f"{self.fp_pub.size:,} authorships, {self.pk_pub.size:,} publication keywords; "
+                f"max faculty degree {degree.max():,}, top 1% write {top:.0%}, "
+                f"max citations {self.pub_citations.max():,}")
+
+    # ---------------- Rows ---------------- #
+
+    def _email(self, i):
+        name = self.faculty_names[i].lower().replace(".", "").split()
+        return f"{name[0]}.{name[-1]}{i + 1}@u{self.faculty_university[i] + 1}.edu"
+
+    def mysql_rows(self, table):
+        """Row tuples of one MySQL table, in the column order of MYSQL_TABLES."""
+        if table == "university":
+            return ((i + 1, name, "") for i, name in enumerate(self.university_names))
+        if table == "keyword":
+            return ((i + 1, name) for i, name in enumerate(self.keyword_names))
+        if table == "faculty":
+            interest = dict(zip(self.fk_fac[::-1].tolist(), self.fk_kw[::-1].tolist()))
+            return ((i + 1, name, POSITIONS[self.faculty_position[i]],
+                     self.keyword_names[interest[i]] if i in interest else "",
+                     self._email(i), "", "", int(self.faculty_university[i]) + 1)
+                    for i, name in enumerate(self.faculty_names))
+        if table == "publication":
+            return ((i + 1, title, VENUES[v], int(y), int(c)) for i, (title, v, y, c) in
+                    enumerate(zip(self.pub_titles, self.pub_venue, self.pub_year, self.pub_citations)))
+        if table == "faculty_keyword":
+            return zip((self.fk_fac + 1).tolist(), (self.fk_kw + 1).tolist(), self.fk_score.tolist())
+        if table == "faculty_publication":
+            return zip((self.fp_fac + 1).tolist(), (self.fp_pub + 1).tolist())
+        if table == "publication_keyword":
+            return zip((self.pk_pub + 1).tolist(), (self.pk_kw + 1).tolist(), self.pk_score.tolist())
+        raise ValueError(f"Unknown table {table}")
+
+    def _faculty_keywords(self):
+        by_faculty = {}
+        for f, k, s in zip(self.fk_fac.tolist(), self.fk_kw.tolist(), self.fk_score.tolist()):
+            by_faculty.setdefault(f, []).append({"id": k + 1, "name": self.keyword_names[k], "score": s})
+        return by_faculty
+
+    def mongo_faculty_docs(self):
+        keywords = self._faculty_keywords()
+        pubs = np.split(self.fp_pub[np.argsort(self.fp_fac, kind="stable")] + 1,
+                        np.cumsum(np.bincount(self.fp_fac, minlength=self.counts["faculty"]))[:-1])
+        for i, name in enumerate(self.faculty_names):
+            u = int(self.faculty_university[i])
+            yield {
+                "id": i + 1,
+                "name": name,
+                "position": POSITIONS[self.faculty_position[i]],
+                "email": self._email(i),
+                "affiliation": {"id": u + 1, "name": self.university_names[u]},
+                "keywords": keywords.get(i, []),
+                "publications": pubs[i].tolist(),
+            }
+
+    def mongo_publication_docs(self):
+        bounds = np.searchsorted(self.pk_pub, np.arange(self.counts["publications"] + 1))
+        for i, title in enumerate(self.pub_titles):
+            lo, hi = bounds[i], bounds[i + 1]
+            yield {
+                "id": i + 1,
+                "title": title,
+                "venue": VENUES[self.pub_venue[i]],
+                "year": int(self.pub_year[i]),
+                "numCitations": int(self.pub_citations[i]),
+                "keywords": [{"id": int(k) + 1, "name": self.keyword_names[k], "score": float(s)}
+                             for k, s in zip(self.pk_kw[lo:hi], self.pk_score[lo:hi])],
+            }
+
+    def neo4j_nodes(self):
+        """(label, property dicts) per node label."""
+        yield "INSTITUTE", ({"id": f"i{i + 1}", "name": n} for i, n in enumerate(self.university_names))
+        yield "KEYWORD", ({"id": f"k{i + 1}", "name": n} for i, n in enumerate(self.keyword_names))
+        yield "FACULTY", ({"id": f"f{i + 1}", "name": n, "position": POSITIONS[self.faculty_position[i]],
+                           "email": self._email(i)} for i, n in enumerate(self.faculty_names))
+        yield "PUBLICATION", ({"id": f"p{i + 1}", "title": t, "venue": VENUES[self.pub_venue[i]],
+                               "year": int(self.pub_year[i]), "numCitations": int(self.pub_citations[i])}
+                              for i, t in enumerate(self.pub_titles))
+
+    def neo4j_relationships(self):
+        """(type, source label, target label, {a, b[, score]} dicts) per relationship type."""
+        yield "AFFILIATION_WITH", "FACULTY", "INSTITUTE", (
+            {"a": f"f{i + 1}", "b": f"i{u + 1}"} for i, u in enumerate(self.faculty_university.tolist()))
+        yield "INTERESTED_IN", "FACULTY", "KEYWORD", (
+            {"a": f"f{f + 1}", "b": f"k{k + 1}", "score": s}
+            for f, k, s in zip(self.fk_fac.tolist(), self.fk_kw.tolist(), self.fk_score.tolist()))
+        yield "PUBLISH", "FACULTY", "PUBLICATION", (
+            {"a": f"f{f + 1}", "b": f"p{p + 1}"} for f, p in zip(self.fp_fac.tolist(), self.fp_pub.tolist()))
+        yield "LABEL_BY", "PUBLICATION", "KEYWORD", (
+            {"a": f"p{p + 1}", "b": f"k{k + 1}", "score": s}
+            for p, k, s in zip(self.pk_pub.tolist(), self.pk_kw.tolist(), self.pk_score.tolist()))
+
+    # ---------------- Writers and loaders ---------------- #
+
+    def write_tsv(self, out_dir=OUTPUT_DIR):
+        """One tab-separated file per MySQL table (LOAD DATA format); returns their paths."""
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {}
+        for table, _ in MYSQL_TABLES:
+            path = paths[table] = os.path.abspath(os.path.join(out_dir, f"{table}.tsv"))
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines("\t".join(map(str, row)) + "\n" for row in self.mysql_rows(table))
+        return paths
+
+    def write_snapshot(self, path):
+        """Write an offline snapshot (see snapshot.py) without going through any database."""
+        import snapshot
+
+        n_fac = self.counts["faculty"]
+        names, universities = self.faculty_names, self.university_names
+        fac_uni = self.faculty_university.tolist()
+        krc = self._krc.tocoo()
+        rows, cols, values = _top_per_row(self._krc, 1)
+        krc_top = sorted(({"faculty_name": names[f], "keyword": self.keyword_names[k],
+                           "university": universities[fac_uni[f]], "krc": v}
+                          for f, k, v in zip(rows.tolist(), cols.tolist(), values.tolist())),
+                         key=lambda r: r["krc"], reverse=True)
+        pub_count = np.bincount(self.fp_fac, minlength=n_fac).tolist()
+        analytics = ({"name": names[i], "position": POSITIONS[self.faculty_position[i]], "email": self._email(i),
+                      "university": universities[fac_uni[i]], "publication_count": pub_count[i]}
+                     for i in range(n_fac))
+        keywords = self._faculty_keywords()
+        titles, cites = self.pub_titles, self.pub_citations.tolist()
+        return snapshot.write(
+            path,
+            profiles=[{"name": names[i], "university": universities[fac_uni[i]],
+                       "keywords": [kw["name"] for kw in keywords.get(i, [])]} for i in range(n_fac)],
+            krc_top=krc_top,
+            analytics=analytics,
+            directory=({"id": i + 1, "name": names[i], "university": universities[fac_uni[i]]}
+                       for i in range(n_fac)),
+            authorship=({"faculty_id": f + 1, "publication_id": p + 1}
+                        for f, p in zip(self.fp_fac.tolist(), self.fp_pub.tolist())),
+            publication_keywords=({"publication_id": p, "keyword_id": k, "score": s}
+                                  for p, k, s in self.mysql_rows("publication_keyword")),
+            keyword_names={i + 1: n for i, n in enumerate(self.keyword_names)},
+            keyword_weights=({"faculty_id": f + 1, "keyword_id": k + 1, "weight": w}
+                             for f, k, w in zip(krc.row.tolist(), krc.col.tolist(), krc.data.tolist())),
+            graph_publications=[(names[f], f"p{p + 1}", titles[p], cites[p], f"f{f + 1}")
+                                for f, p in zip(self.fp_fac.tolist(), self.fp_pub.tolist())],
+            graph_keywords=((f"p{p}", self.keyword_names[k - 1], s)
+                            for p, k, s in self.mysql_rows("publication_keyword")),
+        )
+
+
+def load_mysql(world, out_dir=OUTPUT_DIR, replace=False):
+    """Bulk-load every table with LOAD DATA LOCAL INFILE (needs local_infile=1 on the server)."""
+    import mysql_utils
+
+    paths = world.write_tsv(out_dir)
+    conn = mysql_utils.get_mysql_connection(local_infile=True)
+    if not conn:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cur.execute("SET UNIQUE_CHECKS = 0")
+            for table, columns in MYSQL_TABLES:
+                start = time.perf_counter()
+                if replace:
+                    cur.execute(f"TRUNCATE TABLE {table}")
+                cur.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                    (paths[table],))
+                logger.info(f"✅ MySQL {table}: {cur.rowcount:,} rows in {time.perf_counter() - start:.1f}s")
+            cur.execute("SET UNIQUE_CHECKS = 1")
+            cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"❌ MySQL bulk load failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def load_mongo(world, replace=False, batch_size=BATCH_SIZE):
+    """Bulk-insert faculty and publication documents with unordered insert_many."""
+    from mongodb_utils import MongoDBConnection
+
+    client = MongoDBConnection().get_client()
+    if not client:
+        return False
+    db = client["academicworld"]
+    try:
+        for name, docs in (("faculty", world.mongo_faculty_docs()),
+                           ("publications", world.mongo_publication_docs())):
+            start, total = time.perf_counter(), 0
+            if replace:
+                db[name].drop()
+            for batch in _batches(docs, batch_size):
+                total += len(db[name].insert_many(batch, ordered=False).inserted_ids)
+            logger.info(f"✅ MongoDB {name}: {total:,} documents in {time.perf_counter() - start:.1f}s")
+        return True
+    except Exception as e:
+        logger.error(f"❌ MongoDB bulk load failed: {e}")
+        return False
+
+
+def load_neo4j(world, replace=False, batch_size=BATCH_SIZE):
+    """Create nodes, then relationships, in UNWIND batches after indexing every id."""
+    from neo4j_utils import Neo4jUtils
+
+    db = Neo4jUtils()
+    try:
+        with db.driver.session(database="academicworld") as session:
+            if replace:
+                session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+            for label in ("INSTITUTE", "KEYWORD", "FACULTY", "PUBLICATION"):
+                session.run(f"CREATE INDEX {label.lower()}_id IF NOT EXISTS FOR (n:{label}) ON (n.id)").consume()
+            session.run("CALL db.awaitIndexes()").consume()
+
+            for label, rows in world.neo4j_nodes():
+                start, total = time.perf_counter(), 0
+                for batch in _batches(rows, batch_size):
+                    session.run(f"UNWIND $rows AS row CREATE (n:{label}) SET n = row", rows=batch).consume()
+                    total += len(batch)
+                logger.info(f"✅ Neo4j {label}: {total:,} nodes in {time.perf_counter() - start:.1f}s")
+
+            for rel, source, target, rows in world.neo4j_relationships():
+                start, total = time.perf_counter(), 0
+                query = (f"UNWIND $rows AS row MATCH (a:{source} {{id: row.a}}) MATCH (b:{target} {{id: row.b}}) "
+                         f"CREATE (a)-[r:{rel}]->(b) SET r.score = row.score")
+                for batch in _batches(rows, batch_size):
+                    session.run(query, rows=batch).consume()
+                    total += len(batch)
+                logger.info(f"✅ Neo4j {rel}: {total:,} relationships in {time.perf_counter() - start:.1f}s")
+        return True
+    except Exception as e:
+        print(f"❌ Neo4j bulk load failed: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Academic World dataset")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of 2.5k faculty / 40k publications")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--faculty-alpha", type=float, default=1.5, help="Pareto shape of faculty productivity")
+    parser.add_argument("--university-alpha", type=float, default=1.2, help="Pareto shape of university sizes")
+    parser.add_argument("--keyword-zipf", type=float, default=1.1, help="Zipf exponent of keyword popularity")
+    parser.add_argument("--citation-alpha", type=float, default=1.3, help="Pareto shape of citation counts")
+    parser.add_argument("--max-productivity", type=float, default=50.0,
+                        help="cap on a faculty's productivity weight relative to the least productive")
+    parser.add_argument("--max-citations", type=int, default=100_000)
+    parser.add_argument("--mean-authors", type=float, default=3.0)
+    parser.add_argument("--mean-keywords", type=float, default=4.0)
+    parser.add_argument("--locality", type=float, default=0.6, help="chance a co-author is from the same university")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="directory for the MySQL TSV files")
+    parser.add_argument("--mysql", action="store_true", help="LOAD DATA into MySQL")
+    parser.add_argument("--mongo", action="store_true", help="insert_many into MongoDB")
+    parser.add_argument("--neo4j", action="store_true", help="UNWIND batches into Neo4j")
+    parser.add_argument("--snapshot", help="also write an offline snapshot file")
+    parser.add_argument("--replace", action="store_true", help="empty the target tables/collections/graph first")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    world = SyntheticWorld(scale=args.scale, seed=args.seed, faculty_alpha=args.faculty_alpha,
+                           university_alpha=args.university_alpha, keyword_zipf=args.keyword_zipf,
+                           citation_alpha=args.citation_alpha, mean_authors=args.mean_authors,
+                           mean_keywords=args.mean_keywords, locality=args.locality,
+                           max_productivity=args.max_productivity, max_citations=args.max_citations)
+    logger.info(f"✅ Generated in {time.perf_counter() - start:.1f}s: {world.summary()}")
+
+    if args.mysql:
+        load_mysql(world, args.out, replace=args.replace)
+    else:
+        logger.info(f"✅ MySQL TSV files written: {', '.join(world.write_tsv(args.out).values())}")
+    if args.mongo:
+        load_mongo(world, replace=args.replace)
+    if args.neo4j:
+        load_neo4j(world, replace=args.replace)
+    if args.snapshot:
+        world.write_snapshot(args.snapshot)
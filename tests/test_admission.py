@@ -0,0 +1,128 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+import admission
+import deadlines
+from admission import BackendLimiter, TokenBuckets
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    buckets = TokenBuckets(rate=2, burst=3)
+    assert [buckets.take("s", now=0) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("s", now=0) == pytest.approx(0.5)
+    assert buckets.take("s", now=0.5) == 0
+    assert buckets.take("other", now=0.5) == 0  # keys are independent
+
+
+def test_token_buckets_forget_least_recently_used_keys():
+    buckets = TokenBuckets(rate=1, burst=1, max_keys=2)
+    buckets.take("a", now=0)
+    buckets.take("b", now=0)
+    buckets.take("a", now=0)
+    buckets.take("c", now=0)  # evicts b, the least recently used
+    assert buckets.take("a", now=0) > 0  # still tracked, and empty
+    assert buckets.take("b", now=0) == 0  # forgotten, so a fresh bucket
+
+
+def test_refund_returns_a_token_up_to_the_burst():
+    buckets = TokenBuckets(rate=1, burst=1)
+    buckets.take("s", now=0)
+    buckets.refund("s")
+    assert buckets.take("s", now=0) == 0
+    buckets.refund("s")
+    buckets.refund("s")
+    buckets.take("s", now=0)
+    assert buckets.take("s", now=0) > 0
+    buckets.refund("unknown")  # never seen: nothing to refund
+
+
+def test_rate_limit_rejected_by_ip_keeps_the_session_token(monkeypatch):
+    import dash
+    from dash import html
+
+    monkeypatch.setattr(admission, "RATE", 1.0)
+    monkeypatch.setattr(admission, "sessions", TokenBuckets(rate=0.001, burst=1))
+    monkeypatch.setattr(admission, "ips", TokenBuckets(rate=0.001, burst=1))
+    monkeypatch.setattr(admission, "_limited_triggers", {"search.n_clicks"})
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    admission.install(app)
+    client = app.server.test_client()
+    body = {"output": "x.children", "changedPropIds": ["search.n_clicks"]}
+
+    def post(session):
+        client.set_cookie(admission.SESSION_COOKIE, session)
+        return client.post("/_dash-update-component", json=body).status_code
+
+    assert post("first") != 429
+    assert post("second") == 429  # the IP bucket is empty
+    admission.ips.refund("127.0.0.1")
+    assert post("second") != 429  # "second" still has the token it was refunded
+
+
+@pytest.fixture(params=["shared", "in-process"])
+def limiter(request, tmp_path):
+    slot_dir = str(tmp_path) if request.param == "shared" else None
+    return BackendLimiter("test", limit=2, queue_size=1, queue_timeout=0.1, slot_dir=slot_dir)
+
+
+def test_limiter_admits_up_to_its_limit(limiter):
+    first, second = limiter.try_acquire(), limiter.try_acquire()
+    assert first is not None and second is not None and first[0] != second[0]
+    assert limiter.try_acquire() is None
+    assert limiter.active == 2
+    limiter.release(first)
+    assert limiter.try_acquire() is not None
+
+
+def test_limiter_sheds_after_the_queue_timeout(limiter):
+    held = [limiter.try_acquire(), limiter.try_acquire()]
+    start = time.monotonic()
+    assert limiter.acquire() is None
+    assert 0.05 < time.monotonic() - start < 1
+    limiter.release(held[0])
+
+
+def test_limiter_wakes_a_queued_caller_on_release(limiter):
+    held = [limiter.try_acquire(), limiter.try_acquire()]
+    threading.Timer(0.03, limiter.release, args=(held[0],)).start()
+    assert limiter.acquire() is not None
+
+
+def test_limiter_queue_wait_is_bounded_by_the_deadline(limiter):
+    limiter.queue_timeout = 5
+    held = [limiter.try_acquire(), limiter.try_acquire()]
+    start = time.monotonic()
+    with deadlines.deadline(0.05):
+        assert limiter.acquire() is None
+    assert time.monotonic() - start < 1
+    limiter.release(held[0])
+
+
+def _hold_slots(slot_dir, ready, done):
+    limiter = BackendLimiter("test", limit=2, slot_dir=slot_dir)
+    held = [limiter.try_acquire(), limiter.try_acquire()]
+    ready.set()
+    done.wait(5)
+    for slot in held:
+        limiter.release(slot)
+
+
+def test_slots_are_shared_across_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    ready, done = context.Event(), context.Event()
+    child = context.Process(target=_hold_slots, args=(str(tmp_path), ready, done))
+    child.start()
+    try:
+        assert ready.wait(5)
+        limiter = BackendLimiter("test", limit=2, slot_dir=str(tmp_path))
+        assert limiter.try_acquire() is None
+        done.set()
+        child.join(5)
+        assert limiter.try_acquire() is not None
+    finally:
+        done.set()
+        child.join(5)
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+import deadlines
+
+
+def test_no_deadline_by_default():
+    assert deadlines.remaining() is None
+    assert deadlines.budget_ms() is None
+    deadlines.check("mysql")  # never raises
+
+
+def test_nested_deadlines_keep_the_earlier_one():
+    with deadlines.deadline(1):
+        with deadlines.deadline(60):
+            assert deadlines.remaining() <= 1
+        with deadlines.deadline(60, replace=True):
+            assert deadlines.remaining() > 1
+    assert deadlines.remaining() is None
+
+
+def test_check_raises_once_the_deadline_has_passed():
+    with deadlines.deadline(0.01):
+        time.sleep(0.02)
+        assert deadlines.budget_ms() == 1
+        with pytest.raises(deadlines.QueryTimeout) as info:
+            deadlines.check("neo4j")
+    assert info.value.backend == "neo4j"
+
+
+@pytest.mark.parametrize("value, kind", [
+    ([], deadlines.TimedOutList),
+    (([], []), deadlines.TimedOutTuple),
+    ({}, deadlines.TimedOutDict),
+    (0, deadlines.TimedOutInt),
+    (None, deadlines.TimedOutNone),
+])
+def test_timed_out_keeps_the_fallback_shape(value, kind):
+    result = deadlines.timed_out(value, "mongodb")
+    assert isinstance(result, kind) and result.backend == "mongodb"
+    if value is None:
+        assert not result
+    else:
+        assert result == value
+
+
+def test_bounded_types_only_results_cut_short():
+    before = deadlines.expired_backend()
+
+    @deadlines.bounded
+    def helper(cut_short):
+        if cut_short:
+            try:
+                raise deadlines.expired("mysql")
+            except deadlines.QueryTimeout:
+                return []
+        return [1]
+
+    assert type(helper(False)) is list
+    result = helper(True)
+    assert isinstance(result, deadlines.TimedOutList) and result.backend == "mysql"
+    assert deadlines.expired_backend() == before  # doesn't leak into the caller
@@ -0,0 +1,57 @@
+import os
+import time
+
+from index_loader import BackgroundIndex, Warming, file_version
+
+
+def _wait(loader, predicate):
+    for _ in range(500):
+        index = loader.get()
+        if predicate(index):
+            return index
+        time.sleep(0.01)
+    raise AssertionError("background build did not land")
+
+
+def test_get_never_blocks_and_the_build_lands_later():
+    def load():
+        time.sleep(0.2)
+        return "index"
+
+    loader = BackgroundIndex("test", load)
+    start = time.monotonic()
+    assert loader.get() is None
+    assert time.monotonic() - start < 0.1
+    assert _wait(loader, lambda index: index is not None) == "index"
+
+
+def test_failed_build_is_retried_after_the_backoff():
+    attempts = []
+
+    def load():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RuntimeError("database down")
+        return "index"
+
+    loader = BackgroundIndex("test", load, retry_seconds=0.1)
+    assert _wait(loader, lambda index: index is not None) == "index"
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.1
+
+
+def test_rebuilds_when_the_source_version_changes(tmp_path):
+    path = tmp_path / "source.txt"
+    path.write_text("one")
+    loader = BackgroundIndex("test", path.read_text, version=lambda: file_version(str(path)),
+                             check_interval=0.01)
+    assert _wait(loader, lambda index: index == "one") == "one"
+    path.write_text("two")
+    later = time.time() + 5
+    os.utime(path, (later, later))
+    assert _wait(loader, lambda index: index == "two") == "two"
+
+
+def test_file_version_and_warming(tmp_path):
+    assert file_version(str(tmp_path / "missing")) is None
+    assert isinstance(Warming(), list) and not Warming()
@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+import pytest
+
+import keyword_vectors
+from index_loader import BackgroundIndex, Warming
+from keyword_vectors import KeywordVectorIndex
+
+
+def _index(n_faculty=8, n_keywords=12, per_faculty=4, seed=0):
+    rng = np.random.default_rng(seed)
+    faculty = [{"id": i, "name": f"Faculty {i}", "university": f"U{i % 3}"} for i in range(n_faculty)]
+    rows = [{"faculty_id": i, "keyword_id": int(k), "weight": float(rng.integers(1, 50))}
+            for i in range(n_faculty) for k in rng.choice(n_keywords, per_faculty, replace=False)]
+    names = {k: f"kw{k}" for k in range(n_keywords)}
+    return KeywordVectorIndex.build(rows, faculty, names, dims=4)
+
+
+@pytest.mark.parametrize("mode", ["exact", "approx"])
+def test_search_never_returns_the_query_row(mode):
+    # 8 rows <= k * candidates + 1: the approx candidate pool covers the whole catalogue
+    index = _index()
+    for i in range(index.matrix.shape[0]):
+        rows = [j for j, _ in index.search(i, k=3, mode=mode)]
+        assert i not in rows
+
+
+def test_approx_matches_exact_when_the_pool_covers_everything():
+    index = _index()
+    for i in range(index.matrix.shape[0]):
+        exact = index.search(i, k=3, mode="exact")
+        approx = index.search(i, k=3, mode="approx")
+        assert [j for j, _ in approx] == [j for j, _ in exact]
+        assert [s for _, s in approx] == pytest.approx([s for _, s in exact])
+
+
+def test_scores_are_cosines_best_first():
+    index = _index(n_faculty=40, seed=1)
+    results = index.search(0, k=10, mode="exact")
+    scores = [s for _, s in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 < s <= 1 + 1e-9 for s in scores)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = _index()
+    index.save(str(tmp_path / "model"))
+    loaded = KeywordVectorIndex.load(str(tmp_path / "model"))
+    assert loaded.search(2, k=3) == index.search(2, k=3)
+    assert loaded.row(" faculty 2 ") == 2
+
+
+def test_find_collaborators_warms_up_in_the_background(monkeypatch):
+    release = threading.Event()
+    built = _index()
+
+    def slow_load():
+        release.wait(5)
+        return built
+
+    loader = BackgroundIndex("test keyword vectors", slow_load)
+    monkeypatch.setattr(keyword_vectors, "_index", loader)
+
+    assert isinstance(keyword_vectors.find_collaborators("Faculty 1", k=3), Warming)
+    release.set()
+    for _ in range(200):
+        if loader.get() is not None:
+            break
+        threading.Event().wait(0.01)
+    rows = keyword_vectors.find_collaborators("Faculty 1", k=3)
+    assert not isinstance(rows, Warming)
+    assert rows and all(row["name"] != "Faculty 1" for row in rows)
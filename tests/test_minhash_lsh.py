@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+import minhash_lsh
+from index_loader import BackgroundIndex, Warming
+from minhash_lsh import MinHashLSH, jaccard
+
+PROFILES = [
+    {"name": "Ada Lovelace", "keywords": ["algorithms", "analysis", "engines"], "university": "U1"},
+    {"name": "Charles Babbage", "keywords": ["algorithms", "analysis", "engines", "mechanics"],
+     "university": "U2"},
+    {"name": "Grace Hopper", "keywords": ["compilers", "languages"], "university": "U3"},
+]
+
+
+def test_jaccard():
+    assert jaccard({"a", "b"}, {"b", "c"}) == pytest.approx(1 / 3)
+    assert jaccard(set(), set()) == 0.0
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHashLSH(num_perm=100, bands=30)
+
+
+def test_query_ranks_by_exact_jaccard_and_excludes_the_key():
+    index = MinHashLSH()
+    for profile in PROFILES:
+        index.insert(profile["name"], profile["keywords"])
+    results = index.query_key("Ada Lovelace", k=5)
+    assert results[0] == ("Charles Babbage", pytest.approx(0.75))
+    assert all(key != "Ada Lovelace" for key, _ in results)
+    assert all(key != "Grace Hopper" for key, _ in results)  # nothing shared
+
+
+def test_query_key_uses_stored_bands_like_a_token_query():
+    index = MinHashLSH()
+    for profile in PROFILES:
+        index.insert(profile["name"], profile["keywords"])
+    for profile in PROFILES:
+        assert index.query_key(profile["name"]) == index.query(profile["keywords"], exclude=profile["name"])
+    assert index.query_key("Nobody") == []
+
+
+def test_insert_replaces_and_remove_forgets():
+    index = MinHashLSH()
+    index.insert("a", ["X", "y"])
+    assert index.keywords("a") == {"x", "y"}
+    index.insert("a", ["z"])
+    assert index.keywords("a") == {"z"}
+    assert "a" not in index.candidates(["x", "y"])
+    index.remove("a")
+    assert "a" not in index and len(index) == 0
+    assert index.candidates(["z"]) == set()
+
+
+def test_find_similar_faculty_warms_up_in_the_background(monkeypatch):
+    release = threading.Event()
+
+    def slow_load():
+        release.wait(5)
+        return minhash_lsh.build_faculty_index(PROFILES)
+
+    loader = BackgroundIndex("test minhash", slow_load)
+    monkeypatch.setattr(minhash_lsh, "_index", loader)
+
+    assert isinstance(minhash_lsh.find_similar_faculty("Ada Lovelace"), Warming)
+    release.set()
+    for _ in range(200):
+        if loader.get() is not None:
+            break
+        threading.Event().wait(0.01)
+    rows = minhash_lsh.find_similar_faculty(" ada lovelace ")
+    assert [row["name"] for row in rows] == ["Charles Babbage"]
+    assert rows[0]["university"] == "U2"
+    assert rows[0]["shared"] == ["algorithms", "analysis", "engines"]
+    assert minhash_lsh.find_similar_faculty("Nobody") == []
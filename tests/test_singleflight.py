@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+
+import deadlines
+from singleflight import SingleFlight, single_flight
+
+
+def _run_together(fn, args_list):
+    results = [None] * len(args_list)
+    errors = [None] * len(args_list)
+
+    def call(i, args):
+        try:
+            results[i] = fn(*args)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i, args)) for i, args in enumerate(args_list)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_identical_calls_share_one_execution():
+    group = SingleFlight()
+    calls = []
+
+    @single_flight(group=group)
+    def lookup(name):
+        calls.append(name)
+        time.sleep(0.2)
+        return [{"name": name}]
+
+    results, _ = _run_together(lookup, [("Ada Lovelace",), ("  Ada   Lovelace ",), ("Ada Lovelace",)])
+    assert calls == ["Ada Lovelace"]
+    assert results == [[{"name": "Ada Lovelace"}]] * 3
+    stats = group.stats()[lookup.__qualname__]
+    assert (stats["calls"], stats["executions"], stats["shared"]) == (3, 1, 2)
+
+
+def test_every_caller_gets_its_own_copy_of_a_shared_result():
+    group = SingleFlight()
+
+    @single_flight(group=group)
+    def lookup(name):
+        time.sleep(0.2)
+        return [{"name": "a"}], [1, 2]
+
+    results, _ = _run_together(lookup, [("x",)] * 3)
+    rows = [r[0] for r in results]
+    assert len({id(r) for r in rows}) == 3
+    assert len({id(r[0]) for r in rows}) == 3  # nested row dicts too, the leader's included
+    rows[0][0]["name"] = "changed"
+    results[0][1].append(3)
+    assert results[1] == results[2] == ([{"name": "a"}], [1, 2])
+
+
+def test_unshared_result_is_not_copied():
+    value = [1]
+
+    @single_flight(group=SingleFlight())
+    def lookup(name):
+        return value
+
+    assert lookup("x") is value
+
+
+def test_coroutines_are_coalesced_on_their_loop():
+    group = SingleFlight()
+    calls = []
+
+    @single_flight(group=group)
+    async def lookup(name):
+        calls.append(name)
+        await asyncio.sleep(0.1)
+        return [{"name": name}]
+
+    async def main():
+        return await asyncio.gather(lookup("a"), lookup(" a "), lookup("b"))
+
+    results = asyncio.run(main())
+    assert sorted(calls) == ["a", "b"]
+    assert results[0] == results[1] == [{"name": "a"}] and results[0] is not results[1]
+
+
+def test_coroutine_leader_timeout_reaches_waiters():
+    group = SingleFlight()
+
+    @deadlines.bounded
+    @single_flight(group=group)
+    async def lookup(name):
+        await asyncio.sleep(0.1)
+        deadlines.mark_expired("mongodb")
+        return [], []
+
+    async def main():
+        return await asyncio.gather(lookup("x"), lookup("x"))
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, deadlines.TimedOutTuple) and r.backend == "mongodb" for r in results)
+
+
+def test_different_arguments_run_separately():
+    group = SingleFlight()
+    calls = []
+
+    @single_flight(group=group)
+    def lookup(name):
+        calls.append(name)
+        time.sleep(0.1)
+        return name
+
+    results, _ = _run_together(lookup, [("a",), ("b",)])
+    assert sorted(calls) == ["a", "b"]
+    assert sorted(results) == ["a", "b"]
+
+
+def test_leader_error_reaches_waiters():
+    group = SingleFlight()
+
+    @single_flight(group=group)
+    def lookup(name):
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    _, errors = _run_together(lookup, [("x",)] * 3)
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_leader_timeout_reaches_waiters_as_timed_out():
+    group = SingleFlight()
+
+    @deadlines.bounded
+    @single_flight(group=group)
+    def lookup(name):
+        time.sleep(0.2)
+        deadlines.mark_expired("mysql")
+        return []
+
+    results, _ = _run_together(lookup, [("x",)] * 3)
+    assert all(isinstance(r, deadlines.TimedOutList) and r.backend == "mysql" for r in results)
+
+
+def test_waiter_stops_at_its_own_deadline():
+    group = SingleFlight()
+    release = threading.Event()
+
+    @single_flight(group=group)
+    def lookup(name):
+        if deadlines.remaining() is not None:
+            return "fallback"  # the waiter's own, fast-failing call
+        release.wait(5)
+        return "leader"
+
+    leader = threading.Thread(target=lookup, args=("x",))
+    leader.start()
+    time.sleep(0.05)
+    start = time.monotonic()
+    with deadlines.deadline(0.05):
+        assert lookup("x") == "fallback"
+    assert time.monotonic() - start < 1
+    release.set()
+    leader.join(5)
+
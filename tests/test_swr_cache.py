@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+import swr_cache
+from swr_cache import SWRCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(swr_cache, "time", clock)
+    return clock
+
+
+class _Loader:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def _wait_for_refresh(cache, count=1):
+    for _ in range(500):
+        if cache.stats["refreshes"] >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("background refresh did not finish")
+
+
+def test_fresh_entries_are_served_without_reloading(clock):
+    cache = SWRCache(soft_ttl=10, hard_ttl=100)
+    loader = _Loader(["a"])
+    assert cache.get("k", loader) == ["a"]
+    clock.now += 5
+    assert cache.get("k", loader) == ["a"]
+    assert loader.calls == 1
+    assert (cache.stats["misses"], cache.stats["fresh_hits"]) == (1, 1)
+
+
+def test_stale_entry_is_served_while_reloading_in_the_background(clock):
+    cache = SWRCache(soft_ttl=10, hard_ttl=100)
+    loader = _Loader(["old"], ["new"])
+    cache.get("k", loader)
+    clock.now += 20
+    assert cache.get("k", loader) == ["old"]
+    _wait_for_refresh(cache)
+    assert cache.get("k", loader) == ["new"]
+    assert cache.stats["stale_hits"] == 1
+
+
+def test_expired_entry_is_reloaded_on_the_request_path(clock):
+    cache = SWRCache(soft_ttl=10, hard_ttl=100)
+    loader = _Loader(["old"], ["new"])
+    cache.get("k", loader)
+    clock.now += 200
+    assert cache.get("k", loader) == ["new"]
+    assert cache.stats["misses"] == 2
+
+
+def test_failed_reload_keeps_the_last_good_value_and_backs_off(clock):
+    cache = SWRCache(soft_ttl=10, hard_ttl=100, failure_backoff=30)
+    loader = _Loader(["good"], [], ["better"])
+    cache.get("k", loader)
+    clock.now += 200
+    assert cache.get("k", loader) == ["good"]  # [] is not accepted
+    assert loader.calls == 2
+    clock.now += 10
+    assert cache.get("k", loader) == ["good"]  # still backing off: no new attempt
+    assert loader.calls == 2
+    assert cache.stats["expired_hits"] == 2
+    clock.now += 30
+    assert cache.get("k", loader) == ["better"]
+
+
+def test_loader_errors_are_not_cached(clock):
+    cache = SWRCache(soft_ttl=10, hard_ttl=100)
+    loader = _Loader(RuntimeError("down"), ["up"])
+    assert cache.get("k", loader) is None
+    assert cache.info()["entries"]["k"]["failures"] == 1
+
+
+def test_prime_and_invalidate(clock):
+    cache = SWRCache(soft_ttl=10, hard_ttl=100)
+    cache.prime("k", ["primed"])
+    cache.prime("empty", [])
+    assert cache.get("k", _Loader()) == ["primed"]
+    assert "empty" not in cache.info()["entries"]
+    cache.invalidate("k")
+    assert cache.get("k", _Loader(["loaded"])) == ["loaded"]
@@ -1,17 +1,16 @@
 # widget1.py - Beautiful Top Research Keywords Widget
 from dash import html, dcc
 import plotly.graph_objs as go
-import plotly.express as px
+from plotly.colors import qualitative
 from mongodb_utils import get_top_keywords
-import numpy as np
+from swr_cache import landing_cache
+import lazy_imports
+from figure_cache import figure_cache
 
-def layout():
-    # Get top keywords and counts from MongoDB
-    try:
-        keywords, counts = get_top_keywords()
-    except Exception as e:
-        keywords, counts = [], []
-        
+np = lazy_imports.module("numpy")
+
+def build_figure(keywords, counts):
+    """Build the chart figure; cached by figure_cache keyed on the data."""
     # If nothing is returned, show a beautiful empty state
     if not keywords:
         figure = go.Figure()
@@ -56,7 +55,7 @@ def layout():
     else:
         # Create a stunning visualization with the data
         # Generate beautiful gradient colors
-        colors = px.colors.qualitative.Set3[:len(keywords)]
+        colors = qualitative.Set3[:len(keywords)]
         if len(keywords) > len(colors):
             # Extend colors if we have more keywords
             colors = colors * (len(keywords) // len(colors) + 1)
@@ -209,6 +208,20 @@ def layout():
                 font=dict(size=12, color="#2c3e50")
             )
 
+    return figure
+
+
+def layout():
+    # Get top keywords and counts from MongoDB (served stale-while-revalidate)
+    try:
+        keywords, counts = landing_cache.get(
+            "top_keywords", get_top_keywords, accept=lambda result: bool(result[0])
+        ) or ([], [])
+    except Exception as e:
+        keywords, counts = [], []
+        
+    figure = figure_cache.get("widget1", (keywords, counts), build_figure)
+
     return html.Div(
         id="widget1",
         className="widget",
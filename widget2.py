@@ -1,19 +1,16 @@
 # widget2.py - Beautiful Top Faculty by KRC Widget
 from dash import html, dcc
 import plotly.graph_objs as go
-import plotly.express as px
 from mysql_utils import get_top_faculty_krc_full
-import numpy as np
+from swr_cache import landing_cache
+import lazy_imports
+from figure_cache import figure_cache
 
-def layout():
-    try:
-        data = get_top_faculty_krc_full()
-        names = [row["faculty_name"] for row in data]
-        krcs = [round(row["krc"], 2) for row in data]
-    except Exception as e:
-        data, names, krcs = [], [], []
-    
-    if not data or not names:
+np = lazy_imports.module("numpy")
+
+def build_figure(names, krcs):
+    """Build the chart figure; cached by figure_cache keyed on the data."""
+    if not names:
         # Beautiful empty state
         figure = go.Figure()
         
@@ -286,6 +283,20 @@ def layout():
             #     annotation_font_color="#f39c12"
             # )
 
+    return figure
+
+
+def layout():
+    try:
+        # KRC aggregation is expensive; serve it stale-while-revalidate
+        data = landing_cache.get("top_faculty_krc", get_top_faculty_krc_full) or []
+        names = [row["faculty_name"] for row in data]
+        krcs = [round(row["krc"], 2) for row in data]
+    except Exception as e:
+        data, names, krcs = [], [], []
+    
+    figure = figure_cache.get("widget2", (names, krcs), build_figure)
+
     return html.Div(
         id="widget2",
         className="widget",
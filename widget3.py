@@ -1,8 +1,16 @@
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, Patch, no_update
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
 from neo4j_utils import Neo4jUtils
+from graph_cache import research_graph
+import admission
+import async_data
+import background_jobs
+from deadlines import TimedOut
 import math
-import numpy as np
+import lazy_imports
+
+np = lazy_imports.module("numpy")
 
 PREFIX = "widget3"
 
@@ -49,6 +57,44 @@ def layout():
                                'transition': 'all 0.3s ease'
                            })
             ], style={'marginBottom': '20px', 'display': 'flex', 'alignItems': 'center'}),
+
+            # Graph mode: research focus or multi-hop co-authorship
+            html.Div([
+                dcc.RadioItems(
+                    id=f"{PREFIX}-mode",
+                    options=[
+                        {"label": " 🔬 Research focus", "value": "focus"},
+                        {"label": " 🤝 Collaboration network", "value": "collab"},
+                    ],
+                    value="focus",
+                    inline=True,
+                    inputStyle={"marginLeft": "12px"},
+                    style={"fontSize": "14px", "color": "#2c3e50"}
+                ),
+                html.Div([
+                    html.Span("Hops", style={"fontSize": "13px", "color": "#7f8c8d", "marginRight": "8px"}),
+                    html.Div(dcc.Slider(
+                        id=f"{PREFIX}-hops", min=1, max=4, step=1, value=2,
+                        marks={i: str(i) for i in range(1, 5)}
+                    ), style={"width": "160px"})
+                ], style={"display": "flex", "alignItems": "center"})
+            ], style={'marginBottom': '15px', 'display': 'flex', 'alignItems': 'center',
+                      'justifyContent': 'space-between', 'flexWrap': 'wrap'}),
+
+            # Collaboration expansion state; the interval pulls one hop per tick
+            dcc.Store(id=f"{PREFIX}-collab-state"),
+            dcc.Interval(id=f"{PREFIX}-collab-tick", interval=400, disabled=True),
+
+            # Research focus keywords still to stream in; each tick patches one publication's cluster
+            dcc.Store(id=f"{PREFIX}-focus-state"),
+            dcc.Interval(id=f"{PREFIX}-focus-tick", interval=150, disabled=True),
+
+            # Search the snapshot could not answer, handed to the background job
+            dcc.Store(id=f"{PREFIX}-search"),
+
+            # Progress of a running search (background callbacks only)
+            html.Div(id=f"{PREFIX}-progress", style={'fontSize': '13px', 'color': '#7f8c8d',
+                                                     'marginBottom': '8px', 'minHeight': '18px'}),
             
             # Enhanced status div
             html.Div(id=f"{PREFIX}-status", style={
@@ -61,10 +107,12 @@ def layout():
                 'fontWeight': '500',
                 'color': '#2c3e50',
                 'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
-            }),
+            }, children="🚀 Ready to explore research networks..."),
             
             dcc.Graph(
                 id=f"{PREFIX}-graph", 
+                figure=_placeholder("🎯 Enter a faculty name and click Search to explore their research network!",
+                                    "info"),
                 config={
                     "displayModeBar": False,
                     "scrollZoom": True,
@@ -133,181 +181,185 @@ def _placeholder(message, message_type="info"):
     )
     return fig
 
-def _create_research_graph(faculty_name, publications, db):
-    """Create a beautiful research focus visualization"""
-    if not publications:
-        return _placeholder(f"No publications found for {faculty_name}", "warning")
-    
-    fig = go.Figure()
-    
-    # Enhanced color palette
-    colors = {
-        'faculty': "#e1e73c",          # Yellow
-        'publication': '#3498db',       # Blue  
-        'keyword': '#27ae60',          # Green
-        'edge_pub': 'rgba(52, 152, 219, 0.6)',    # Blue edges
-        'edge_kw': 'rgba(39, 174, 96, 0.4)'       # Green edges
-    }
-    
-    # Calculate positions for publications in a more organic layout
-    pub_positions = {}
-    n_pubs = len(publications)
-    
+# Switch node/edge traces to WebGL (Scattergl) above this many nodes
+GL_NODE_THRESHOLD = 1000
+
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+COLORS = {
+    'faculty': "#e1e73c",          # Yellow
+    'publication': '#3498db',       # Blue  
+    'keyword': '#27ae60',          # Green
+    'edge_pub': 'rgba(52, 152, 219, 0.6)',    # Blue edges
+    'edge_kw': 'rgba(39, 174, 96, 0.4)'       # Green edges
+}
+
+
+def _segments(x0, y0, x1, y1):
+    """Interleave edge endpoints with None separators for a single line trace."""
+    n = len(x0)
+    xs = np.empty(3 * n, dtype=object)
+    ys = np.empty(3 * n, dtype=object)
+    xs[0::3], xs[1::3], xs[2::3] = x0, x1, None
+    ys[0::3], ys[1::3], ys[2::3] = y0, y1, None
+    return xs.tolist(), ys.tolist()
+
+
+def _publication_positions(n_pubs):
+    """Golden-spiral positions for publications around the faculty at (0, 0)."""
     if n_pubs == 1:
         # Single publication - place to the right
-        pub_positions[publications[0]["id"]] = {
-            "x": 2, "y": 0, 
-            "title": publications[0]["title"], 
-            "cites": publications[0].get("cites", 0)
-        }
-    else:
-        # Multiple publications - use golden spiral for better distribution
-        for i, pub in enumerate(publications):
-            pub_id = pub["id"]
-            title = pub["title"]
-            cites = pub.get("cites", 0)
-            
-            # Golden spiral positioning
-            golden_angle = math.pi * (3 - math.sqrt(5))  # Golden angle
-            radius = 1.5 + 0.3 * math.sqrt(i)  # Spiral outward
-            theta = i * golden_angle
-            
-            x = radius * math.cos(theta)
-            y = radius * math.sin(theta)
-            
-            pub_positions[pub_id] = {
-                "x": x, "y": y, "title": title, "cites": cites
-            }
-    
-    # Draw elegant connections from faculty to publications
-    for pub_id, pos in pub_positions.items():
-        # Calculate line width based on citations (more prominent for highly cited papers)
-        line_width = max(2, min(6, pos["cites"] / 50))
-        
-        fig.add_trace(go.Scatter(
-            x=[0, pos["x"]], y=[0, pos["y"]], 
+        return np.array([2.0]), np.array([0.0])
+    i = np.arange(n_pubs)
+    radius = 1.5 + 0.3 * np.sqrt(i)  # Spiral outward
+    theta = i * GOLDEN_ANGLE
+    return radius * np.cos(theta), radius * np.sin(theta)
+
+
+def _keyword_offsets(counts):
+    """Offsets of each keyword from its publication, for per-publication counts.
+
+    One keyword sits below its publication; several are spread on a
+    semi-circle underneath it with a slight alternating radius.
+    """
+    counts = np.asarray(counts, dtype=int)
+    k = np.repeat(counts, counts)                              # keywords on the same publication
+    j = np.arange(k.size) - np.repeat(np.cumsum(counts) - counts, counts)  # index within publication
+    angle = math.pi * (j / np.maximum(k - 1, 1)) - math.pi / 2
+    radius = 0.5 + 0.1 * (j % 2)
+    dx = np.where(k == 1, 0.0, radius * np.cos(angle))
+    dy = np.where(k == 1, -0.6, radius * np.sin(angle) - 0.3)
+    return dx, dy
+
+
+def _fetch_keywords(publications, progress=None):
+    """Map publication id -> keyword rows ({kw, score}) from Neo4j, all lookups concurrent."""
+    if progress:
+        progress(f"🏷️ Loading keywords for {len(publications)} publications...")
+    return async_data.run(async_data.get_keywords_for_publications([pub["id"] for pub in publications]))
+
+
+def _last_name(name):
+    """Last word of a name, for compact node labels (the name itself if it has no words)."""
+    return (name.split() or [name])[-1]
+
+
+def _keyword_sizes(scores):
+    return np.clip(np.asarray(scores, dtype=float) * 20, 12, 18).tolist()
+
+
+def _keyword_hovertext(names, scores):
+    return [f"<b>{name}</b><br>⭐ Score: {score:.2f}" for name, score in zip(names, scores)]
+
+
+def _build_research_figure(faculty_name, publications, keywords_by_pub, use_gl=None):
+    """Build the faculty → publication → keyword figure from fetched data.
+
+    Edges are emitted as one line trace per edge type (None-separated
+    segments) and nodes as one trace per node type, so the trace count no
+    longer grows with the graph.
+    """
+    n_pubs = len(publications)
+    pub_x, pub_y = _publication_positions(n_pubs)
+    cites = np.array([pub.get("cites") or 0 for pub in publications], dtype=float)
+    titles = [pub["title"] or "" for pub in publications]
+
+    keyword_rows = [keywords_by_pub.get(pub["id"]) or [] for pub in publications]
+    kw_counts = [len(rows) for rows in keyword_rows]
+    kw_flat = [kw for rows in keyword_rows for kw in rows]
+    kw_parent = np.repeat(np.arange(n_pubs), kw_counts)
+    dx, dy = _keyword_offsets(kw_counts)
+    kw_x = pub_x[kw_parent] + dx
+    kw_y = pub_y[kw_parent] + dy
+    kw_names = [kw.get("kw") or "Unknown" for kw in kw_flat]
+    kw_scores = np.array([kw.get("score") or 0 for kw in kw_flat], dtype=float)
+
+    n_nodes = 1 + n_pubs + len(kw_flat)
+    if use_gl is None:
+        use_gl = n_nodes > GL_NODE_THRESHOLD
+    Scatter = go.Scattergl if use_gl else go.Scatter
+
+    fig = go.Figure()
+
+    # Faculty → publication edges; line width encodes citations, so bucket
+    # edges by width (at most five traces) instead of one trace per edge.
+    widths = np.clip(cites / 50, 2, 6).round()
+    for width in np.unique(widths):
+        mask = widths == width
+        xs, ys = _segments(np.zeros(mask.sum()), np.zeros(mask.sum()), pub_x[mask], pub_y[mask])
+        fig.add_trace(Scatter(
+            x=xs, y=ys,
             mode="lines",
-            line={
-                "width": line_width, 
-                "color": colors['edge_pub'],
-                "dash": "solid"
-            },
+            line={"width": float(width), "color": COLORS['edge_pub'], "dash": "solid"},
             hoverinfo="none",
             showlegend=False
         ))
-    
+
+    # Publication → keyword edges as a single trace (kept even when empty so
+    # keyword clusters streamed in later can extend it)
+    xs, ys = _segments(pub_x[kw_parent], pub_y[kw_parent], kw_x, kw_y)
+    fig.add_trace(Scatter(
+        x=xs, y=ys,
+        mode="lines",
+        line={"width": 2, "color": COLORS['edge_kw'], "dash": "dot"},
+        hoverinfo="none",
+        name="Keyword links",
+        showlegend=False
+    ))
+
     # Add beautiful publication nodes with size based on citations
-    pub_x = [pos["x"] for pos in pub_positions.values()]
-    pub_y = [pos["y"] for pos in pub_positions.values()]
-    pub_sizes = [max(20, min(40, pos["cites"] / 30)) for pos in pub_positions.values()]
-    pub_text = [f"{pos['title'][:40]}..." if len(pos['title']) > 40 else pos['title'] 
-                for pos in pub_positions.values()]
-    pub_hover = [f"<b>{pos['title']}</b><br>📊 Citations: {pos['cites']}<br>🔗 Click to explore" 
-                 for pos in pub_positions.values()]
-    
-    fig.add_trace(go.Scatter(
-        x=pub_x, y=pub_y,
+    fig.add_trace(Scatter(
+        x=pub_x.tolist(), y=pub_y.tolist(),
         mode="markers+text",
         marker={
-            "size": pub_sizes,
-            "color": colors['publication'],
+            "size": np.clip(cites / 30, 20, 40).tolist(),
+            "color": COLORS['publication'],
             "line": {"width": 3, "color": "white"},
             "opacity": 0.8,
             "symbol": "circle"
         },
-        text=pub_text,
+        text=[f"{t[:40]}..." if len(t) > 40 else t for t in titles],
         textposition="top center",
         textfont={"size": 10, "color": "#2c3e50", "family": "Arial"},
-        hovertext=pub_hover,
+        hovertext=[f"<b>{t}</b><br>📊 Citations: {pub.get('cites', 0)}<br>🔗 Click to explore"
+                   for t, pub in zip(titles, publications)],
         hoverinfo="text",
         name="Publications",
         showlegend=False
     ))
-    
-    # Add keywords with improved positioning and styling
-    keyword_x, keyword_y, keyword_text, keyword_hover, keyword_sizes = [], [], [], [], []
-    
-    for pub_id, pub_pos in pub_positions.items():
-        keywords = db.get_keywords_for_publication(pub_id)
-        if not keywords:
-            continue
-            
-        # Position keywords in a more natural cluster around publication
-        n_keywords = len(keywords)
-        if n_keywords == 1:
-            # Single keyword - place below publication
-            kw_positions = [(0, -0.6)]
-        else:
-            # Multiple keywords - arrange in a semi-circle
-            kw_positions = []
-            for j in range(n_keywords):
-                angle = math.pi * (j / (n_keywords - 1)) - math.pi/2  # Semi-circle from bottom
-                radius = 0.5 + 0.1 * (j % 2)  # Slight radius variation
-                kw_x = radius * math.cos(angle)
-                kw_y = radius * math.sin(angle) - 0.3  # Offset downward
-                kw_positions.append((kw_x, kw_y))
-        
-        for j, kw in enumerate(keywords):
-            kw_name = kw.get("kw", "Unknown")
-            kw_score = kw.get("score", 0)
-            
-            if j < len(kw_positions):
-                offset_x, offset_y = kw_positions[j]
-                kw_x = pub_pos["x"] + offset_x
-                kw_y = pub_pos["y"] + offset_y
-                
-                keyword_x.append(kw_x)
-                keyword_y.append(kw_y)
-                keyword_text.append(kw_name[:12])
-                keyword_hover.append(f"<b>{kw_name}</b><br>⭐ Score: {kw_score:.2f}")
-                keyword_sizes.append(max(12, min(18, kw_score * 20)))
-                
-                # Draw curved connection from publication to keyword
-                fig.add_trace(go.Scatter(
-                    x=[pub_pos["x"], kw_x], y=[pub_pos["y"], kw_y],
-                    mode="lines",
-                    line={
-                        "width": 2, 
-                        "color": colors['edge_kw'],
-                        "dash": "dot"
-                    },
-                    hoverinfo="none",
-                    showlegend=False
-                ))
-    
+
     # Add beautiful keyword nodes
-    if keyword_x:
-        fig.add_trace(go.Scatter(
-            x=keyword_x, y=keyword_y,
-            mode="markers+text",
-            marker={
-                "size": keyword_sizes,
-                "color": colors['keyword'],
-                "line": {"width": 2, "color": "white"},
-                "opacity": 0.7,
-                "symbol": "diamond"
-            },
-            text=keyword_text,
-            textposition="middle center",
-            textfont={"size": 9, "color": "gray", "family": "Arial Black"},
-            hovertext=keyword_hover,
-            hoverinfo="text",
-            name="Keywords",
-            showlegend=False
-        ))
+    fig.add_trace(Scatter(
+        x=kw_x.tolist(), y=kw_y.tolist(),
+        mode="markers+text",
+        marker={
+            "size": _keyword_sizes(kw_scores),
+            "color": COLORS['keyword'],
+            "line": {"width": 2, "color": "white"},
+            "opacity": 0.7,
+            "symbol": "diamond"
+        },
+        text=[name[:12] for name in kw_names],
+        textposition="middle center",
+        textfont={"size": 9, "color": "gray", "family": "Arial Black"},
+        hovertext=_keyword_hovertext(kw_names, kw_scores),
+        hoverinfo="text",
+        name="Keywords",
+        showlegend=False
+    ))
     
     # Add the central faculty node with enhanced styling
-    fig.add_trace(go.Scatter(
+    fig.add_trace(Scatter(
         x=[0], y=[0],
         mode="markers+text",
         marker={
             "size": 50,
-            "color": colors['faculty'],
+            "color": COLORS['faculty'],
             "line": {"width": 4, "color": "white"},
             "opacity": 0.9,
             "symbol": "star"
         },
-        text=[faculty_name.split()[-1]],  # Show last name only for cleaner look
+        text=[_last_name(faculty_name)],  # Show last name only for cleaner look
         textposition="bottom center",
         textfont={"size": 16, "color": "#2c3e50", "family": "Arial Black"},
         hovertext=f"<b>👨‍🎓 {faculty_name}</b><br>🏫 Faculty Member<br>📚 {len(publications)} Publications",
@@ -375,64 +427,348 @@ def _create_research_graph(faculty_name, publications, db):
     
     return fig
 
+def _start_keyword_stream(faculty_name, publications, keywords_by_pub, figure):
+    """State for streaming already fetched keyword clusters into a publications-only figure"""
+    names = [trace.name for trace in figure.data]
+    return {
+        "faculty": faculty_name,
+        "pubs": [pub["id"] for pub in publications],
+        "rows": [keywords_by_pub.get(pub["id"]) or [] for pub in publications],
+        "next": 0,
+        "keywords": 0,
+        "edge_trace": names.index("Keyword links"),
+        "node_trace": names.index("Keywords"),
+    }
+
+
+def _keyword_patch(state, rows):
+    """Patch appending the keyword cluster of publication state["next"] to the figure.
+
+    Offsets only depend on the publication's own keyword count, so the
+    streamed figure ends up identical to one built with all keywords at once.
+    """
+    patch = Patch()
+    if not rows:
+        return patch
+    i = state["next"]
+    pub_x, pub_y = _publication_positions(len(state["pubs"]))
+    dx, dy = _keyword_offsets([len(rows)])
+    kw_x, kw_y = pub_x[i] + dx, pub_y[i] + dy
+    xs, ys = _segments(np.full(len(rows), pub_x[i]), np.full(len(rows), pub_y[i]), kw_x, kw_y)
+    names = [kw.get("kw") or "Unknown" for kw in rows]
+    scores = [kw.get("score") or 0 for kw in rows]
+
+    edges = patch["data"][state["edge_trace"]]
+    edges["x"].extend(xs)
+    edges["y"].extend(ys)
+    nodes = patch["data"][state["node_trace"]]
+    nodes["x"].extend(kw_x.tolist())
+    nodes["y"].extend(kw_y.tolist())
+    nodes["marker"]["size"].extend(_keyword_sizes(scores))
+    nodes["text"].extend([name[:12] for name in names])
+    nodes["hovertext"].extend(_keyword_hovertext(names, scores))
+    return patch
+
+
+def _focus_status(state):
+    n_pubs = len(state["pubs"])
+    if state["next"] < n_pubs:
+        return (f"📚 Loaded {n_pubs} publications for {state['faculty']}. "
+                f"🏷️ Adding keywords ({state['next']}/{n_pubs})...")
+    return (f"✅ Successfully loaded {n_pubs} publications for {state['faculty']} "
+            f"with their research keywords!")
+
+
+def _create_collaboration_graph(state, use_gl=None):
+    """Draw a collaboration state with one ring per hop.
+
+    Nodes keep their ring and slot as later hops arrive, so each incremental
+    render only adds to the previous picture.
+    """
+    nodes = state["nodes"]
+    index = {n["id"]: i for i, n in enumerate(nodes)}
+    hop = np.array([n["hop"] for n in nodes])
+    is_pub = np.array([n["type"] == "publication" for n in nodes])
+
+    # Publications of hop h sit on ring 2h-1, co-authors found at hop h on ring 2h
+    ring = np.where(is_pub, 2 * hop - 1, 2 * hop)
+    slot = np.zeros(len(nodes))
+    for r in np.unique(ring):
+        members = np.flatnonzero(ring == r)
+        slot[members] = np.arange(members.size) / max(members.size, 1)
+    theta = 2 * math.pi * slot + 0.35 * ring
+    radius = 1.2 * ring
+    x, y = radius * np.cos(theta), radius * np.sin(theta)
+
+    if use_gl is None:
+        use_gl = len(nodes) > GL_NODE_THRESHOLD
+    Scatter = go.Scattergl if use_gl else go.Scatter
+
+    fig = go.Figure()
+    if state["edges"]:
+        src = np.array([index[a] for a, _ in state["edges"]])
+        dst = np.array([index[b] for _, b in state["edges"]])
+        xs, ys = _segments(x[src], y[src], x[dst], y[dst])
+        fig.add_trace(Scatter(x=xs, y=ys, mode="lines",
+                              line={"width": 1, "color": COLORS['edge_pub']},
+                              hoverinfo="none", showlegend=False))
+
+    labels = [n["label"] or "" for n in nodes]
+    pubs = np.flatnonzero(is_pub)
+    fig.add_trace(Scatter(
+        x=x[pubs].tolist(), y=y[pubs].tolist(), mode="markers",
+        marker={"size": 9, "color": COLORS['publication'], "opacity": 0.7},
+        hovertext=[f"<b>{labels[i]}</b><br>📊 Citations: {nodes[i].get('cites') or 0}" for i in pubs],
+        hoverinfo="text", name="Publications", showlegend=False
+    ))
+    people = np.flatnonzero(~is_pub & (hop > 0))
+    fig.add_trace(Scatter(
+        x=x[people].tolist(), y=y[people].tolist(), mode="markers+text",
+        marker={"size": 16, "color": COLORS['keyword'], "line": {"width": 2, "color": "white"}},
+        text=[_last_name(labels[i]) if labels[i] else "" for i in people],
+        textposition="top center", textfont={"size": 9, "color": "#2c3e50"},
+        hovertext=[f"<b>👨‍🎓 {labels[i]}</b><br>🤝 Hop {nodes[i]['hop']}" for i in people],
+        hoverinfo="text", name="Co-authors", showlegend=False
+    ))
+    seed = state["seed"]["name"]
+    fig.add_trace(Scatter(
+        x=[0], y=[0], mode="markers+text",
+        marker={"size": 40, "color": COLORS['faculty'], "line": {"width": 4, "color": "white"},
+                "symbol": "star"},
+        text=[_last_name(seed)], textposition="bottom center",
+        textfont={"size": 14, "color": "#2c3e50", "family": "Arial Black"},
+        hovertext=f"<b>👨‍🎓 {seed}</b>", hoverinfo="text", name="Faculty", showlegend=False
+    ))
+
+    extent = 1.2 * 2 * max(state["hop"], 1) + 0.8
+    fig.update_layout(
+        showlegend=False,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis={"visible": False, "range": [-extent, extent], "scaleanchor": "y", "scaleratio": 1},
+        yaxis={"visible": False, "range": [-extent, extent]},
+        margin={"l": 40, "r": 40, "t": 60, "b": 40},
+        title={"text": f"🤝 Collaboration Network: {seed} ({state['hop']} hop{'s' if state['hop'] != 1 else ''})",
+               "x": 0.5, "font": {"size": 20, "color": "#2c3e50", "family": "Arial Black"}},
+        hoverlabel={"bgcolor": "white", "bordercolor": "#3498db", "font": {"size": 12, "color": "#2c3e50"}},
+        uirevision=seed
+    )
+    return fig
+
+
+def _collaboration_status(state):
+    faculty = sum(1 for n in state["nodes"] if n["type"] == "faculty") - 1
+    pubs = sum(1 for n in state["nodes"] if n["type"] == "publication")
+    suffix = "✅ Done" if state["done"] else "⏳ Expanding next hop..."
+    return (f"🤝 {state['seed']['name']}: {faculty} co-authors across {pubs} publications "
+            f"after {state['hop']} hop(s). {suffix}")
+
+
+def _neo4j_timed_out(faculty_name):
+    """Degraded research focus result when Neo4j misses the request deadline"""
+    return (_placeholder("⏱️ Neo4j is taking too long to answer.\nPlease try again in a moment.", "warning"),
+            f"⏱️ Search for '{faculty_name}' timed out", None)
+
+
+def _snapshot_focus(faculty_name):
+    """Research focus from the in-memory snapshot, or None when it doesn't know this faculty"""
+    snapshot = research_graph.snapshot()
+    publications = snapshot.top_publications(faculty_name) if snapshot else None
+    if not publications:
+        return None
+    keywords_by_pub = {pub["id"]: snapshot.keywords_for_publication(pub["id"]) for pub in publications}
+    fig = _build_research_figure(faculty_name, publications, keywords_by_pub)
+    return (fig, f"✅ Successfully loaded {len(publications)} publications for {faculty_name} with their research keywords!",
+            None)
+
+
+def _research_focus(faculty_name, progress=background_jobs.no_progress):
+    """Faculty → top publications → top keywords (the default mode), from Neo4j"""
+    # Initialize database connection
+    progress(f"🔌 Connecting to Neo4j for {faculty_name}...")
+    db = Neo4jUtils()
+    status_message = f"🔍 Searching for {faculty_name}..."
+    
+    try:
+        # Test connection first
+        connected = db.test_connection()
+        if isinstance(connected, TimedOut):
+            return _neo4j_timed_out(faculty_name)
+        if not connected:
+            return (_placeholder("❌ Database connection failed.\nPlease check if Neo4j server is running.", "error"),
+                   "🔌 Database connection failed - Check Neo4j server", None)
+        
+        # Get publications
+        progress(f"📚 Finding top publications of {faculty_name}...")
+        publications = db.get_top_publications(faculty_name)
+        if isinstance(publications, TimedOut):
+            return _neo4j_timed_out(faculty_name)
+        
+        if not publications:
+            # Enhanced suggestion system
+            sample_names = db.get_sample_faculty_names(10)
+            if sample_names:
+                suggestions = [name for name in sample_names 
+                             if faculty_name.lower() in name.lower()][:3]
+                if suggestions:
+                    suggestion_text = f"💡 Did you mean: {', '.join(suggestions)}?"
+                else:
+                    suggestion_text = f"💭 Try searching for: {', '.join(sample_names[:5])}"
+            else:
+                suggestion_text = "📊 No faculty data found in database."
+            
+            return (_placeholder(f"🔍 No publications found for '{faculty_name}'\n\n{suggestion_text}", "warning"),
+                   f"❌ No results found for '{faculty_name}'", None)
+        
+        # Every publication's keywords in one concurrent fan-out; the figure
+        # starts with just the faculty and publications, and widget3-focus-tick
+        # then patches the stored clusters in, one publication per tick
+        keywords_by_pub = _fetch_keywords(publications, progress)
+        if isinstance(keywords_by_pub, TimedOut):
+            return _neo4j_timed_out(faculty_name)
+        fig = _build_research_figure(faculty_name, publications, {})
+        state = _start_keyword_stream(faculty_name, publications, keywords_by_pub, fig)
+        return fig, _focus_status(state), state
+        
+    except Exception as e:
+        error_msg = f"⚠️ Error: {str(e)}"
+        print(f"Widget3 error: {error_msg}")  # For debugging
+        return (_placeholder(f"🚨 An unexpected error occurred:\n{error_msg}", "error"),
+               f"❌ System Error: {str(e)}", None)
+    
+    finally:
+        db.close()
+
+
+def _start_collaboration(faculty_name, hops, progress=background_jobs.no_progress):
+    """Resolve the seed faculty and fetch the first hop right away"""
+    progress(f"🤝 Resolving {faculty_name} and their first co-authors...")
+    db = Neo4jUtils()
+    try:
+        state = db.start_collaboration(faculty_name, hops=hops or 2)
+        if not state:
+            return (_placeholder(f"🔍 No faculty found matching '{faculty_name}'", "warning"),
+                    f"❌ No results found for '{faculty_name}'", None, True)
+        state = db.expand_collaboration_step(state)
+        return (_create_collaboration_graph(state), _collaboration_status(state),
+                state, state["done"])
+    except Exception as e:
+        print(f"Widget3 error: {e}")
+        return (_placeholder(f"🚨 An unexpected error occurred:\n{e}", "error"),
+                f"❌ System Error: {e}", None, True)
+    finally:
+        db.close()
+
+
+def _search_timed_out(search):
+    return (_placeholder("⏱️ The search took too long and was stopped.\nTry again or pick another faculty.",
+                         "warning"),
+            f"⏱️ Search for '{search['name']}' timed out", None, True, None, True)
+
+
 def register_callbacks(app):
+    admission.rate_limit(f"{PREFIX}-btn.n_clicks")
+
+    # Runs in the server process, where research_graph is kept loaded: a
+    # research focus search the snapshot knows is answered right here, and
+    # only a miss or a collaboration search is handed to update_graph
     @app.callback(
         [Output(f"{PREFIX}-graph", "figure"),
-         Output(f"{PREFIX}-status", "children")],
+         Output(f"{PREFIX}-status", "children"),
+         Output(f"{PREFIX}-collab-state", "data"),
+         Output(f"{PREFIX}-collab-tick", "disabled"),
+         Output(f"{PREFIX}-focus-state", "data"),
+         Output(f"{PREFIX}-focus-tick", "disabled"),
+         Output(f"{PREFIX}-search", "data")],
         Input(f"{PREFIX}-btn", "n_clicks"),
-        State(f"{PREFIX}-input", "value")
+        State(f"{PREFIX}-input", "value"),
+        State(f"{PREFIX}-mode", "value"),
+        State(f"{PREFIX}-hops", "value"),
+        prevent_initial_call=True
     )
-    def update_graph(n_clicks, faculty_name):
-        # Initial state with better messaging
-        if not n_clicks or not faculty_name:
-            return (_placeholder("🎯 Enter a faculty name and click Search to explore their research network!", "info"), 
-                   "🚀 Ready to explore research networks...")
-        
-        faculty_name = faculty_name.strip()
+    def search(n_clicks, faculty_name, mode, hops):
+        faculty_name = (faculty_name or "").strip()
         if not faculty_name:
             return (_placeholder("⚠️ Please enter a valid faculty name to continue.", "warning"),
-                   "❓ Please enter a faculty name to search.")
-        
-        # Initialize database connection
+                    "❓ Please enter a faculty name to search.", None, True, None, True, no_update)
+        if mode != "collab":
+            result = _snapshot_focus(faculty_name)
+            if result is not None:
+                figure, status, _ = result
+                return figure, status, None, True, None, True, no_update
+        return (no_update, f"🔍 Searching for {faculty_name}...", None, True, None, True,
+                {"name": faculty_name, "mode": mode, "hops": hops, "n": n_clicks})
+
+    # Runs as a background job when a manager is available: a new search
+    # terminates the previous one and progress shows in widget3-progress
+    @background_jobs.callback(
+        app,
+        [Output(f"{PREFIX}-graph", "figure", allow_duplicate=True),
+         Output(f"{PREFIX}-status", "children", allow_duplicate=True),
+         Output(f"{PREFIX}-collab-state", "data", allow_duplicate=True),
+         Output(f"{PREFIX}-collab-tick", "disabled", allow_duplicate=True),
+         Output(f"{PREFIX}-focus-state", "data", allow_duplicate=True),
+         Output(f"{PREFIX}-focus-tick", "disabled", allow_duplicate=True)],
+        Input(f"{PREFIX}-search", "data"),
+        prevent_initial_call=True,
+        progress=Output(f"{PREFIX}-progress", "children"),
+        progress_default="",
+        on_timeout=_search_timed_out
+    )
+    def update_graph(set_progress, search):
+        if not search:
+            raise PreventUpdate
+        if search["mode"] == "collab":
+            return _start_collaboration(search["name"], search["hops"], set_progress) + (None, True)
+        figure, status, focus_state = _research_focus(search["name"], set_progress)
+        return figure, status, None, True, focus_state, focus_state is None
+
+    @app.callback(
+        [Output(f"{PREFIX}-graph", "figure", allow_duplicate=True),
+         Output(f"{PREFIX}-status", "children", allow_duplicate=True),
+         Output(f"{PREFIX}-collab-state", "data", allow_duplicate=True),
+         Output(f"{PREFIX}-collab-tick", "disabled", allow_duplicate=True)],
+        Input(f"{PREFIX}-collab-tick", "n_intervals"),
+        State(f"{PREFIX}-collab-state", "data"),
+        prevent_initial_call=True
+    )
+    def expand_collaboration(n_intervals, state):
+        # Each tick expands exactly one hop from the stored state. The step is
+        # deterministic, so a tick that fires before the previous one landed
+        # just recomputes (and single-flights) the same hop.
+        if not state:
+            return no_update, no_update, no_update, True
+        if state["done"]:
+            raise PreventUpdate
         db = Neo4jUtils()
-        status_message = f"🔍 Searching for {faculty_name}..."
-        
         try:
-            # Test connection first
-            if not db.test_connection():
-                return (_placeholder("❌ Database connection failed.\nPlease check if Neo4j server is running.", "error"),
-                       "🔌 Database connection failed - Check Neo4j server")
-            
-            # Get publications
-            publications = db.get_top_publications(faculty_name)
-            
-            if not publications:
-                # Enhanced suggestion system
-                sample_names = db.get_sample_faculty_names(10)
-                if sample_names:
-                    suggestions = [name for name in sample_names 
-                                 if faculty_name.lower() in name.lower()][:3]
-                    if suggestions:
-                        suggestion_text = f"💡 Did you mean: {', '.join(suggestions)}?"
-                    else:
-                        suggestion_text = f"💭 Try searching for: {', '.join(sample_names[:5])}"
-                else:
-                    suggestion_text = "📊 No faculty data found in database."
-                
-                return (_placeholder(f"🔍 No publications found for '{faculty_name}'\n\n{suggestion_text}", "warning"),
-                       f"❌ No results found for '{faculty_name}'")
-            
-            # Create the beautiful visualization
-            fig = _create_research_graph(faculty_name, publications, db)
-            status_message = f"✅ Successfully loaded {len(publications)} publications for {faculty_name} with their research keywords!"
-            
-            return fig, status_message
-            
+            state = db.expand_collaboration_step(state)
         except Exception as e:
-            error_msg = f"⚠️ Error: {str(e)}"
-            print(f"Widget3 error: {error_msg}")  # For debugging
-            return (_placeholder(f"🚨 An unexpected error occurred:\n{error_msg}", "error"),
-                   f"❌ System Error: {str(e)}")
-        
+            print(f"Widget3 error: {e}")
+            return no_update, f"❌ System Error: {e}", no_update, True
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
+        return (_create_collaboration_graph(state), _collaboration_status(state),
+                state, state["done"])
+
+    @app.callback(
+        [Output(f"{PREFIX}-graph", "figure", allow_duplicate=True),
+         Output(f"{PREFIX}-status", "children", allow_duplicate=True),
+         Output(f"{PREFIX}-focus-state", "data", allow_duplicate=True),
+         Output(f"{PREFIX}-focus-tick", "disabled", allow_duplicate=True)],
+        Input(f"{PREFIX}-focus-tick", "n_intervals"),
+        State(f"{PREFIX}-focus-state", "data"),
+        prevent_initial_call=True
+    )
+    def stream_keywords(n_intervals, state):
+        # One publication's keywords per tick, appended with a Patch so the
+        # figure is never resent. The rows were fetched with the search, so
+        # a tick runs no query and only builds the patch.
+        if not state:
+            return no_update, no_update, no_update, True
+        if state["next"] >= len(state["pubs"]):
+            raise PreventUpdate
+        rows = state["rows"][state["next"]]
+        patch = _keyword_patch(state, rows)
+        state = dict(state, next=state["next"] + 1, keywords=state["keywords"] + len(rows))
+        return patch, _focus_status(state), state, state["next"] >= len(state["pubs"])
@@ -2,6 +2,8 @@ from dash import html, dcc, Input, Output, State
 import dash
 import mysql_utils
 import random
+from deadlines import TimedOut
+import admission
 
 def layout():
     return html.Div([
@@ -84,7 +86,9 @@ def layout():
     })
 
 def get_random_faculty():
-    data = mysql_utils.get_faculty_analytics() or []
+    data = mysql_utils.get_faculty_analytics()
+    if isinstance(data, TimedOut):
+        return data
     if not data:
         return None
     return random.choice(data)
@@ -140,12 +144,25 @@ def make_faculty_card(fac):
 
 
 def register_callbacks(app):
+    admission.rate_limit("w4-next-faculty.n_clicks", "w4-update-position.n_clicks")
+
     @app.callback(
         Output("w4-faculty-spotlight", "children"),
         Input("w4-next-faculty", "n_clicks")
     )
     def show_faculty_spotlight(n):
         fac = get_random_faculty()
+        if isinstance(fac, TimedOut):
+            return html.Div(
+                "⏱️ The faculty database is slow right now. Please try again in a moment.",
+                style={
+                    "color": "#92400e",
+                    "backgroundColor": "#fef3c7",
+                    "padding": "10px 15px",
+                    "borderRadius": "6px",
+                    "fontWeight": "bold"
+                }
+            )
         if not fac:
             return html.Div(
                 "No faculty data found.",
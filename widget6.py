@@ -1,8 +1,10 @@
 # widget6.py - Dashboard widget (Fixed version)
 from dash import html, dcc, Input, Output, State
-from mongodb_utils import get_keywords_by_university, get_university_faculty_count
+import async_data
 import plotly.graph_objs as go
-import plotly.express as px
+import admission
+import background_jobs
+from deadlines import TimedOut
 
 def layout():
     """Create the layout for Widget 6"""
@@ -43,6 +45,9 @@ def layout():
                 ),
             ], style={"marginBottom": "20px"}),
             
+            # Progress of a running search (background callbacks only)
+            html.Div(id="uni-progress", style={"color": "#7f8c8d", "fontSize": "13px", "minHeight": "18px"}),
+
             # Info display
             html.Div(id="uni-info", style={"marginBottom": "15px"}),
             
@@ -61,17 +66,34 @@ def layout():
         }
     )
 
+def _search_timed_out(n_clicks, university_name):
+    """Outputs shown when the background search runs past its timeout"""
+    fig = go.Figure()
+    fig.update_layout(title=f"Search for {university_name} timed out",
+                      xaxis={"visible": False}, yaxis={"visible": False})
+    return fig, html.P("⏱️ The keyword search took too long and was stopped. Please try again.",
+                       style={"color": "#e67e22", "fontWeight": "bold"})
+
+
 def register_callbacks(app):
     """Register callbacks for Widget 6"""
     
-    @app.callback(
+    admission.rate_limit("uni-keyword-btn.n_clicks")
+
+    # Background job when available: a new search cancels the running one
+    @background_jobs.callback(
+        app,
         [Output("uni-keyword-chart", "figure"),
          Output("uni-info", "children")],
         Input("uni-keyword-btn", "n_clicks"),
         State("uni-input", "value"),
-        prevent_initial_call=True
+        prevent_initial_call=True,
+        progress=Output("uni-progress", "children"),
+        progress_default="",
+        running=[(Output("uni-keyword-btn", "children"), "Searching...", "Search Keywords")],
+        on_timeout=_search_timed_out
     )
-    def update_university_keywords(n_clicks, university_name):
+    def update_university_keywords(set_progress, n_clicks, university_name):
         """Update the keyword chart and info display"""
         
         if not n_clicks or not university_name:
@@ -96,9 +118,14 @@ def register_callbacks(app):
         
         university_name = university_name.strip()
         
-        # Get keywords and faculty count
-        keywords, counts = get_keywords_by_university(university_name, limit=15)
-        faculty_count = get_university_faculty_count(university_name)
+        # Get keywords and faculty count (both queries in flight at once)
+        set_progress(f"🔎 Scanning faculty keywords at {university_name}...")
+        result, faculty_count = async_data.run_all(
+            async_data.get_keywords_by_university(university_name, limit=15),
+            async_data.get_university_faculty_count(university_name))
+        if isinstance(result, TimedOut):
+            return _search_timed_out(n_clicks, university_name)
+        keywords, counts = result
         
         # Create info display
         if not keywords:
@@ -145,7 +172,7 @@ def register_callbacks(app):
                     color=counts,
                     colorscale='viridis',
                     showscale=True,
-                    colorbar=dict(title="Frequency", titleside="right")
+                    colorbar=dict(title=dict(text="Frequency", side="right"))
                 ),
                 text=counts,
                 textposition='outside',
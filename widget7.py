@@ -0,0 +1,71 @@
+# widget7.py - Collaboration Influence Leaderboard (precomputed centrality)
+from dash import html, dcc, Input, Output
+from centrality import METRICS, get_leaderboard
+
+PREFIX = "widget7"
+
+CELL_STYLE = {"padding": "8px 10px", "borderBottom": "1px solid #ecf0f1", "fontSize": "13px"}
+HEADER_STYLE = dict(CELL_STYLE, fontWeight="bold", color="#2c3e50",
+                    borderBottom="2px solid #3498db", textAlign="left")
+
+
+def layout():
+    return html.Div(
+        id=PREFIX,
+        className="widget",
+        children=[
+            html.H3("🏅 Collaboration Influence Leaderboard",
+                    style={"color": "#2c3e50", "marginBottom": "10px", "fontWeight": "bold"}),
+            html.P("Researchers ranked by their position in the co-authorship network",
+                   style={"color": "#7f8c8d", "marginBottom": "15px", "fontSize": "14px"}),
+            dcc.Dropdown(
+                id=f"{PREFIX}-metric",
+                options=[{"label": label, "value": key} for key, label in METRICS.items()],
+                value="pagerank",
+                clearable=False,
+                style={"width": "260px", "marginBottom": "15px"}
+            ),
+            dcc.Loading(html.Div(id=f"{PREFIX}-table"), color="#3498db")
+        ],
+        style={
+            "padding": "25px",
+            "border": "none",
+            "borderRadius": "15px",
+            "backgroundColor": "#ffffff",
+            "boxShadow": "0 8px 25px rgba(0,0,0,0.1)",
+            "margin": "10px"
+        }
+    )
+
+
+def make_table(rows, metric):
+    header = html.Tr([html.Th(col, style=HEADER_STYLE)
+                      for col in ("#", "Faculty", "University", METRICS[metric], "Co-authors")])
+    body = [
+        html.Tr([
+            html.Td(f"{row['rank']}", style=CELL_STYLE),
+            html.Td(row["name"], style=dict(CELL_STYLE, fontWeight="bold")),
+            html.Td(row["university"], style=dict(CELL_STYLE, color="#7f8c8d")),
+            html.Td(f"{row['score']:.6f}" if metric == "pagerank" else f"{row['score']:,.1f}",
+                    style=CELL_STYLE),
+            html.Td(f"{row['degree']:,}", style=CELL_STYLE),
+        ])
+        for row in rows
+    ]
+    return html.Table([html.Thead(header), html.Tbody(body)],
+                      style={"width": "100%", "borderCollapse": "collapse"})
+
+
+def register_callbacks(app):
+    @app.callback(
+        Output(f"{PREFIX}-table", "children"),
+        Input(f"{PREFIX}-metric", "value")
+    )
+    def update_leaderboard(metric):
+        rows = get_leaderboard(metric or "pagerank")
+        if not rows:
+            return html.Div(
+                "📊 No centrality scores yet. Run `python centrality.py` to compute them.",
+                style={"color": "#7f8c8d", "fontStyle": "italic"}
+            )
+        return make_table(rows, metric or "pagerank")
@@ -0,0 +1,111 @@
+# widget8.py - Similar Researchers (keyword overlap or weighted keyword profile)
+from dash import html, dcc, Input, Output, State
+from minhash_lsh import find_similar_faculty
+from keyword_vectors import find_collaborators
+from collab_recommend import recommend_collaborators
+from index_loader import Warming
+
+PREFIX = "widget8"
+
+
+def layout():
+    return html.Div(
+        id=PREFIX,
+        className="widget",
+        children=[
+            html.H3("🧭 Similar Researchers",
+                    style={"color": "#2c3e50", "marginBottom": "10px", "fontWeight": "bold"}),
+            html.P("Find faculty who work on similar things, based on their research keywords",
+                   style={"color": "#7f8c8d", "marginBottom": "15px", "fontSize": "14px"}),
+            html.Div([
+                dcc.Input(
+                    id=f"{PREFIX}-input",
+                    type="text",
+                    placeholder="Enter Faculty Name (e.g., Jiawei Han)",
+                    style={
+                        "width": "300px",
+                        "padding": "8px",
+                        "marginRight": "10px",
+                        "border": "1px solid #bdc3c7",
+                        "borderRadius": "4px"
+                    }
+                ),
+                html.Button(
+                    "Find Similar",
+                    id=f"{PREFIX}-btn",
+                    style={
+                        "padding": "8px 16px",
+                        "backgroundColor": "#3498db",
+                        "color": "white",
+                        "border": "none",
+                        "borderRadius": "4px",
+                        "cursor": "pointer"
+                    }
+                ),
+            ], style={"marginBottom": "12px"}),
+            dcc.RadioItems(
+                id=f"{PREFIX}-method",
+                options=[
+                    {"label": " Keyword overlap (MongoDB)", "value": "overlap"},
+                    {"label": " Weighted research profile (MySQL KRC)", "value": "profile"},
+                    {"label": " New collaborators (not yet co-authors)", "value": "recommend"},
+                ],
+                value="overlap",
+                inline=True,
+                inputStyle={"marginLeft": "12px"},
+                style={"fontSize": "13px", "color": "#2c3e50", "marginBottom": "15px"}
+            ),
+            dcc.Loading(html.Div(id=f"{PREFIX}-results"), color="#3498db")
+        ],
+        style={
+            "padding": "25px",
+            "border": "none",
+            "borderRadius": "15px",
+            "backgroundColor": "#ffffff",
+            "boxShadow": "0 8px 25px rgba(0,0,0,0.1)",
+            "margin": "10px"
+        }
+    )
+
+
+def make_result_card(row):
+    return html.Div([
+        html.Div([
+            html.Span(row["name"], style={"fontWeight": "bold", "color": "#2c3e50"}),
+            html.Span(f"  {row['similarity'] * 100:.0f}% match",
+                      style={"color": "#27ae60", "fontSize": "13px", "marginLeft": "8px"}),
+        ]),
+        html.Div(f"🏫 {row.get('university') or 'University Not Listed'}",
+                 style={"color": "#7f8c8d", "fontSize": "12px"}),
+        html.Div(f"🔗 {', '.join(row['shared'][:6])}" if row.get("shared") else "",
+                 style={"color": "#3498db", "fontSize": "12px", "marginTop": "3px"}),
+        html.Div(f"🤝 {row['mutual']} mutual co-author(s)" if row.get("mutual") else "",
+                 style={"color": "#8e44ad", "fontSize": "12px"}),
+    ], style={"padding": "10px 12px", "borderBottom": "1px solid #ecf0f1"})
+
+
+def register_callbacks(app):
+    @app.callback(
+        Output(f"{PREFIX}-results", "children"),
+        Input(f"{PREFIX}-btn", "n_clicks"),
+        State(f"{PREFIX}-input", "value"),
+        State(f"{PREFIX}-method", "value"),
+        prevent_initial_call=True
+    )
+    def update_similar(n_clicks, faculty_name, method):
+        if not faculty_name or not faculty_name.strip():
+            return html.Div("⚠️ Please enter a faculty name.", style={"color": "#f39c12"})
+        faculty_name = faculty_name.strip()
+        if method == "profile":
+            rows = find_collaborators(faculty_name, k=10)
+        elif method == "recommend":
+            rows = recommend_collaborators(faculty_name, k=10)
+        else:
+            rows = find_similar_faculty(faculty_name, k=10)
+        if isinstance(rows, Warming):
+            return html.Div("⏳ The similarity index is still warming up. Please try again in a moment.",
+                            style={"color": "#f39c12"})
+        if not rows:
+            return html.Div(f"❌ No similar faculty found for '{faculty_name}'",
+                            style={"color": "#e74c3c", "fontWeight": "bold"})
+        return html.Div([make_result_card(row) for row in rows])